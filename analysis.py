@@ -0,0 +1,205 @@
+"""
+Single-pass analysis of a results_store.ResultsTable.
+
+analyze() computes every aggregate the report needs -- schedule scores and
+significant wins, per-size peak performance for every schedule, profile win
+counts and the best profile -- in one sweep over the hw2-b rows, plus each
+kernel's peak per size, the best thread placement per kernel and size from
+the placement sweep, the per-k peaks of the batched sweep and the scaling
+models (models.py) fitted to every strong and weak scaling curve, and memoizes
+the result per table digest. Output writers (the PDF today) only read the returned
+dict; nothing in here knows about rendering.
+"""
+
+from collections import defaultdict
+
+import numpy as np
+
+import kernels
+import models
+import results_store
+
+# The kernel whose schedules and compiler profiles the report compares.
+SCHEDULE_KERNEL = "hw2_b"
+DEFAULT_PROFILE = "O3_default"
+# A batched point counts as no longer bandwidth-bound once its achieved GB/s falls
+# below this fraction of the triad bandwidth at the same thread count.
+COMPUTE_BOUND_FRACTION = 0.5
+
+_cache = {}
+
+
+def _empty_peak():
+    return {'gflops': 0.0, 'threads': 0, 'ci_low': 0.0, 'ci_high': 0.0}
+
+
+def _analyze(data):
+    result = {
+        'profiles': list(data.profiles),
+        'schedules': [],
+        'schedule_scores': {},
+        'schedule_wins': {},
+        'best_schedule': kernels.DEFAULT_SCHEDULE,
+        'peaks': {},
+        'profile_wins': {},
+        'best_profile': {},
+        'placements': _placements(data),
+        'kernel_peaks': _kernel_peaks(data),
+        'batched': _batched(data),
+        'scaling_models': _scaling_models(data),
+    }
+    rows = data.rows[(data.rows['scaling'] == 'strong') & (data.rows['kernel'] == SCHEDULE_KERNEL)]
+    if len(rows) == 0:
+        return result
+
+    # --- Schedules: cumulative score and significant wins per (profile, N, threads) ---
+    schedules, schedule_ids = results_store.group_ids(rows, ('schedule',))
+    schedules = [s for (s,) in schedules]
+    scores = np.bincount(schedule_ids, weights=rows['gflops'])
+    groups, group_ids = results_store.group_ids(rows, ('profile', 'N', 'threads'))
+    best, significant = results_store.best_per_group(rows, group_ids, len(groups))
+    wins = np.bincount(schedule_ids[best[significant]], minlength=len(schedules))
+    result['schedules'] = schedules
+    result['schedule_scores'] = {s: float(v) for s, v in zip(schedules, scores)}
+    result['schedule_wins'] = {s: int(w) for s, w in zip(schedules, wins) if w}
+    if result['schedule_wins']:
+        result['best_schedule'] = max(schedules, key=lambda s: (result['schedule_wins'].get(s, 0), result['schedule_scores'][s]))
+    else:
+        result['best_schedule'] = max(schedules, key=result['schedule_scores'].get)
+
+    # --- Peaks: best thread count per (schedule, N, profile), for every schedule at once ---
+    groups, group_ids = results_store.group_ids(rows, ('schedule', 'N', 'profile'))
+    peak_idx, _ = results_store.best_per_group(rows, group_ids, len(groups))
+    peak_rows = rows[peak_idx]
+    peaks = defaultdict(lambda: defaultdict(dict))
+    for (schedule, size, profile), peak in zip(groups, peak_rows):
+        peaks[schedule][size][profile] = {'gflops': float(peak['gflops']), 'threads': int(peak['threads']),
+                                          'ci_low': float(peak['ci_low']), 'ci_high': float(peak['ci_high'])}
+    for by_size in peaks.values():
+        for by_profile in by_size.values():
+            for profile in data.profiles:
+                by_profile.setdefault(profile, _empty_peak())
+    result['peaks'] = {s: {n: dict(by_profile) for n, by_profile in sorted(by_size.items())} for s, by_size in peaks.items()}
+
+    # --- Profiles: significant wins per (schedule, N), ties credited to nobody ---
+    row_groups, row_ids = results_store.group_ids(peak_rows, ('schedule', 'N'))
+    leaders, clear = results_store.best_per_group(peak_rows, row_ids, len(row_groups))
+    for schedule in schedules:
+        win_counts = defaultdict(int)
+        for (s, _), leader, is_clear in zip(row_groups, leaders, clear):
+            if s == schedule and is_clear:
+                win_counts[str(peak_rows['profile'][leader])] += 1
+        peak_gflops = {p: max(by_profile[p]['gflops'] for by_profile in result['peaks'][schedule].values())
+                       for p in data.profiles}
+        result['profile_wins'][schedule] = dict(win_counts)
+        result['best_profile'][schedule] = sorted(peak_gflops, key=lambda p: (win_counts[p], peak_gflops[p]), reverse=True)[0]
+    return result
+
+
+def _kernel_peaks(data):
+    """Best thread count per (profile, kernel, N), each kernel at its headline schedule."""
+    result = defaultdict(lambda: defaultdict(dict))
+    for profile in data.profiles:
+        rows = data.headline('strong', profile)
+        if len(rows) == 0: continue
+        groups, group_ids = results_store.group_ids(rows, ('kernel', 'N'))
+        peak_idx, _ = results_store.best_per_group(rows, group_ids, len(groups))
+        for (kernel, size), peak in zip(groups, rows[peak_idx]):
+            result[profile][kernel][size] = {'gflops': float(peak['gflops']), 'threads': int(peak['threads']),
+                                             'ci_low': float(peak['ci_low']), 'ci_high': float(peak['ci_high'])}
+    return {p: {k: dict(sorted(by_size.items())) for k, by_size in by_kernel.items()} for p, by_kernel in result.items()}
+
+
+def _placements(data):
+    """Best OMP_PROC_BIND/OMP_PLACES combination per (profile, kernel, N).
+
+    Each placement is represented by its best thread count. The recommendation is
+    'significant' when its CI lies above every other placement's peak CI.
+    """
+    rows = data.rows[data.rows['scaling'] == 'placement']
+    if len(rows) == 0:
+        return {}
+    groups, group_ids = results_store.group_ids(rows, ('profile', 'kernel', 'N', 'placement'))
+    peak_idx, _ = results_store.best_per_group(rows, group_ids, len(groups))
+    peak_rows = rows[peak_idx]
+    cells, cell_ids = results_store.group_ids(peak_rows, ('profile', 'kernel', 'N'))
+    leaders, clear = results_store.best_per_group(peak_rows, cell_ids, len(cells))
+    result = defaultdict(lambda: defaultdict(dict))
+    for i, (profile, kernel, size) in enumerate(cells):
+        members = peak_rows[cell_ids == i]
+        leader = peak_rows[leaders[i]]
+        result[profile][kernel][size] = {
+            'best': str(leader['placement']), 'threads': int(leader['threads']),
+            'gflops': float(leader['gflops']), 'ci_low': float(leader['ci_low']), 'ci_high': float(leader['ci_high']),
+            'significant': bool(clear[i]),
+            'peaks': {str(r['placement']): {'gflops': float(r['gflops']), 'threads': int(r['threads'])} for r in members},
+        }
+    return {p: {k: dict(sorted(by_size.items())) for k, by_size in by_kernel.items()} for p, by_kernel in result.items()}
+
+
+def _batched(data):
+    """Peak per right-hand-side count k for each (profile, kernel, N) of the batched sweep.
+
+    'best_rhs' has the highest Gflop/s and 'gain' is its speedup over k = 1. With a
+    bandwidth measurement, 'compute_bound_rhs' is the smallest k whose peak moves
+    less than COMPUTE_BOUND_FRACTION of the triad bandwidth, i.e. where raising the
+    arithmetic intensity stopped paying off in Gflop/s (None if it never happens).
+    """
+    rows = data.rows[data.rows['scaling'] == 'batched']
+    if len(rows) == 0:
+        return {}
+    groups, group_ids = results_store.group_ids(rows, ('profile', 'kernel', 'N', 'rhs'))
+    peak_idx, _ = results_store.best_per_group(rows, group_ids, len(groups))
+    peak_bw = max((v['triad'] for v in data.bandwidth.values()), default=0.0)
+    result = defaultdict(lambda: defaultdict(dict))
+    for (profile, kernel, size, rhs), peak in zip(groups, rows[peak_idx]):
+        result[profile][kernel].setdefault(size, {})[rhs] = {
+            'gflops': float(peak['gflops']), 'threads': int(peak['threads']), 'gbps': float(peak['gbps']),
+            'ci_low': float(peak['ci_low']), 'ci_high': float(peak['ci_high'])}
+    for by_kernel in result.values():
+        for by_size in by_kernel.values():
+            for size, by_rhs in by_size.items():
+                by_rhs = dict(sorted(by_rhs.items()))
+                best = max(by_rhs, key=lambda k: by_rhs[k]['gflops'])
+                base = by_rhs.get(1)
+                bound = None
+                if peak_bw:
+                    bound = next((k for k, p in by_rhs.items() if p['gbps'] <
+                                  COMPUTE_BOUND_FRACTION * data.bandwidth.get(p['threads'], {}).get('triad', peak_bw)), None)
+                by_size[size] = {'rhs': by_rhs, 'best_rhs': best,
+                                 'gain': by_rhs[best]['gflops'] / base['gflops'] if base else None,
+                                 'compute_bound_rhs': bound}
+    return {p: {k: dict(sorted(by_size.items())) for k, by_size in by_kernel.items()} for p, by_kernel in result.items()}
+
+
+def _scaling_models(data):
+    """Fitted scaling models per (profile, scaling, kernel, N) at each kernel's headline schedule.
+
+    Each entry is a models.fit_curve() result plus 'predicted' Gflop/s of its best
+    model at the unmeasured powers of two up to twice the largest thread count.
+    """
+    result = {}
+    for profile in data.profiles:
+        for scaling in ('strong', 'weak'):
+            for kernel, by_size in models.curves(data, profile, scaling).items():
+                for size, (threads, gflops) in by_size.items():
+                    curve = models.fit_curve(threads, gflops, weak=scaling == 'weak')
+                    if not curve: continue
+                    best = curve['fits'][curve['best']]
+                    curve['predicted'] = {t: float(models.predict(best, t)) for t in models.prediction_threads(threads)}
+                    result.setdefault(profile, {}).setdefault(scaling, {}).setdefault(kernel, {})[size] = curve
+    return result
+
+
+def analyze(data):
+    """Returns the memoized analysis dict for a ResultsTable."""
+    key = data.digest()
+    if key not in _cache:
+        _cache[key] = _analyze(data)
+    return _cache[key]
+
+
+def best_profile(analysis, schedule):
+    """Best compiler profile when hw2-b uses the given schedule."""
+    fallback = analysis['profiles'][0] if analysis['profiles'] else DEFAULT_PROFILE
+    return analysis['best_profile'].get(schedule, fallback)
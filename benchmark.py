@@ -0,0 +1,852 @@
+import argparse
+import json
+import math
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+
+import history
+import instrument
+import kernels
+import measure_cache
+import models
+import reference
+import roofline
+import stats
+import topology
+
+# --- Configuration ---
+# These mirror the sweep that test_performance.sh used to run serially.
+RESULTS_FILE = "results.json"
+JOURNAL_FILE = "results.journal.jsonl"
+BUILD_ROOT = "build"
+MATRIX_SIZES = [1024, 2048, 4096]
+THREAD_COUNTS = [1, 2, 4, 8, 16, 32]
+SCHEDULES = ["static", "dynamic", "guided"]
+COMPILER_PROFILES = {
+    "O3_default": "all-O3",
+    "O2_optimized": "all-O2",
+    "O3_unrolled": "all-unroll",
+}
+RUN_TIMEOUT_SEC = 600
+# Adaptive sampling: each point is rerun until the confidence interval of its
+# median is narrower than CI_TARGET_WIDTH (relative to the median), or until
+# MAX_SAMPLES / POINT_BUDGET_SEC is reached, whichever comes first.
+MIN_SAMPLES = 6
+MAX_SAMPLES = 30
+CI_TARGET_WIDTH = 0.05
+POINT_BUDGET_SEC = 30.0
+# Thread placement sweep: every OMP_PROC_BIND policy against every OMP_PLACES granularity.
+# Each combination is recorded as "<bind>_<places>" under the profile's "placement" section.
+PROC_BIND_POLICIES = ["close", "spread", "master"]
+PLACES = ["cores", "threads", "sockets"]
+PLACEMENTS = [f"{bind}_{places}" for bind in PROC_BIND_POLICIES for places in PLACES]
+# Batched sweep: right-hand-side counts k for the kernels that support them, recorded
+# as "K<k>" under the profile's "batched" section.
+RHS_COUNTS = [1, 2, 4, 8, 16, 32]
+# STREAM arrays must be much larger than the last-level cache: 3 x 128 MiB by default.
+STREAM_ELEMENTS = 1 << 24
+# Memory planning: concurrent runs are packed so their estimated footprints stay within
+# MEMORY_BUDGET_FRACTION of the RAM available at startup, unless --memory-budget-mb is given.
+MEMORY_BUDGET_FRACTION = 0.8
+# Allowance per benchmark process on top of its matrices: code, OpenMP runtime and stacks.
+PROCESS_OVERHEAD_BYTES = 32 << 20
+# Model-guided pruning (--prune): every scaling curve first runs PRUNE_ANCHORS of its thread
+# counts, including the smallest and largest. Its remaining points are skipped when the fitted
+# scaling model (models.py) predicts each anchor from the others within PRUNE_TOLERANCE.
+PRUNE_ANCHORS = 4
+PRUNE_TOLERANCE = 0.05
+
+
+def available_cores():
+    """Number of CPUs this process may run on (respects taskset/cgroup affinity)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def weak_size_dense(base_n, threads):
+    # Work is n^2, so growing n by sqrt(T) keeps the work per thread constant.
+    return int(math.sqrt(threads) * base_n)
+
+
+def weak_size_triangular(base_n, threads):
+    # Work is n*(n+1), so solve n^2 + n ~= T * (base_n^2 + base_n) for n.
+    return int(math.sqrt(threads * (base_n ** 2 + base_n)))
+
+
+def weak_size(kernel, base_n, threads):
+    if kernels.info(kernel)["shape"] == "dense":
+        return weak_size_dense(base_n, threads)
+    return weak_size_triangular(base_n, threads)
+
+
+def placement_env(placement):
+    bind, places = placement.split("_", 1)
+    return {"OMP_PROC_BIND": bind, "OMP_PLACES": places}
+
+
+def make_point(path, profile, kernel, n, threads, schedule=None, weak=False, rhs=1):
+    args = [str(n)] + ([schedule] if kernels.info(kernel)["scheduled"] else [])
+    if rhs > 1:
+        # Scheduled kernels take k after the chunk size; 0 keeps the schedule's default chunk.
+        args += (["0"] if kernels.info(kernel)["scheduled"] else []) + [str(rhs)]
+    return {"path": path, "profile": profile, "kernel": kernel, "binary": kernels.info(kernel)["binary"],
+            "args": args, "n": n, "threads": threads, "weak": weak, "rhs": rhs}
+
+
+def plan_points(profiles, sizes, threads, schedules, placements=(), kernel_names=tuple(kernels.KERNELS), rhs_counts=()):
+    """Expands the sweep into one dict per benchmark run.
+
+    Each point carries the 'path' at which its result lives in results.json, so
+    the same list drives scheduling, the resume journal and the final layout.
+    Kernels come from kernels.KERNELS; scheduled kernels get one strong-scaling
+    series per schedule and use the default schedule everywhere else.
+    Placement points also carry the OpenMP binding 'env' they run under and are
+    'exclusive': bound threads start at the first place, so two pinned runs
+    sharing the machine would land on the same cores.
+    Batched points run the kernels that support it with each right-hand-side count.
+    """
+    points = []
+    guided = kernels.DEFAULT_SCHEDULE
+    for profile in profiles:
+        for kernel in kernel_names:
+            for n in sizes:
+                if kernels.info(kernel)["scheduled"]:
+                    for s in schedules:
+                        for t in threads:
+                            points.append(make_point([profile, "general_perf", kernel, f"N{n}", f"schedule_{s}", f"T{t}"],
+                                                     profile, kernel, n, t, s))
+                else:
+                    for t in threads:
+                        points.append(make_point([profile, "general_perf", kernel, f"N{n}", f"T{t}"], profile, kernel, n, t))
+        for base_n in sizes:
+            for kernel in kernel_names:
+                for t in threads:
+                    points.append(make_point([profile, "weak_scaling", f"N{base_n}", kernels.result_key(kernel), f"T{t}"],
+                                             profile, kernel, weak_size(kernel, base_n, t), t, guided, weak=True))
+        for placement in placements:
+            for n in sizes:
+                for kernel in kernel_names:
+                    for t in threads:
+                        point = make_point([profile, "placement", kernels.result_key(kernel), f"N{n}", placement, f"T{t}"],
+                                           profile, kernel, n, t, guided)
+                        point.update(env=placement_env(placement), exclusive=True)
+                        points.append(point)
+        for rhs in rhs_counts:
+            for n in sizes:
+                for kernel in kernel_names:
+                    if not kernels.info(kernel)["batched"]: continue
+                    for t in threads:
+                        points.append(make_point([profile, "batched", kernels.result_key(kernel), f"N{n}", f"K{rhs}", f"T{t}"],
+                                                 profile, kernel, n, t, guided, rhs=rhs))
+    return points
+
+
+def point_key(point):
+    return "/".join(point["path"])
+
+
+def assign_cache_keys(points, build_dirs, sampling):
+    """Tags every point with the measurement-cache key of its exact configuration."""
+    digests, flags = {}, {}
+    env = measure_cache.run_environment()
+    host = measure_cache.host_fingerprint()
+    for point in points:
+        profile, binary = point["profile"], point["binary"]
+        if (profile, binary) not in digests:
+            digests[profile, binary] = measure_cache.file_digest(os.path.join(build_dirs[profile], binary))
+            flags[profile, binary] = compile_fingerprint(profile, COMPILER_PROFILES[profile], binary)
+        point["cache_key"] = measure_cache.make_key(
+            binary=digests[profile, binary], flags=flags[profile, binary], args=point["args"],
+            threads=point["threads"], env=dict(env, **point.get("env", {})), host=host, sampling=sampling)
+
+
+def point_schedule(point):
+    """OpenMP schedule a point runs with, '' for unscheduled kernels."""
+    return point["args"][1] if kernels.info(point["kernel"])["scheduled"] and len(point["args"]) > 1 else ""
+
+
+def point_chunk(point):
+    """Chunk size a scheduled point passes, -1 when it keeps the binary's per-schedule default."""
+    return int(point["args"][2]) if point_schedule(point) and len(point["args"]) > 2 else -1
+
+
+def point_placement(point):
+    """'<bind>_<places>' of a placement point, '' when OpenMP chooses the binding."""
+    env = point.get("env", {})
+    return f"{env['OMP_PROC_BIND']}_{env['OMP_PLACES']}" if "OMP_PROC_BIND" in env else ""
+
+
+# Fields cache_meta() records with every cached point; --cache-invalidate matches on these.
+CACHE_META_FIELDS = ("profile", "kernel", "binary", "n", "threads", "schedule", "placement", "rhs", "matrix", "path")
+
+
+def cache_meta(point):
+    return {"profile": point["profile"], "kernel": point["kernel"], "binary": point["binary"], "n": point["n"],
+            "threads": point["threads"], "schedule": point_schedule(point), "placement": point_placement(point),
+            "rhs": point.get("rhs", 1), "matrix": point.get("matrix", "heap"), "path": point_key(point)}
+
+
+# --- Memory planning ---
+
+def memory_budget(megabytes=None):
+    """Bytes of RAM the sweep may commit at once: --memory-budget-mb, or a fraction of what is available."""
+    if megabytes is not None:
+        return int(megabytes * 2 ** 20)
+    available = topology.memory()["available_kb"] * 1024
+    return int(available * MEMORY_BUDGET_FRACTION) if available else math.inf
+
+
+def footprint(point):
+    """Estimated peak resident bytes of one run: A, B and C plus the process overhead."""
+    return kernels.storage_bytes(point["kernel"], point["n"], point.get("rhs", 1)) + PROCESS_OVERHEAD_BYTES
+
+
+def plan_memory(points, budget, matrix_dir=None):
+    """Tags every point with its estimated 'memory' and returns the points that cannot run.
+
+    A point over the budget is moved to a file-backed matrix (matrix.h) when a
+    matrix_dir is given and its file system has room for A: only B, C and the
+    overhead then count against RAM, and the run is 'exclusive' so it does not
+    compete with other runs for the page cache. Any other point over the budget
+    is infeasible and gets an 'error' saying why; it is never launched.
+    """
+    disk_free = shutil.disk_usage(matrix_dir).free if matrix_dir else 0
+    infeasible = []
+    for point in points:
+        point["memory"] = footprint(point)
+        if point["memory"] <= budget:
+            continue
+        matrix = kernels.matrix_bytes(point["kernel"], point["n"])
+        if matrix_dir and point["memory"] - matrix <= budget and matrix <= disk_free:
+            point["memory"] -= matrix
+            point["env"] = dict(point.get("env", {}), HW2_MATRIX_DIR=matrix_dir)
+            point.update(exclusive=True, matrix="file")
+            continue
+        point["error"] = (f"needs ~{point['memory'] / 2 ** 20:.0f} MiB, over the {budget / 2 ** 20:.0f} MiB memory budget"
+                          + ("" if matrix_dir else "; --matrix-dir allows a file-backed matrix"))
+        infeasible.append(point)
+    return infeasible
+
+
+# --- Building ---
+
+def build_profile(profile, make_target):
+    """Builds one profile into its own directory so profiles can compile concurrently."""
+    build_dir = os.path.join(BUILD_ROOT, profile)
+    proc = subprocess.run(["make", make_target, f"BUILD_DIR={build_dir}"],
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        print(f"Error: make failed for target {make_target}. Skipping profile '{profile}'.")
+        print(proc.stdout + proc.stderr)
+        return None
+    return build_dir
+
+
+def compile_fingerprint(profile, make_target, binary=None):
+    """The exact compile commands for a profile, as printed by a forced dry run of make.
+
+    With binary, only the compile line that writes that binary (its "-o" output) is
+    kept, so changing how one kernel is built leaves the others' cache keys alone.
+    """
+    build_dir = os.path.join(BUILD_ROOT, profile)
+    proc = subprocess.run(["make", "-n", "-B", make_target, f"BUILD_DIR={build_dir}"],
+                          capture_output=True, text=True)
+    if binary is None:
+        return proc.stdout
+    output = os.path.join(build_dir, binary)
+    return "".join(line for line in proc.stdout.splitlines(keepends=True) if f" -o {output} " in f"{line.rstrip()} ")
+
+
+def build_all(profiles):
+    """Builds every requested profile in parallel and returns {profile: build_dir}."""
+    with ThreadPoolExecutor(max_workers=len(profiles) or 1) as pool:
+        futures = {p: pool.submit(build_profile, p, COMPILER_PROFILES[p]) for p in profiles}
+    return {p: f.result() for p, f in futures.items() if f.result()}
+
+
+# --- Running ---
+
+def parse_gflops(output):
+    for line in output.splitlines():
+        if line.startswith("Performance"):
+            return line.split()[-1]
+    return ""
+
+
+def run_once(point, build_dir, use_perf=False):
+    """Runs one benchmark binary; returns (Gflop/s string, metrics, error or None)."""
+    env = dict(os.environ, OMP_NUM_THREADS=str(point["threads"]), **point.get("env", {}))
+    cmd = [os.path.join(build_dir, point["binary"])] + point["args"]
+    _, output, metrics, error = instrument.run_instrumented(cmd, env, RUN_TIMEOUT_SEC, use_perf)
+    gflops = "" if error else parse_gflops(output)
+    if not error and not gflops:
+        error = "no 'Performance' line in output"
+    if not error:
+        metrics["rel_error"], error = reference.validate(point["kernel"], point["n"], output, point.get("rhs", 1))
+    if error:
+        print(f"Warning: {' '.join(cmd)} failed: {error}")
+    return gflops, metrics, error
+
+
+def run_point(point, build_dir, sampling):
+    """Samples one point adaptively and returns its stats.summarize() record.
+
+    Stable points stop after the minimum sample count; noisy ones keep going until
+    their median is pinned down or the per-point time budget is spent.
+    """
+    samples, metrics, rel_errors, error = [], [], [], None
+    start = time.monotonic()
+    while len(samples) < sampling["max_samples"]:
+        gflops, run_metrics, error = run_once(point, build_dir, sampling.get("perf", False))
+        if error and error.startswith("checksum mismatch"):
+            samples, metrics = [], []  # A wrong answer invalidates the configuration, not just this run.
+        if error:
+            break  # A failed run is not retried; report whatever was collected.
+        samples.append(float(gflops))
+        rel_errors.append(run_metrics.pop("rel_error"))
+        metrics.append(run_metrics)
+        if (len(samples) >= sampling["min_samples"]
+                and stats.relative_ci_width(samples) <= sampling["ci_width"]):
+            break
+        if time.monotonic() - start >= sampling["budget"]:
+            break
+    record = stats.summarize(samples)
+    if metrics:
+        resources = stats.median_metrics(metrics)
+        counters = resources.pop("counters", None)
+        record["resources"] = resources
+        if counters: record["counters"] = counters
+        record["checksum_rel_error"] = max(rel_errors)
+    if error and not samples:
+        record["error"] = error
+    return record
+
+
+def measure_bandwidth(build_dir, thread_counts, cache, elements, use_cache=True):
+    """Runs the stream probe alone at each thread count; returns {'T<t>': {'copy', 'triad'}}.
+
+    These runs saturate memory, so they are made serially before the sweep
+    rather than packed alongside other benchmarks.
+    """
+    binary = os.path.join(build_dir, "stream")
+    digest = measure_cache.file_digest(binary)
+    env, host = measure_cache.run_environment(), measure_cache.host_fingerprint()
+    bandwidth = {}
+    for t in thread_counts:
+        key = measure_cache.make_key(binary=digest, args=[str(elements)], threads=t, env=env, host=host)
+        record = cache.get(key) if use_cache else None
+        if record is None:
+            proc = subprocess.run([binary, str(elements)], capture_output=True, text=True,
+                                  env=dict(os.environ, OMP_NUM_THREADS=str(t)), timeout=RUN_TIMEOUT_SEC)
+            record = roofline.parse_stream(proc.stdout) if proc.returncode == 0 else None
+            if record and use_cache:
+                cache.put(key, record, {"binary": "stream", "threads": t, "n": elements})
+        print(f"Bandwidth T={t}: " + (f"copy {record['copy']:.1f} GB/s, triad {record['triad']:.1f} GB/s" if record else "FAILED"))
+        bandwidth[f"T{t}"] = record or {}
+    return bandwidth
+
+
+def prepare_references(points):
+    """Computes the NumPy reference checksums of every point up front.
+
+    The float64 reference (and any BLAS threads it uses) would otherwise be built
+    lazily inside the run_queue() workers, on cores handed to running benchmarks,
+    so like the bandwidth probe it runs serially before the sweep.
+    """
+    for kernel, n, rhs in sorted({(p["kernel"], p["n"], p.get("rhs", 1)) for p in points}):
+        reference.reference_checksums(kernel, n, rhs)
+
+
+def measure_numpy_baseline(sizes, shapes, cache, use_cache=True):
+    """Times the NumPy/BLAS version of each matrix shape at each size; returns {shape: {'N<n>': record}}.
+
+    Like the bandwidth probe, these run serially in this process before the sweep.
+    """
+    env, host = measure_cache.run_environment(), measure_cache.host_fingerprint()
+    baseline = {}
+    for shape in shapes:
+        for n in sizes:
+            key = measure_cache.make_key(numpy=np.__version__, shape=shape, n=n, repeats=reference.BASELINE_REPEATS,
+                                         env=env, host=host)
+            record = cache.get(key) if use_cache else None
+            if record is None:
+                record = reference.numpy_baseline(shape, n)
+                if use_cache:
+                    cache.put(key, record, {"binary": "numpy", "shape": shape, "n": n})
+            print(f"NumPy baseline {shape} N={n}: {record['gflops']} Gflop/s")
+            baseline.setdefault(shape, {})[f"N{n}"] = record
+    return baseline
+
+
+def run_queue(points, build_dirs, max_cores, on_result, sampling, run=run_point, memory=math.inf):
+    """Runs points concurrently without ever committing more threads than max_cores
+    or more estimated memory (see plan_memory()) than the memory budget.
+
+    Points are dispatched largest-first; whenever the biggest pending run does not
+    fit in the free cores and memory, smaller runs are packed into the gap. A run
+    that asks for more threads than the machine has, or an 'exclusive' (pinned or
+    file-backed) run, is started alone. With run=run_sweep the queue holds
+    plan_sweeps() jobs instead.
+    """
+    pending = sorted(points, key=lambda p: p["threads"], reverse=True)
+    free, free_memory = max_cores, memory
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_cores) as pool:
+        while pending or running:
+            launched = True
+            while launched and pending:
+                launched = False
+                for i, point in enumerate(pending):
+                    cost = max_cores if point.get("exclusive") else min(point["threads"], max_cores)
+                    size = point.get("memory", 0)
+                    # An idle machine always takes the next run, even one estimated over the budget.
+                    if cost <= free and (size <= free_memory or not running):
+                        free -= cost
+                        free_memory -= size
+                        future = pool.submit(run, point, build_dirs[point["profile"]], sampling)
+                        running[future] = (point, cost)
+                        del pending[i]
+                        launched = True
+                        break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                point, cost = running.pop(future)
+                free += cost
+                free_memory += point.get("memory", 0)
+                on_result(point, future.result())
+
+
+# --- Single-process sweeps ---
+
+def plan_sweeps(points):
+    """Groups points into jobs that one --sweep process can measure (see sweep.h).
+
+    A job shares the profile, kernel, matrix size, right-hand-side count and OpenMP
+    binding env; its points differ only in thread count, schedule and chunk size. Jobs carry
+    'threads' (their largest run), 'memory' and 'exclusive' so run_queue can
+    schedule them like points. Weak-scaling points that coincide with a strong-scaling
+    configuration share its measurements.
+    """
+    jobs = {}
+    for point in points:
+        key = (point["profile"], point["kernel"], point["n"], point.get("rhs", 1),
+               tuple(sorted(point.get("env", {}).items())))
+        job = jobs.setdefault(key, {"profile": point["profile"], "points": [], "threads": 0, "memory": 0,
+                                    "exclusive": False})
+        job["points"].append(point)
+        job["threads"] = max(job["threads"], point["threads"])
+        job["memory"] = max(job["memory"], point.get("memory", 0))
+        job["exclusive"] = job["exclusive"] or point.get("exclusive", False)
+    return list(jobs.values())
+
+
+def sweep_command(job, build_dir, sampling):
+    first = job["points"][0]
+    cmd = [os.path.join(build_dir, first["binary"]), str(first["n"]), "--sweep",
+           "threads=" + ",".join(str(t) for t in sorted({p["threads"] for p in job["points"]})),
+           f"repeats={sampling['max_samples']}", f"budget={sampling['budget']:g}",
+           f"min={max(sampling['min_samples'], 1)}", f"ci={sampling['ci_width']:g}"]
+    if kernels.info(first["kernel"])["scheduled"]:
+        cmd.append("schedules=" + ",".join(sorted({point_schedule(p) + (f":{point_chunk(p)}" if point_chunk(p) >= 0 else "")
+                                                   for p in job["points"]})))
+    if first.get("rhs", 1) > 1:
+        cmd.append(f"k={first['rhs']}")
+    return cmd
+
+
+def run_sweep(job, build_dir, sampling):
+    """Measures every point of a job in one --sweep process; returns [(point, record), ...].
+
+    The binary streams one JSON line per timed call, and each line is checked
+    against the NumPy reference as it arrives. As in run_point(), a checksum
+    mismatch discards that configuration's samples. The binary applies the same
+    adaptive stopping rule as run_point() to each configuration (min_samples,
+    ci_width, max_samples, per-point budget), but the rule only sees Gflop/s: a
+    configuration whose checksum fails keeps sampling to the end and is discarded
+    afterwards, where run_point() would stop at the first failure. The process's
+    rusage is shared by all of its points, and perf is not used.
+    """
+    first = job["points"][0]
+    kernel, n, rhs = first["kernel"], first["n"], first.get("rhs", 1)
+    samples, rel_errors, errors = {}, {}, {}
+
+    def on_line(line):
+        try:
+            measurement = json.loads(line)
+        except json.JSONDecodeError:
+            return  # Not a measurement, e.g. a runtime warning.
+        if not isinstance(measurement, dict) or "checksum" not in measurement:
+            return
+        config = (measurement["threads"], measurement["schedule"], measurement.get("chunk", -1))
+        if config in errors:
+            return
+        rel_error, error = reference.check(kernel, n, measurement["checksum"], rhs)
+        if error:
+            errors[config] = error
+            samples.pop(config, None)
+        else:
+            samples.setdefault(config, []).append(float(measurement["gflops"]))
+            rel_errors.setdefault(config, []).append(rel_error)
+
+    cmd = sweep_command(job, build_dir, sampling)
+    env = dict(os.environ, OMP_NUM_THREADS=str(job["threads"]), **first.get("env", {}))
+    timeout = RUN_TIMEOUT_SEC + len(job["points"]) * sampling["budget"]
+    _, _, metrics, error = instrument.run_instrumented(cmd, env, timeout, on_line=on_line)
+    if error:
+        print(f"Warning: {' '.join(cmd)} failed: {error}")
+    results = []
+    for point in job["points"]:
+        config = (point["threads"], point_schedule(point), point_chunk(point))
+        record = stats.summarize(samples.get(config, []))
+        if record["samples"]:
+            record["resources"] = {"max_rss_kb": metrics["max_rss_kb"]}
+            record["checksum_rel_error"] = max(rel_errors[config])
+        else:
+            record["error"] = errors.get(config) or error or "no measurement in --sweep output"
+        results.append((point, record))
+    return results
+
+
+# --- Model-guided pruning ---
+
+def curve_key(point):
+    """Points of one scaling curve share their whole path except the thread count."""
+    return tuple(point["path"][:-1])
+
+
+def split_anchors(todo, points, count=PRUNE_ANCHORS):
+    """Splits todo into (anchors, rest): anchors are todo points at count thread counts of
+    their curve, spread evenly over its sorted thread counts with both ends included."""
+    threads = {}
+    for point in points:
+        threads.setdefault(curve_key(point), set()).add(point["threads"])
+    anchors = {}
+    for key, values in threads.items():
+        values = sorted(values)
+        anchors[key] = {values[i] for i in np.linspace(0, len(values) - 1, min(count, len(values))).round().astype(int)}
+    chosen = [p for p in todo if p["threads"] in anchors[curve_key(p)]]
+    return chosen, [p for p in todo if p["threads"] not in anchors[curve_key(p)]]
+
+
+def prune(candidates, points, done, tolerance=PRUNE_TOLERANCE):
+    """Returns {point_key: record} for the candidates their curve's fit already predicts.
+
+    Each curve is fitted on its measured points with models.fit_curve(). If its best
+    model predicts every measured point from the others within tolerance
+    (models.leave_one_out_error()), its candidates get a 'predicted' record with the
+    model's Gflop/s instead of running. Anchors include both ends of every curve, so
+    predictions only interpolate.
+    """
+    by_curve = {}
+    for point in points:
+        by_curve.setdefault(curve_key(point), []).append(point)
+    wanted = {point_key(p) for p in candidates}
+    predicted = {}
+    for members in by_curve.values():
+        pending = [p for p in members if point_key(p) in wanted]
+        measured = [(p["threads"], done[point_key(p)]["median"]) for p in members if point_key(p) in done]
+        if not pending or len(measured) < 3:
+            continue
+        threads, gflops = zip(*measured)
+        curve = models.fit_curve(threads, gflops, weak=members[0]["weak"])
+        error = models.leave_one_out_error(threads, gflops, curve["best"])
+        if error > tolerance:
+            continue
+        best = curve["fits"][curve["best"]]
+        for point in pending:
+            record = unmeasured_record(point, "predicted")
+            record.update(predicted_gflops=round(float(models.predict(best, point["threads"])), 4),
+                          model=curve["best"], loo_error=round(error, 4))
+            predicted[point_key(point)] = record
+    return predicted
+
+
+# --- Persistence ---
+
+def load_journal(path):
+    """Returns {point_key: (cache_key, record)} for every successful point in the journal.
+
+    A sweep killed mid-write can leave a truncated last line; it is ignored and
+    that point simply runs again.
+    """
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if entry.get("stats", {}).get("samples"):
+                done["/".join(entry["path"])] = (entry.get("cache_key"), entry["stats"])
+    return done
+
+
+def append_journal(f, point, record):
+    f.write(json.dumps({"path": point["path"], "cache_key": point["cache_key"], "stats": record}) + "\n")
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def unmeasured_record(point, status, error=None):
+    """Leaf of a point without samples: 'infeasible', 'failed', 'predicted' or 'not run', with its estimated memory."""
+    record = dict(stats.summarize([]), status=status, memory_bytes=point.get("memory"))
+    if error:
+        record["error"] = error
+    return record
+
+
+def leaf_value(point, record):
+    if record.get("samples"):
+        record = dict(record, gbps=round(roofline.achieved_bandwidth(point["kernel"], point["n"], record["median"],
+                                                                     point.get("rhs", 1)), 4))
+        if point.get("matrix") == "file":
+            record["matrix"] = "file"
+    if point.get("tuned"):
+        record = dict(record, **point["tuned"])
+    if point["weak"]:
+        return dict({"n": str(point["n"])}, **record)
+    return record
+
+
+def assemble_results(points, done, host=None, unmeasured=None):
+    """Builds the nested general_perf / weak_scaling layout that report.py reads.
+
+    Points missing from done take their record from unmeasured, or are marked 'not run'.
+    """
+    results = {"host": host} if host else {}
+    unmeasured = unmeasured or {}
+    for point in points:
+        node = results
+        for key in point["path"][:-1]:
+            node = node.setdefault(key, {})
+        key = point_key(point)
+        record = done.get(key) or unmeasured.get(key) or unmeasured_record(point, "not run")
+        node[point["path"][-1]] = leaf_value(point, record)
+    return results
+
+
+def write_json_atomic(path, obj):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(obj, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def describe(point):
+    kind = "weak scaling " if point["weak"] else ""
+    extra = f", S={point_schedule(point)}" if point_schedule(point) else ""
+    extra += f", K={point['rhs']}" if point.get("rhs", 1) > 1 else ""
+    if point_placement(point):
+        extra += f", bind={point['env']['OMP_PROC_BIND']}, places={point['env']['OMP_PLACES']}"
+    extra += ", file-backed" if point.get("matrix") == "file" else ""
+    return f"[{point['profile']}] {kind}{point['binary']}: N={point['n']}, T={point['threads']}{extra}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Runs the HW2 benchmark sweep in parallel and writes results.json.")
+    parser.add_argument("--profiles", nargs="+", default=list(COMPILER_PROFILES), choices=list(COMPILER_PROFILES))
+    parser.add_argument("--sizes", nargs="+", type=int, default=MATRIX_SIZES)
+    parser.add_argument("--threads", nargs="+", type=int, default=THREAD_COUNTS)
+    parser.add_argument("--schedules", nargs="+", default=SCHEDULES, choices=SCHEDULES)
+    parser.add_argument("--kernels", nargs="+", default=list(kernels.KERNELS), choices=list(kernels.KERNELS))
+    parser.add_argument("--placements", nargs="*", choices=PLACEMENTS, metavar="BIND_PLACES",
+                        help="Opt-in placement sweep: OMP_PROC_BIND/OMP_PLACES combinations to run, e.g. close_cores "
+                             f"spread_sockets, or no values for all {len(PLACEMENTS)}. Placement runs are pinned and run "
+                             "one at a time on the whole machine, so every combination costs about a full serial sweep.")
+    parser.add_argument("--rhs", nargs="*", type=int, metavar="K",
+                        help="Opt-in batched sweep: right-hand-side counts k to run hw2-a and hw2-b with, or no values "
+                             f"for {' '.join(map(str, RHS_COUNTS))}. Each k adds a full strong-scaling grid of both "
+                             "kernels (profiles x sizes x threads points, hw2-b at its default schedule).")
+    parser.add_argument("--tuned", nargs="?", const="", metavar="TABLE",
+                        help="Also run hw2-b once per profile and size at the schedule, chunk and thread count "
+                             "'tuner.py tune' found (from TABLE, default tuning.json), under each profile's 'tuned' section.")
+    parser.add_argument("--max-cores", type=int, default=available_cores(),
+                        help="Upper bound on the total threads of concurrently running benchmarks.")
+    parser.add_argument("--memory-budget-mb", type=float,
+                        help="Upper bound on the estimated memory of concurrently running benchmarks; "
+                             f"default {MEMORY_BUDGET_FRACTION * 100:.0f}%% of the RAM available at startup.")
+    parser.add_argument("--matrix-dir",
+                        help="Directory for file-backed matrices (HW2_MATRIX_DIR): points over the memory budget "
+                             "map A from a temporary file there instead of being marked infeasible.")
+    parser.add_argument("--output", default=RESULTS_FILE)
+    parser.add_argument("--journal", default=JOURNAL_FILE)
+    parser.add_argument("--fresh", action="store_true", help="Discard the journal and rerun every point.")
+    parser.add_argument("--min-samples", type=int, default=MIN_SAMPLES)
+    parser.add_argument("--max-samples", type=int, default=MAX_SAMPLES)
+    parser.add_argument("--ci-width", type=float, default=CI_TARGET_WIDTH,
+                        help="Stop sampling a point once its median CI is this narrow, relative to the median.")
+    parser.add_argument("--point-budget", type=float, default=POINT_BUDGET_SEC,
+                        help="Maximum seconds spent sampling a single point.")
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor write the measurement cache.")
+    parser.add_argument("--cache-invalidate", nargs="*", metavar="FIELD=VALUE",
+                        help=f"Drop cached measurements matching all FIELD=VALUE pairs ({', '.join(CACHE_META_FIELDS)}) "
+                             "before the sweep; with no pairs, clear the whole cache.")
+    parser.add_argument("--cache-max-mb", type=float, default=measure_cache.MAX_CACHE_BYTES / 2 ** 20)
+    parser.add_argument("--no-bandwidth", action="store_true", help="Skip the STREAM bandwidth measurement.")
+    parser.add_argument("--single-process", action="store_true",
+                        help="Measure all thread counts and schedules of a kernel and size in one process "
+                             "(the binaries' --sweep mode) instead of one process per run. Much faster at large N; "
+                             "each configuration is sampled with the same --min-samples/--ci-width/--max-samples/"
+                             "--point-budget rule, but without perf counters and with one rusage record per process.")
+    parser.add_argument("--prune", action="store_true",
+                        help=f"Run {PRUNE_ANCHORS} thread counts of every scaling curve first and skip the rest of a curve "
+                             "when a fitted scaling model already predicts it (see --prune-tolerance).")
+    parser.add_argument("--prune-tolerance", type=float, default=PRUNE_TOLERANCE,
+                        help="Largest leave-one-out relative error of a curve's fit for its remaining points to be skipped.")
+    parser.add_argument("--no-perf", action="store_true",
+                        help="Do not wrap runs in 'perf stat' even when it is available.")
+    parser.add_argument("--stream-elements", type=int, default=STREAM_ELEMENTS)
+    parser.add_argument("--no-numpy-baseline", action="store_true",
+                        help="Skip timing the NumPy/BLAS reference kernels used as a baseline in the report.")
+    parser.add_argument("--history-db", default=history.HISTORY_DB,
+                        help="SQLite database every completed sweep is recorded in.")
+    parser.add_argument("--no-history", action="store_true", help="Do not record this sweep in the history database.")
+    parser.add_argument("--label", default="", help="Free-form note stored with this sweep in the history database.")
+    args = parser.parse_args(argv)
+    for pair in args.cache_invalidate or []:
+        field, sep, _ = pair.partition("=")
+        if not sep:
+            parser.error(f"--cache-invalidate expects FIELD=VALUE pairs, got '{pair}'")
+        if field not in CACHE_META_FIELDS:
+            parser.error(f"--cache-invalidate: unknown field '{field}' (choose from {', '.join(CACHE_META_FIELDS)})")
+    sampling = {"min_samples": args.min_samples, "max_samples": max(args.max_samples, 1),
+                "ci_width": args.ci_width, "budget": args.point_budget,
+                "perf": not args.no_perf and not args.single_process and instrument.perf_available()}
+    if args.single_process:
+        sampling["single_process"] = True  # Measured differently, so cached per-process results do not apply.
+
+    if args.fresh and os.path.exists(args.journal):
+        os.remove(args.journal)
+    cache = measure_cache.MeasurementCache(max_bytes=int(args.cache_max_mb * 2 ** 20))
+    if args.cache_invalidate is not None:
+        match = dict(pair.split("=", 1) for pair in args.cache_invalidate)
+        print(f"--- Invalidated {cache.invalidate(**match)} cached measurements ---")
+
+    print("--- Compiling profiles ---")
+    build_dirs = build_all(args.profiles)
+    if not build_dirs:
+        print("Error: no profile could be built.")
+        return 1
+
+    placements = PLACEMENTS if args.placements == [] else args.placements or []
+    rhs_counts = RHS_COUNTS if args.rhs == [] else args.rhs or []
+    profiles = [p for p in args.profiles if p in build_dirs]
+    points = plan_points(profiles, args.sizes, args.threads, args.schedules, placements, args.kernels, rhs_counts)
+    if args.tuned is not None:
+        import tuner  # Deferred: tuner imports this module.
+        points += tuner.tuned_points(profiles, args.sizes, args.tuned or tuner.TUNING_FILE)
+    budget = memory_budget(args.memory_budget_mb)
+    # Before the cache keys: a file-backed point runs with HW2_MATRIX_DIR in its env.
+    unmeasured = {point_key(p): unmeasured_record(p, "infeasible", p["error"])
+                  for p in plan_memory(points, budget, args.matrix_dir)}
+    assign_cache_keys(points, build_dirs, sampling)
+    host = {"topology": topology.detect(), "memory_budget_bytes": budget if budget != math.inf else None}
+    print(f"--- Host: {topology.describe(host['topology'])} ---")
+    file_backed = sum(p.get("matrix") == "file" for p in points)
+    if unmeasured or file_backed:
+        print(f"--- Memory budget {budget / 2 ** 20:.0f} MiB: {file_backed} points use a file-backed matrix, "
+              f"{len(unmeasured)} are infeasible ---")
+    if not args.no_bandwidth:
+        print("--- Measuring memory bandwidth ---")
+        host["bandwidth"] = measure_bandwidth(next(iter(build_dirs.values())), args.threads, cache,
+                                              args.stream_elements, use_cache=not args.no_cache)
+    if not args.no_numpy_baseline:
+        print("--- Timing NumPy/BLAS baseline ---")
+        shapes = sorted({kernels.info(k)["shape"] for k in args.kernels})
+        # The baseline holds A in this process, so it skips sizes whose peak footprint does not fit the budget.
+        sizes = [n for n in args.sizes if reference.baseline_bytes(n) <= budget]
+        host["numpy_baseline"] = measure_numpy_baseline(sizes, shapes, cache, use_cache=not args.no_cache)
+    # A journal entry only counts if it was measured with the current binary and settings.
+    journaled = load_journal(args.journal)
+    done = {point_key(p): journaled[point_key(p)][1] for p in points
+            if journaled.get(point_key(p), (None,))[0] == p["cache_key"]}
+    todo, cached = [], 0
+    for point in points:
+        if point_key(point) in done:
+            continue
+        record = None if args.no_cache else cache.get(point["cache_key"])
+        if record:
+            done[point_key(point)] = record
+            cached += 1
+        elif point_key(point) not in unmeasured:
+            todo.append(point)
+    skipped = sum(key not in done for key in unmeasured)
+    print(f"--- {len(points)} points planned, {len(points) - len(todo) - cached - skipped} already in journal, "
+          f"{cached} from measurement cache, {skipped} infeasible, running {len(todo)} on up to {args.max_cores} cores ---")
+    prepare_references(todo)
+
+    with open(args.journal, "a+") as journal:
+        # Terminate a line truncated by a crash so the next entry starts cleanly.
+        if journal.tell() > 0:
+            journal.seek(journal.tell() - 1)
+            if journal.read(1) != "\n":
+                journal.write("\n")
+        def on_result(point, record):
+            if record["samples"]:
+                print(f"{describe(point)} -> {record['gflops']} "
+                      f"[{record['ci_low']:g}, {record['ci_high']:g}] n={record['samples']}")
+                done[point_key(point)] = record
+                if not args.no_cache:
+                    cache.put(point["cache_key"], record, cache_meta(point))
+            else:
+                print(f"{describe(point)} -> FAILED ({record.get('error', 'unknown error')})")
+                unmeasured[point_key(point)] = unmeasured_record(point, "failed", record.get("error"))
+            append_journal(journal, point, record)
+
+        def on_job(job, results):
+            for point, record in results:
+                on_result(point, record)
+
+        def run_points(batch):
+            if args.single_process:
+                jobs = plan_sweeps(batch)
+                print(f"--- Single-process mode: {len(jobs)} benchmark processes ---")
+                run_queue(jobs, build_dirs, args.max_cores, on_job, sampling, run=run_sweep, memory=budget)
+            else:
+                run_queue(batch, build_dirs, args.max_cores, on_result, sampling, memory=budget)
+
+        try:
+            if args.prune:
+                anchors, rest = split_anchors(todo, points)
+                print(f"--- Pruning: running {len(anchors)} anchor points first ---")
+                run_points(anchors)
+                predicted = prune(rest, points, done, args.prune_tolerance)
+                unmeasured.update(predicted)
+                rest = [p for p in rest if point_key(p) not in predicted]
+                print(f"--- Pruning: {len(predicted)} points predicted within {args.prune_tolerance:.0%}, "
+                      f"running the remaining {len(rest)} ---")
+                run_points(rest)
+            else:
+                run_points(todo)
+        finally:
+            results = assemble_results(points, done, host, unmeasured)
+            write_json_atomic(args.output, results)
+            if not args.no_cache:
+                cache.evict()
+
+    print(f"--- Benchmark complete. Results saved to {args.output} ---")
+    if not args.no_history:
+        flags = {p: compile_fingerprint(p, COMPILER_PROFILES[p]) for p in build_dirs}
+        try:
+            run_id = history.record_run(results, flags, args.history_db, args.label)
+            print(f"--- Recorded as run {run_id} in {args.history_db}; compare with 'python history.py compare' ---")
+        except sqlite3.Error as e:
+            print(f"Warning: could not record the sweep in {args.history_db}: {e}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
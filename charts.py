@@ -0,0 +1,290 @@
+"""
+Chart rendering for report.py, parallel and content-addressed.
+
+Each chart is first described as a plain, JSON-serializable spec holding exactly
+the data slice and plot parameters it needs. The spec's hash names the PNG in
+CHART_CACHE_DIR, so a chart is only redrawn when its inputs change. Charts that
+are not cached are rendered in a process pool with the non-interactive Agg
+backend; matplotlib is only imported inside the workers. Reuse refreshes an
+image's mtime and evict_charts() then drops the least recently used images once
+the cache outgrows CHART_CACHE_MAX_BYTES, as measure_cache does for measurements.
+"""
+
+import hashlib
+import json
+import math
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import kernels
+import models
+
+CHART_CACHE_DIR = ".chart_cache"
+CHART_CACHE_MAX_BYTES = 32 * 1024 * 1024
+# Bump when the rendering code changes so stale images are not reused.
+CHART_STYLE_VERSION = 1
+
+
+def _series(rows, label, marker='o', linestyle='-'):
+    return {
+        'label': label,
+        'x': rows['threads'].tolist(),
+        'y': rows['gflops'].tolist(),
+        'ci_low': rows['ci_low'].tolist(),
+        'ci_high': rows['ci_high'].tolist(),
+        'marker': marker,
+        'linestyle': linestyle,
+    }
+
+
+def _ideal(rows, label):
+    """Linear extrapolation from the single-thread point, or None if T1 is missing."""
+    t1 = rows[rows['threads'] == 1]
+    if not len(t1): return None
+    return {'label': label, 'x': rows['threads'].tolist(),
+            'y': (t1['gflops'][0] * rows['threads']).tolist()}
+
+
+def _fitted(rows, kernel, is_weak):
+    """Best models.py fit of a curve, drawn smoothly across its thread range, or None with too few points."""
+    curve = models.fit_curve(rows['threads'].tolist(), rows['gflops'].tolist(), weak=is_weak)
+    if not curve: return None
+    x = np.geomspace(rows['threads'].min(), rows['threads'].max(), 40)
+    return {'label': f'Fitted model ({kernels.short_label(kernel)})', 'x': x.tolist(),
+            'y': models.predict(curve['fits'][curve['best']], x).tolist(), 'marker': '', 'linestyle': '-.', 'color': 'gray'}
+
+
+def schedule_chart_spec(data, profile, kernel='hw2_b'):
+    """Spec for the per-size schedule comparison of one scheduled kernel and profile."""
+    index = data.index('scaling', 'kernel', 'profile', 'N', 'schedule')
+    keys = [(n, sched) for (scaling, k, p, n, sched) in index if (scaling, k, p) == ('strong', kernel, profile)]
+    if not keys: return None
+    panels = []
+    for size in sorted({n for n, _ in keys}):
+        series = []
+        for schedule in sorted({s for _, s in keys}):
+            rows = data.series(scaling='strong', kernel=kernel, profile=profile, N=size, schedule=schedule)
+            if len(rows): series.append(_series(rows, schedule.title()))
+        panels.append({'title': f'N = {size}', 'ideal': None, 'series': series})
+    return {'title': f"Scheduling Strategy Performance for {kernels.info(kernel)['binary']}", 'panels': panels}
+
+
+def scaling_chart_spec(data, profile, title, is_weak=False):
+    """Spec for the strong or weak scaling comparison of every kernel at its headline schedule.
+
+    The kernel that anchors the ideal line also gets its best fitted scaling model.
+    Strong-scaling panels also show the NumPy/BLAS Gflop/s at that size as flat lines.
+    """
+    scaling = 'weak' if is_weak else 'strong'
+    headline = data.headline(scaling, profile)
+    sizes = sorted(set(headline['N'].tolist()))
+    if not sizes: return None
+    present = kernels.ordered(set(headline['kernel'].tolist()))
+    # Ideal line: weak scaling extrapolates from hw2-b, strong scaling from hw2-a.
+    preferred = 'hw2_b' if is_weak else 'hw2_a'
+    ideal_kernel = preferred if preferred in present else present[0]
+    panels = []
+    for size in sizes:
+        at_size = headline[headline['N'] == size]
+        series, ideal, threads = [], None, sorted(set(at_size['threads'].tolist()))
+        for kernel in present:
+            rows = at_size[at_size['kernel'] == kernel]
+            rows = rows[np.argsort(rows['threads'], kind='stable')]
+            if not len(rows): continue
+            series.append(_series(rows, kernels.label(kernel), *kernels.style(kernel)))
+            if kernel == ideal_kernel:
+                ideal = _ideal(rows, 'Ideal Scaling' if is_weak else 'Ideal Speedup')
+                fitted = _fitted(rows, kernel, is_weak)
+                if fitted: series.append(fitted)
+        if not is_weak:
+            for shape, color in (('dense', 'tab:blue'), ('triangular', 'tab:orange')):
+                baseline = data.numpy_baseline.get(shape, {}).get(size)
+                if baseline and threads:
+                    series.append({'label': f'NumPy/BLAS {shape}', 'x': threads, 'y': [baseline] * len(threads),
+                                   'marker': '', 'linestyle': ':', 'color': color})
+        panels.append({'title': f'Base N = {size}' if is_weak else f'N = {size}', 'ideal': ideal, 'series': series})
+    return {'title': title, 'panels': panels}
+
+
+def placement_chart_spec(data, profile):
+    """Spec comparing OMP_PROC_BIND/OMP_PLACES combinations, one panel per kernel and size."""
+    index = data.index('scaling', 'kernel', 'profile', 'N', 'placement')
+    keys = sorted((kernel, n, placement) for (sc, kernel, p, n, placement) in index
+                  if (sc, p) == ('placement', profile))
+    if not keys: return None
+    panels = []
+    for kernel, size in sorted({(k, n) for k, n, _ in keys}):
+        series = []
+        for placement in sorted({pl for k, n, pl in keys if (k, n) == (kernel, size)}):
+            rows = data.series(scaling='placement', kernel=kernel, profile=profile, N=size, placement=placement)
+            bind, places = placement.split('_', 1)
+            series.append(_series(rows, f'{bind} / {places}'))
+        label = kernels.short_label(kernel)
+        panels.append({'title': f'{label}, N = {size}', 'ideal': None, 'series': series})
+    return {'title': f"Thread Placement (OMP_PROC_BIND / OMP_PLACES, '{profile}' profile)",
+            'legend_per_panel': True, 'panels': panels}
+
+
+def batched_chart_spec(data, profile):
+    """Spec for Gflop/s and effective GB/s vs right-hand-side count k, one pair of panels per size.
+
+    Each point is the best thread count for that k. The GB/s panels also show the
+    peak triad bandwidth when it was measured.
+    """
+    index = data.index('scaling', 'kernel', 'profile', 'N')
+    keys = sorted((kernel, n) for (sc, kernel, p, n) in index if (sc, p) == ('batched', profile))
+    if not keys: return None
+    peak_bw = max((v['triad'] for v in data.bandwidth.values()), default=None)
+    panels = []
+    for size in sorted({n for _, n in keys}):
+        gflops_panel = {'title': f'N = {size}: throughput', 'ideal': None, 'series': [],
+                        'xlabel': 'Right-hand sides k', 'xscale': 'log'}
+        gbps_panel = {'title': f'N = {size}: effective bandwidth', 'ideal': None, 'series': [],
+                      'xlabel': 'Right-hand sides k', 'ylabel': 'GB/s', 'xscale': 'log'}
+        for kernel in kernels.ordered({k for k, n in keys if n == size}):
+            rows = data.select(scaling='batched', kernel=kernel, profile=profile, N=size)
+            best = [rows[rows['rhs'] == k] for k in sorted(set(rows['rhs'].tolist()))]
+            best = np.array([r[r['gflops'].argmax()] for r in best], dtype=rows.dtype)
+            marker, linestyle = kernels.style(kernel)
+            series = {'label': kernels.label(kernel), 'x': best['rhs'].tolist(), 'marker': marker, 'linestyle': linestyle}
+            gflops_panel['series'].append(dict(series, y=best['gflops'].tolist(), ci_low=best['ci_low'].tolist(),
+                                               ci_high=best['ci_high'].tolist()))
+            gbps_panel['series'].append(dict(series, y=best['gbps'].tolist()))
+        if peak_bw:
+            ks = sorted({x for s in gbps_panel['series'] for x in s['x']})
+            gbps_panel['series'].append({'label': f'Peak triad bandwidth ({peak_bw:.1f} GB/s)', 'x': ks, 'y': [peak_bw] * len(ks),
+                                         'marker': '', 'linestyle': '--', 'color': 'k'})
+        panels += [gflops_panel, gbps_panel]
+    return {'title': f"Batched Right-Hand Sides ('{profile}' profile)", 'legend_per_panel': True, 'panels': panels}
+
+
+def counters_chart_spec(data, profile):
+    """Spec for IPC and cache-miss rate vs threads of every kernel at its headline schedule.
+
+    Returns None when the results carry no hardware counters (perf was unavailable).
+    """
+    rows = data.headline('strong', profile)
+    rows = rows[~np.isnan(rows['ipc'])]
+    if not len(rows): return None
+    panels = [{'title': 'Instructions per cycle', 'ideal': None, 'series': [], 'ylabel': 'IPC'},
+              {'title': 'Cache-miss rate', 'ideal': None, 'series': [], 'ylabel': 'cache-misses / cache-references'}]
+    for kernel in kernels.ordered(set(rows['kernel'].tolist())):
+        label = kernels.label(kernel)
+        for size in sorted(set(rows['N'][rows['kernel'] == kernel].tolist())):
+            sel = rows[(rows['kernel'] == kernel) & (rows['N'] == size)]
+            sel = sel[sel['threads'].argsort()]
+            for panel, column in zip(panels, ('ipc', 'cache_miss_rate')):
+                panel['series'].append({'label': f'{label} N={size}', 'x': sel['threads'].tolist(),
+                                        'y': sel[column].tolist(), 'marker': 'o', 'linestyle': '-'})
+    return {'title': f"Hardware Counters ('{profile}' profile)", 'legend_per_panel': True, 'panels': panels}
+
+
+def chart_path(spec):
+    payload = json.dumps([CHART_STYLE_VERSION, spec], sort_keys=True).encode()
+    return os.path.join(CHART_CACHE_DIR, hashlib.sha256(payload).hexdigest()[:32] + ".png")
+
+
+def render_chart(spec, path):
+    """Draws one spec to path (atomically). Runs inside a worker process."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    try:
+        panels = spec['panels']
+        ncols = 2
+        nrows = math.ceil(len(panels) / ncols)
+        fig, axes = plt.subplots(nrows, ncols, figsize=(12, nrows * 4.5), squeeze=False)
+        axes = axes.flatten()
+
+        for ax, panel in zip(axes, panels):
+            ideal = panel['ideal']
+            if ideal: ax.plot(ideal['x'], ideal['y'], 'k--', label=ideal['label'])
+            for s in panel['series']:
+                style = {'marker': s['marker'], 'linestyle': s['linestyle'], 'label': s['label']}
+                if s.get('color'): style['color'] = s['color']
+                if 'ci_low' in s:
+                    yerr = [[y - lo for y, lo in zip(s['y'], s['ci_low'])],
+                            [hi - y for y, hi in zip(s['y'], s['ci_high'])]]
+                    ax.errorbar(s['x'], s['y'], yerr=yerr, capsize=3, **style)
+                else:
+                    ax.plot(s['x'], s['y'], **style)
+            ax.set_title(panel['title'])
+            ax.set_xlabel(panel.get('xlabel', 'Threads'))
+            ax.set_ylabel(panel.get('ylabel', 'Gflop/s'))
+            if panel.get('xscale'): ax.set_xscale(panel['xscale'])
+            if panel.get('yscale'): ax.set_yscale(panel['yscale'])
+            ax.grid(True, which="both", ls="--")
+
+        for j in range(len(panels), len(axes)): axes[j].set_visible(False)
+        fig.suptitle(spec['title'], fontsize=16)
+        if spec.get('legend_per_panel'):
+            for ax, _ in zip(axes, panels): ax.legend(fontsize=7)
+        else:
+            handles, labels = axes[0].get_legend_handles_labels()
+            fig.legend(handles, labels, loc='upper right')
+        plt.tight_layout(rect=[0, 0, 1, 0.96])
+        tmp_path = f"{path}.{os.getpid()}.tmp.png"
+        plt.savefig(tmp_path)
+        os.replace(tmp_path, path)
+        return path
+    except Exception as e:
+        print(f"\n--- !!! ERROR: Could not generate chart '{spec.get('title')}'. Plot will be missing. !!! ---")
+        print(f"--- Error Type: {type(e).__name__}, Details: {e}")
+        print(f"--- This often happens if 'results.json' has missing data or an unexpected format.")
+        traceback.print_exc()
+        return None
+    finally:
+        plt.close('all')
+
+
+def render_charts(specs):
+    """Renders {name: spec} and returns {name: png path or None}.
+
+    Cached images are reused as-is; the rest are drawn concurrently.
+    """
+    os.makedirs(CHART_CACHE_DIR, exist_ok=True)
+    paths, todo = {}, {}
+    for name, spec in specs.items():
+        if spec is None:
+            paths[name] = None
+            continue
+        path = chart_path(spec)
+        paths[name] = path
+        if os.path.exists(path):
+            os.utime(path)  # Mark as recently used for evict_charts().
+        else:
+            todo[name] = (spec, path)
+    if len(todo) == 1:
+        (spec, path), = todo.values()
+        paths.update({name: render_chart(spec, path) for name in todo})
+    elif todo:
+        with ProcessPoolExecutor(max_workers=min(len(todo), os.cpu_count() or 1)) as pool:
+            futures = {name: pool.submit(render_chart, spec, path) for name, (spec, path) in todo.items()}
+        paths.update({name: f.result() for name, f in futures.items()})
+    reused = sum(1 for name, path in paths.items() if path and name not in todo)
+    print(f"Charts: {len(todo)} rendered, {reused} reused from {CHART_CACHE_DIR}/")
+    evict_charts(keep={path for path in paths.values() if path})
+    return paths
+
+
+def evict_charts(keep=(), max_bytes=CHART_CACHE_MAX_BYTES):
+    """Drops least recently used images until the cache fits in max_bytes; images in keep always stay."""
+    entries = []
+    for name in os.listdir(CHART_CACHE_DIR):
+        path = os.path.join(CHART_CACHE_DIR, name)
+        st = os.stat(path)
+        entries.append((st.st_mtime, st.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path in keep:
+            continue
+        os.remove(path)
+        total -= size
+        removed += 1
+    return removed
@@ -0,0 +1,267 @@
+"""
+Historical results database and performance-regression detection.
+
+Every sweep overwrites results.json, so benchmark.py also ingests each finished
+sweep into a local SQLite database (HISTORY_DB) together with the metadata needed
+to explain a change: git commit, compiler version, compile commands, host and
+timestamp. `python history.py compare` then checks a candidate run against a
+baseline point by point -- (scaling, kernel, profile, N, schedule, placement, k, T)
+-- and exits non-zero when any point got significantly slower, so it can gate a
+kernel change. A point only counts as a regression when its whole median CI lies
+below the baseline's CI and the median dropped by at least the threshold.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+import kernels
+import measure_cache
+import results_store
+import stats
+
+HISTORY_DB = "history.sqlite"
+REGRESSION_THRESHOLD = 0.02  # Ignore significant changes smaller than 2% of the baseline median.
+POINT_COLUMNS = ["scaling", "kernel", "profile", "N", "schedule", "placement", "rhs", "threads"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    git_commit TEXT,
+    git_dirty INTEGER,
+    compiler TEXT,
+    flags TEXT,          -- JSON {profile: compile commands}
+    host_id TEXT,
+    host TEXT,           -- JSON host fingerprint and topology
+    label TEXT
+);
+CREATE TABLE IF NOT EXISTS points (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    scaling TEXT, kernel TEXT, profile TEXT, N INTEGER, schedule TEXT, placement TEXT, rhs INTEGER DEFAULT 1, threads INTEGER,
+    gflops REAL, ci_low REAL, ci_high REAL, samples INTEGER
+);
+CREATE INDEX IF NOT EXISTS points_by_run ON points(run_id);
+"""
+
+
+def connect(path=HISTORY_DB):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    # Databases created before the batched sweep lack the rhs column; their points all had k = 1.
+    if "rhs" not in [r["name"] for r in conn.execute("PRAGMA table_info(points)")]:
+        conn.execute("ALTER TABLE points ADD COLUMN rhs INTEGER DEFAULT 1")
+    return conn
+
+
+def git_info():
+    """Returns (commit, dirty) for the working tree, or (None, None) outside git."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, bool(status.strip())
+
+
+def compiler_version(compile_commands):
+    """First line of `<compiler> --version` for the compiler a make dry run invokes."""
+    # The dry run also lists helper commands (mkdir -p ...); the compiler is whatever writes an -o output.
+    compile_lines = [line for line in compile_commands.splitlines() if " -o " in line]
+    if not compile_lines:
+        return None
+    words = compile_lines[0].split()
+    try:
+        proc = subprocess.run([words[0], "--version"], capture_output=True, text=True)
+    except OSError:
+        return None
+    return proc.stdout.splitlines()[0] if proc.returncode == 0 and proc.stdout else None
+
+
+def record_run(data, flags, path=HISTORY_DB, label=""):
+    """Ingests one results.json dict into the database and returns the new run id.
+
+    flags maps each profile to its compile commands (benchmark.compile_fingerprint).
+    """
+    table = results_store.from_dict(data)
+    commit, dirty = git_info()
+    host = dict(measure_cache.host_fingerprint(), topology=table.topology)
+    with connect(path) as conn:
+        cur = conn.execute(
+            "INSERT INTO runs (timestamp, git_commit, git_dirty, compiler, flags, host_id, host, label) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (datetime.now(timezone.utc).isoformat(timespec="seconds"), commit, dirty,
+             compiler_version(next(iter(flags.values()), "")), json.dumps(flags, sort_keys=True),
+             measure_cache.host_id(), json.dumps(host, sort_keys=True), label))
+        run_id = cur.lastrowid
+        rows = table.rows
+        conn.executemany(
+            f"INSERT INTO points (run_id, {', '.join(POINT_COLUMNS)}, gflops, ci_low, ci_high, samples) "
+            f"VALUES ({', '.join('?' * (len(POINT_COLUMNS) + 5))})",
+            [(run_id,) + tuple(row[c].item() for c in POINT_COLUMNS)
+             + (float(row['gflops']), float(row['ci_low']), float(row['ci_high']), int(row['samples'])) for row in rows])
+    conn.close()
+    return run_id
+
+
+def resolve_run(conn, ref):
+    """Turns 'latest', 'previous', a run id or a git commit prefix into a run id (or None)."""
+    if ref in ("latest", "previous"):
+        ids = [r["id"] for r in conn.execute("SELECT id FROM runs ORDER BY id DESC LIMIT 2")]
+        index = 0 if ref == "latest" else 1
+        return ids[index] if len(ids) > index else None
+    if str(ref).isdigit():
+        row = conn.execute("SELECT id FROM runs WHERE id = ?", (int(ref),)).fetchone()
+        if row: return row["id"]
+    row = conn.execute("SELECT id FROM runs WHERE git_commit LIKE ? ORDER BY id DESC LIMIT 1", (f"{ref}%",)).fetchone()
+    return row["id"] if row else None
+
+
+def previous_on_host(conn, run_id):
+    """Id of the latest run before run_id recorded on the same host, or None."""
+    row = conn.execute("SELECT p.id FROM runs p JOIN runs r ON r.id = ? "
+                       "WHERE p.id < r.id AND p.host_id IS r.host_id ORDER BY p.id DESC LIMIT 1", (run_id,)).fetchone()
+    return row["id"] if row else None
+
+
+def _points(conn, run_id):
+    return {tuple(r[c] for c in POINT_COLUMNS): dict(r)
+            for r in conn.execute("SELECT * FROM points WHERE run_id = ?", (run_id,))}
+
+
+def compare(conn, baseline_id, candidate_id, threshold=REGRESSION_THRESHOLD):
+    """Point-by-point comparison of two runs.
+
+    Returns {'compared': n, 'regressions': [...], 'improvements': [...]}, each entry
+    holding the point's key columns plus baseline/candidate medians, CIs and the
+    relative change. Points present in only one run are not compared. Every stored
+    median is positive: record_run() ingests through results_store, whose
+    _parse_leaf() is the one place that drops zero medians.
+    """
+    baseline, candidate = _points(conn, baseline_id), _points(conn, candidate_id)
+    result = {"compared": 0, "regressions": [], "improvements": []}
+    for key in sorted(set(baseline) & set(candidate), key=str):
+        base, cand = baseline[key], candidate[key]
+        result["compared"] += 1
+        change = (cand["gflops"] - base["gflops"]) / base["gflops"]
+        entry = dict(zip(POINT_COLUMNS, key), baseline=base["gflops"], baseline_ci=[base["ci_low"], base["ci_high"]],
+                     candidate=cand["gflops"], candidate_ci=[cand["ci_low"], cand["ci_high"]], change=change)
+        if stats.significantly_greater(base, cand) and change <= -threshold:
+            result["regressions"].append(entry)
+        elif stats.significantly_greater(cand, base) and change >= threshold:
+            result["improvements"].append(entry)
+    result["regressions"].sort(key=lambda e: e["change"])
+    return result
+
+
+def describe_point(entry):
+    extra = f" {entry['schedule']}" if entry["schedule"] else ""
+    extra += f" {entry['placement']}" if entry["placement"] else ""
+    extra += f" K={entry['rhs']}" if entry.get("rhs", 1) != 1 else ""
+    return f"{entry['scaling']:<9} {entry['kernel']} {entry['profile']} N={entry['N']}{extra} T={entry['threads']}"
+
+
+def trend(conn, profile, host_id=None):
+    """Peak Gflop/s per run of every kernel at its headline schedule (strong scaling) on one host.
+
+    Returns {kernel: {N: [(run id, timestamp, git commit, peak Gflop/s), ...]}} ordered
+    oldest first. Only runs from host_id (default: the host of the latest run) are
+    included so the trend compares like with like.
+    """
+    if host_id is None:
+        latest = conn.execute("SELECT host_id FROM runs ORDER BY id DESC LIMIT 1").fetchone()
+        host_id = latest["host_id"] if latest else ""
+    rows = conn.execute(
+        "SELECT r.id, r.timestamp, r.git_commit, p.kernel, p.N, MAX(p.gflops) AS peak "
+        "FROM points p JOIN runs r ON r.id = p.run_id "
+        "WHERE p.profile = ? AND p.scaling = 'strong' AND p.schedule IN ('', ?) "
+        "AND r.host_id = ? GROUP BY r.id, p.kernel, p.N ORDER BY r.id",
+        (profile, kernels.DEFAULT_SCHEDULE, host_id))
+    result = {}
+    for r in rows:
+        result.setdefault(r["kernel"], {}).setdefault(r["N"], []).append(
+            (r["id"], r["timestamp"], r["git_commit"], r["peak"]))
+    return result
+
+
+def trend_chart_spec(history, profile):
+    """Spec for peak Gflop/s per size across recorded runs, or None with fewer than two runs."""
+    runs = sorted({run[0] for by_size in history.values() for series in by_size.values() for run in series})
+    if len(runs) < 2: return None
+    position = {run_id: i + 1 for i, run_id in enumerate(runs)}
+    panels = []
+    for kernel in kernels.ordered(history):
+        series = [{'label': f'N={size}', 'x': [position[run[0]] for run in points], 'y': [run[3] for run in points],
+                   'marker': 'o', 'linestyle': '-'} for size, points in sorted(history[kernel].items())]
+        if series:
+            panels.append({'title': kernels.label(kernel), 'ideal': None, 'series': series,
+                           'xlabel': 'Recorded run (oldest to newest)', 'ylabel': 'Peak Gflop/s'})
+    return {'title': f"Performance History ('{profile}' profile)", 'legend_per_panel': True, 'panels': panels}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stores benchmark sweeps and detects performance regressions.")
+    parser.add_argument("--db", default=HISTORY_DB)
+    subparsers = parser.add_subparsers(dest="command")
+    ingest = subparsers.add_parser("ingest", help="Record an existing results.json as a run.")
+    ingest.add_argument("--results", default="results.json")
+    ingest.add_argument("--label", default="")
+    subparsers.add_parser("list", help="List recorded runs.")
+    cmp = subparsers.add_parser("compare", help="Flag significant regressions of a candidate run against a baseline.")
+    cmp.add_argument("--baseline", default="previous", help="Run id, git commit prefix, 'latest' or 'previous'.")
+    cmp.add_argument("--candidate", default="latest", help="Run id, git commit prefix, 'latest' or 'previous'.")
+    cmp.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                     help="Minimum relative change of the median for a significant difference to be reported.")
+    cmp.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.command == "ingest":
+        import benchmark  # Only needed here for the compile commands of each profile.
+        with open(args.results, "r") as f:
+            data = json.load(f)
+        flags = {p: benchmark.compile_fingerprint(p, t) for p, t in benchmark.COMPILER_PROFILES.items() if p in data}
+        print(f"Recorded run {record_run(data, flags, args.db, args.label)} in {args.db}")
+        return 0
+    if args.command not in ("list", "compare"):
+        parser.print_help()
+        return 1
+    if not os.path.exists(args.db):
+        print(f"Error: {args.db} not found. Run benchmark.py or 'history.py ingest' first.")
+        return 1
+    conn = connect(args.db)
+    if args.command == "list":
+        for r in conn.execute("SELECT r.*, COUNT(p.run_id) AS n FROM runs r LEFT JOIN points p ON p.run_id = r.id "
+                              "GROUP BY r.id ORDER BY r.id"):
+            commit = (r["git_commit"] or "-")[:10] + ("+dirty" if r["git_dirty"] else "")
+            print(f"{r['id']:>4}  {r['timestamp']}  {commit:<16} {r['host_id']}  {r['n']:>5} points  "
+                  f"{r['compiler'] or ''}  {r['label'] or ''}")
+        return 0
+
+    baseline_id, candidate_id = resolve_run(conn, args.baseline), resolve_run(conn, args.candidate)
+    if baseline_id is None or candidate_id is None:
+        print(f"Error: could not resolve baseline '{args.baseline}' or candidate '{args.candidate}'.")
+        return 1
+    hosts = {r["host_id"] for r in conn.execute("SELECT host_id FROM runs WHERE id IN (?, ?)", (baseline_id, candidate_id))}
+    result = compare(conn, baseline_id, candidate_id, args.threshold)
+    if args.json:
+        print(json.dumps(dict(result, baseline=baseline_id, candidate=candidate_id), indent=2))
+    else:
+        print(f"Run {candidate_id} vs baseline run {baseline_id}: {result['compared']} points compared, "
+              f"{len(result['regressions'])} significant regressions, {len(result['improvements'])} improvements.")
+        if len(hosts) > 1:
+            print("Warning: the runs were recorded on different hosts; differences may not be caused by the code.")
+        for title, entries in (("Regressions", result["regressions"]), ("Improvements", result["improvements"])):
+            if entries: print(f"{title}:")
+            for e in entries:
+                print(f"  {describe_point(e)}: {e['baseline']:.3f} -> {e['candidate']:.3f} Gflop/s ({100 * e['change']:+.1f}%)")
+    return 1 if result["regressions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,16 @@
  * This version uses modern C++ features like std::vector for memory management
  * and std::chrono for high-resolution timing, while retaining the OpenMP
  * parallelization strategy for the main computation loop.
+ *
+ * An optional second argument k multiplies A by k right-hand-side vectors in one
+ * pass (C = A * B with B of size n x k), so each element of A loaded from memory
+ * is used k times instead of once.
+ *
+ * `hw2-a <n> --sweep ...` runs many thread counts and repetitions in one process
+ * and prints one JSON line per measurement; see sweep.h.
+ *
+ * A is a Matrix (matrix.h): a heap array, or a file-backed mapping when the
+ * HW2_MATRIX_DIR environment variable is set, always indexed with 64-bit offsets.
  */
 
 #include <iostream>
@@ -13,7 +23,14 @@
 #include <chrono>
 #include <cstdlib>
 #include <string>
+#include <iomanip>
+#include <algorithm>
 #include <omp.h>
+#include "matrix.h"
+#include "sweep.h"
+
+// Right-hand sides computed together per row; their sums fit in a few vector registers.
+constexpr int RHS_TILE = 16;
 
 // Helper function to get current time in microseconds for precise timing
 double microtime() {
@@ -23,46 +40,97 @@ double microtime() {
 }
 
 // Main logic for dense matrix-vector multiplication
-void mat_vec_mult(int n, const std::vector<float>& A, const std::vector<float>& B, std::vector<float>& C) {
+void mat_vec_mult(int n, const Matrix& A, const std::vector<float>& B, std::vector<float>& C) {
     // The outer loop is parallelized. Each thread handles a distinct set of rows ('i').
     // 'static' scheduling is efficient here because the workload for each row is the same.
     #pragma omp parallel for schedule(static)
     for (int i = 0; i < n; ++i) {
         float sum = 0.0f; // Use a local variable to prevent race conditions.
         for (int k = 0; k < n; ++k) {
-            sum += A[i * n + k] * B[k];
+            sum += A[(size_t)i * n + k] * B[k];
         }
         C[i] = sum; // Each thread writes to a unique C[i], so no conflict occurs.
     }
 }
 
+// Batched version: C (n x k) = A (n x n) * B (n x k), with B and C stored row-major
+// so the k values belonging to one row of A are contiguous and the inner loop vectorizes.
+void mat_vec_mult_batched(int n, int k, const Matrix& A, const std::vector<float>& B, std::vector<float>& C) {
+    #pragma omp parallel for schedule(static)
+    for (int i = 0; i < n; ++i) {
+        // The k sums are kept in a local tile of RHS_TILE accumulators that stays in registers.
+        for (int r0 = 0; r0 < k; r0 += RHS_TILE) {
+            const int width = std::min(RHS_TILE, k - r0);
+            float acc[RHS_TILE] = {0.0f};
+            for (int j = 0; j < n; ++j) {
+                const float a = A[(size_t)i * n + j]; // Loaded once, used for every vector in the tile.
+                const float* b = &B[(size_t)j * k + r0];
+                #pragma omp simd
+                for (int r = 0; r < width; ++r) {
+                    acc[r] += a * b[r];
+                }
+            }
+            for (int r = 0; r < width; ++r) C[(size_t)i * k + r0 + r] = acc[r];
+        }
+    }
+}
+
 int main(int argc, char **argv) {
-    if (argc != 2) {
-        std::cerr << "Usage: " << argv[0] << " <matrix_size_n>" << std::endl;
+    bool sweep = is_sweep(argc, argv);
+    SweepOptions opts;
+    if (sweep) {
+        if (!parse_sweep_options(argc, argv, opts)) return 1;
+        if (!opts.schedules.empty()) {
+            std::cerr << "Error: hw2-a always uses a static schedule; 'schedules' is not supported." << std::endl;
+            return 1;
+        }
+    } else if (argc < 2 || argc > 3) {
+        std::cerr << "Usage: " << argv[0] << " <matrix_size_n> [k]" << std::endl;
+        std::cerr << "       " << argv[0] << " <matrix_size_n> --sweep threads=1,2,4 [repeats=10] [budget=30] [min=1] [ci=0] [k=1]" << std::endl;
+        std::cerr << "  [k] is optional: the number of right-hand-side vectors, default 1." << std::endl;
         return 1;
     }
 
     int n = std::atoi(argv[1]);
+    int k = sweep ? opts.rhs : (argc == 3) ? std::atoi(argv[2]) : 1;
     if (n <= 0) {
         std::cerr << "Error: Matrix size must be a positive integer." << std::endl;
         return 1;
     }
+    if (k <= 0) {
+        std::cerr << "Error: Number of right-hand sides must be a positive integer." << std::endl;
+        return 1;
+    }
 
-    // Allocate and initialize matrices using std::vector
-    std::vector<float> A(n * n), B(n), C(n);
+    // Allocate and initialize matrices using std::vector.
+    // Column r of B is B[j][r] = 1/(j+r+2); column 0 is the single-vector B.
+    Matrix A((size_t)n * n);
+    std::vector<float> B((size_t)n * k), C((size_t)n * k);
     for (int i = 0; i < n; ++i) {
-        B[i] = 1.0f / (i + 2.0f);
+        for (int r = 0; r < k; ++r) {
+            B[(size_t)i * k + r] = 1.0f / (i + r + 2.0f);
+        }
         for (int j = 0; j < n; ++j) {
-            A[i * n + j] = 1.0f / (i + j + 2.0f);
+            A[(size_t)i * n + j] = 1.0f / (i + j + 2.0f);
         }
     }
 
+    auto run = [&]() {
+        if (k == 1) mat_vec_mult(n, A, B, C);
+        else mat_vec_mult_batched(n, k, A, B, C);
+    };
+
+    if (sweep) {
+        return run_sweep(opts, 2.0 * (double)n * (double)n * k, run,
+                         [&](double& sum, double& weighted, double& smallest) { checksums(n, k, C, sum, weighted, smallest); });
+    }
+
     // Warm-up run to stabilize CPU frequency and ensure caches are loaded
-    mat_vec_mult(n, A, B, C);
+    run();
 
     // Timed run for performance measurement
     double time1 = microtime();
-    mat_vec_mult(n, A, B, C);
+    run();
     double time2 = microtime();
 
     double elapsed_time_us = time2 - time1;
@@ -71,15 +139,25 @@ int main(int argc, char **argv) {
     // Calculate performance in Gflop/s (Billion Floating Point Operations Per Second)
     double gflops = 0.0;
     if (elapsed_time_sec > 0.0) {
-        // Total operations: n*n multiplications and n*n additions = 2*n^2 flops
-        double total_flops = 2.0 * (double)n * (double)n;
+        // Total operations: n*n multiplications and n*n additions = 2*n^2 flops per vector
+        double total_flops = 2.0 * (double)n * (double)n * k;
         gflops = total_flops / (elapsed_time_sec * 1e9);
     }
 
     std::cout << "Execution Time: " << elapsed_time_us << " us" << std::endl;
-    std::cout << "Matrix Size: " << n << "x" << n << std::endl;
+    std::cout << "Matrix Size: " << n << "x" << n;
+    if (k > 1) std::cout << ", Right-hand sides: " << k;
+    std::cout << std::endl;
+    if (A.mapped()) std::cout << "Matrix storage: file-backed (HW2_MATRIX_DIR)" << std::endl;
     std::cout << "Threads used: " << omp_get_max_threads() << std::endl;
     std::cout << "Performance (Gflop/s): " << gflops << std::endl;
 
+    // Checksums of C for the harness to validate against its NumPy reference:
+    // the plain sum, a position-weighted sum that also catches misplaced rows, and the
+    // smallest entry, which catches a row that was never written.
+    double checksum, weighted, smallest;
+    checksums(n, k, C, checksum, weighted, smallest);
+    std::cout << std::setprecision(17) << "Checksum: " << checksum << " " << weighted << " " << smallest << std::endl;
+
     return 0;
 }
@@ -0,0 +1,146 @@
+/**
+ * hw2-b-packed.cpp
+ *
+ * Lower-triangular matrix-vector multiplication like hw2-b, but with the matrix
+ * stored packed: row i holds only its i+1 non-zero elements and starts at offset
+ * i*(i+1)/2. This halves the memory footprint of hw2-b's n*n layout and makes
+ * every cache line fetched for A carry useful data, even for the short early rows.
+ *
+ * Takes the same arguments as hw2-b (size, schedule, chunk).
+ * Also supports hw2-b's single-process --sweep mode (sweep.h), without k, and
+ * its file-backed matrix mode (HW2_MATRIX_DIR, see matrix.h).
+ */
+
+#include <iostream>
+#include <vector>
+#include <chrono>
+#include <cstdlib>
+#include <string>
+#include <iomanip>
+#include <omp.h>
+#include "matrix.h"
+#include "sweep.h"
+
+// Helper function to get current time in microseconds
+double microtime() {
+    auto now = std::chrono::high_resolution_clock::now();
+    auto duration = now.time_since_epoch();
+    return std::chrono::duration_cast<std::chrono::microseconds>(duration).count();
+}
+
+// Offset of row i in packed row-major lower-triangular storage.
+inline size_t row_offset(int i) {
+    return (size_t)i * (i + 1) / 2;
+}
+
+// Lower-triangular matrix-vector multiplication on packed storage
+void mat_vec_mult_packed(int n, const Matrix& A, const std::vector<float>& B, std::vector<float>& C) {
+    // The schedule is set at runtime by omp_set_schedule() in main(), as in hw2-b.
+    #pragma omp parallel for schedule(runtime)
+    for (int i = 0; i < n; ++i) {
+        const float* row = &A[row_offset(i)];
+        float sum = 0.0f;
+        for (int j = 0; j <= i; ++j) {
+            sum += row[j] * B[j];
+        }
+        C[i] = sum;
+    }
+}
+
+int main(int argc, char **argv) {
+    bool sweep = is_sweep(argc, argv);
+    SweepOptions opts;
+    if (sweep) {
+        if (!parse_sweep_options(argc, argv, opts)) return 1;
+        if (opts.rhs != 1) {
+            std::cerr << "Error: This variant has no batched mode; k must be 1." << std::endl;
+            return 1;
+        }
+        if (opts.schedules.empty()) opts.schedules.push_back("guided");
+    } else if (argc < 2 || argc > 4) {
+        std::cerr << "Usage: " << argv[0] << " <matrix_size_n> [schedule] [chunk]" << std::endl;
+        std::cerr << "       " << argv[0] << " <matrix_size_n> --sweep threads=1,2,4 [schedules=guided[:chunk],...] [repeats=10] [budget=30] [min=1] [ci=0]" << std::endl;
+        std::cerr << "  [schedule] is optional (static, dynamic, guided) and defaults to 'guided'." << std::endl;
+        std::cerr << "  [chunk] is optional; 0 selects the OpenMP default for the schedule." << std::endl;
+        return 1;
+    }
+
+    int n = std::atoi(argv[1]);
+    std::string schedule_type = (!sweep && argc >= 3) ? argv[2] : "guided"; // Default to guided
+    int chunk = (!sweep && argc == 4) ? std::atoi(argv[3]) : -1; // -1: keep the historical per-schedule default
+
+    if (n <= 0) {
+        std::cerr << "Error: Matrix size must be a positive integer." << std::endl;
+        return 1;
+    }
+    if (!sweep && argc == 4 && chunk < 0) {
+        std::cerr << "Error: Chunk size must be a non-negative integer." << std::endl;
+        return 1;
+    }
+
+    // Set the OpenMP schedule type based on the command-line argument
+    if (schedule_type == "static") {
+        omp_set_schedule(omp_sched_static, chunk < 0 ? 0 : chunk);
+    } else if (schedule_type == "dynamic") {
+        omp_set_schedule(omp_sched_dynamic, chunk < 0 ? 1 : chunk); // Default to chunk size 1 for fine-grained dynamic
+    } else if (schedule_type == "guided") {
+        omp_set_schedule(omp_sched_guided, chunk < 0 ? 0 : chunk);
+    } else {
+        std::cerr << "Error: Invalid schedule type '" << schedule_type << "'." << std::endl;
+        return 1;
+    }
+
+    // Allocate matrices; only the n*(n+1)/2 lower-triangular elements are stored.
+    Matrix A(row_offset(n));
+    std::vector<float> B(n), C(n);
+
+    // Same values as hw2-b, so the harness validates both against one reference.
+    for (int i = 0; i < n; ++i) {
+        B[i] = 1.0f / (i + 2.0f);
+        float* row = &A[row_offset(i)];
+        for (int j = 0; j <= i; ++j) {
+            row[j] = 1.0f / (i + j + 2.0f);
+        }
+    }
+
+    if (sweep) {
+        return run_sweep(opts, (double)n * (double)(n + 1), [&]() { mat_vec_mult_packed(n, A, B, C); },
+                         [&](double& sum, double& weighted, double& smallest) { checksums(n, 1, C, sum, weighted, smallest); });
+    }
+
+    // Warm-up run
+    mat_vec_mult_packed(n, A, B, C);
+
+    // Timed run
+    double time1 = microtime();
+    mat_vec_mult_packed(n, A, B, C);
+    double time2 = microtime();
+
+    double elapsed_time_us = time2 - time1;
+    double elapsed_time_sec = elapsed_time_us / 1e6;
+
+    // Calculate performance in Gflop/s
+    double gflops = 0.0;
+    if (elapsed_time_sec > 0.0) {
+        // Total flops for triangular matrix: sum of 2*i for i=1..n => n*(n+1)
+        double total_flops = (double)n * (double)(n + 1);
+        gflops = total_flops / (elapsed_time_sec * 1e9);
+    }
+
+    std::cout << "Execution Time: " << elapsed_time_us << " us" << std::endl;
+    std::cout << "Matrix Size: " << n << "x" << n << ", Schedule: " << schedule_type;
+    if (chunk >= 0) std::cout << ", Chunk: " << chunk;
+    std::cout << std::endl;
+    if (A.mapped()) std::cout << "Matrix storage: file-backed (HW2_MATRIX_DIR)" << std::endl;
+    std::cout << "Threads used: " << omp_get_max_threads() << std::endl;
+    std::cout << "Performance (Gflop/s): " << gflops << std::endl;
+
+    // Checksums of C for the harness to validate against its NumPy reference:
+    // the plain sum, a position-weighted sum that also catches misplaced rows, and the
+    // smallest entry, which catches a row that was never written.
+    double checksum, weighted, smallest;
+    checksums(n, 1, C, checksum, weighted, smallest);
+    std::cout << std::setprecision(17) << "Checksum: " << checksum << " " << weighted << " " << smallest << std::endl;
+
+    return 0;
+}
@@ -6,8 +6,18 @@
  * elements and uses modern C++ features.
  *
  * The workload for each row is unbalanced, making the choice of OpenMP scheduling
- * strategy critical. This program allows specifying the schedule via a command
- * line argument.
+ * strategy critical. This program allows specifying the schedule and its chunk
+ * size via command line arguments, so tuner.py can search over both.
+ *
+ * An optional fourth argument k multiplies A by k right-hand-side vectors in one
+ * pass (C = A * B with B of size n x k), so each element of A loaded from memory
+ * is used k times instead of once.
+ *
+ * `hw2-b <n> --sweep ...` runs many schedules, thread counts and repetitions in
+ * one process and prints one JSON line per measurement; see sweep.h.
+ *
+ * A is a Matrix (matrix.h): a heap array, or a file-backed mapping when the
+ * HW2_MATRIX_DIR environment variable is set, always indexed with 64-bit offsets.
  */
 
 #include <iostream>
@@ -15,7 +25,14 @@
 #include <chrono>
 #include <cstdlib>
 #include <string>
+#include <iomanip>
+#include <algorithm>
 #include <omp.h>
+#include "matrix.h"
+#include "sweep.h"
+
+// Right-hand sides computed together per row; their sums fit in a few vector registers.
+constexpr int RHS_TILE = 16;
 
 // Helper function to get current time in microseconds
 double microtime() {
@@ -25,7 +42,7 @@ double microtime() {
 }
 
 // Main logic for lower-triangular matrix-vector multiplication
-void mat_vec_mult_triangular(int n, const std::vector<float>& A, const std::vector<float>& B, std::vector<float>& C) {
+void mat_vec_mult_triangular(int n, const Matrix& A, const std::vector<float>& B, std::vector<float>& C) {
     // This pragma parallelizes the outer loop. The schedule is determined at runtime
     // based on the call to omp_set_schedule() in main(), which allows us to benchmark
     // different strategies without recompiling.
@@ -36,56 +53,110 @@ void mat_vec_mult_triangular(int n, const std::vector<float>& A, const std::vect
         float sum = 0.0f;
         // The inner loop only goes up to 'i', avoiding multiplication by zeros.
         for (int j = 0; j <= i; ++j) {
-            sum += A[i * n + j] * B[j];
+            sum += A[(size_t)i * n + j] * B[j];
         }
         C[i] = sum; // Single write to the shared output vector C. No race condition.
     }
 }
 
+// Batched version: C (n x k) = A (n x n, lower triangle) * B (n x k), with B and C stored
+// row-major so the k values belonging to one row of A are contiguous and the inner loop vectorizes.
+void mat_vec_mult_triangular_batched(int n, int k, const Matrix& A, const std::vector<float>& B, std::vector<float>& C) {
+    #pragma omp parallel for schedule(runtime)
+    for (int i = 0; i < n; ++i) {
+        // The k sums are kept in a local tile of RHS_TILE accumulators that stays in registers.
+        for (int r0 = 0; r0 < k; r0 += RHS_TILE) {
+            const int width = std::min(RHS_TILE, k - r0);
+            float acc[RHS_TILE] = {0.0f};
+            for (int j = 0; j <= i; ++j) {
+                const float a = A[(size_t)i * n + j]; // Loaded once, used for every vector in the tile.
+                const float* b = &B[(size_t)j * k + r0];
+                #pragma omp simd
+                for (int r = 0; r < width; ++r) {
+                    acc[r] += a * b[r];
+                }
+            }
+            for (int r = 0; r < width; ++r) C[(size_t)i * k + r0 + r] = acc[r];
+        }
+    }
+}
+
 int main(int argc, char **argv) {
-    if (argc < 2 || argc > 3) {
-        std::cerr << "Usage: " << argv[0] << " <matrix_size_n> [schedule]" << std::endl;
+    bool sweep = is_sweep(argc, argv);
+    SweepOptions opts;
+    if (sweep) {
+        if (!parse_sweep_options(argc, argv, opts)) return 1;
+        if (opts.schedules.empty()) opts.schedules.push_back("guided");
+    } else if (argc < 2 || argc > 5) {
+        std::cerr << "Usage: " << argv[0] << " <matrix_size_n> [schedule] [chunk] [k]" << std::endl;
+        std::cerr << "       " << argv[0] << " <matrix_size_n> --sweep threads=1,2,4 [schedules=guided[:chunk],...] [repeats=10] [budget=30] [min=1] [ci=0] [k=1]" << std::endl;
         std::cerr << "  [schedule] is optional (static, dynamic, guided) and defaults to 'guided'." << std::endl;
+        std::cerr << "  [chunk] is optional; 0 selects the OpenMP default for the schedule." << std::endl;
+        std::cerr << "  [k] is optional: the number of right-hand-side vectors, default 1." << std::endl;
         return 1;
     }
 
     int n = std::atoi(argv[1]);
-    std::string schedule_type = (argc == 3) ? argv[2] : "guided"; // Default to guided
+    std::string schedule_type = (!sweep && argc >= 3) ? argv[2] : "guided"; // Default to guided
+    int chunk = (!sweep && argc >= 4) ? std::atoi(argv[3]) : -1; // -1: keep the historical per-schedule default
+    int k = sweep ? opts.rhs : (argc == 5) ? std::atoi(argv[4]) : 1;
 
     if (n <= 0) {
         std::cerr << "Error: Matrix size must be a positive integer." << std::endl;
         return 1;
     }
+    if (!sweep && argc >= 4 && chunk < 0) {
+        std::cerr << "Error: Chunk size must be a non-negative integer." << std::endl;
+        return 1;
+    }
+    if (k <= 0) {
+        std::cerr << "Error: Number of right-hand sides must be a positive integer." << std::endl;
+        return 1;
+    }
 
     // Set the OpenMP schedule type based on the command-line argument
     if (schedule_type == "static") {
-        omp_set_schedule(omp_sched_static, 0);
+        omp_set_schedule(omp_sched_static, chunk < 0 ? 0 : chunk);
     } else if (schedule_type == "dynamic") {
-        omp_set_schedule(omp_sched_dynamic, 1); // Use chunk size 1 for fine-grained dynamic
+        omp_set_schedule(omp_sched_dynamic, chunk < 0 ? 1 : chunk); // Default to chunk size 1 for fine-grained dynamic
     } else if (schedule_type == "guided") {
-        omp_set_schedule(omp_sched_guided, 0);
+        omp_set_schedule(omp_sched_guided, chunk < 0 ? 0 : chunk);
     } else {
         std::cerr << "Error: Invalid schedule type '" << schedule_type << "'." << std::endl;
         return 1;
     }
 
     // Allocate matrices
-    std::vector<float> A(n * n, 0.0f), B(n), C(n);
+    Matrix A((size_t)n * n); // Zero-initialized.
+    std::vector<float> B((size_t)n * k), C((size_t)n * k);
 
-    // Initialize as a lower triangular matrix
+    // Initialize as a lower triangular matrix.
+    // Column r of B is B[j][r] = 1/(j+r+2); column 0 is the single-vector B.
     for (int i = 0; i < n; ++i) {
-        B[i] = 1.0f / (i + 2.0f);
+        for (int r = 0; r < k; ++r) {
+            B[(size_t)i * k + r] = 1.0f / (i + r + 2.0f);
+        }
         for (int j = 0; j <= i; ++j) {
-            A[i * n + j] = 1.0f / (i + j + 2.0f);
+            A[(size_t)i * n + j] = 1.0f / (i + j + 2.0f);
         }
     }
 
+    auto run = [&]() {
+        if (k == 1) mat_vec_mult_triangular(n, A, B, C);
+        else mat_vec_mult_triangular_batched(n, k, A, B, C);
+    };
+
+    if (sweep) {
+        return run_sweep(opts, (double)n * (double)(n + 1) * k, run,
+                         [&](double& sum, double& weighted, double& smallest) { checksums(n, k, C, sum, weighted, smallest); });
+    }
+
     // Warm-up run
-    mat_vec_mult_triangular(n, A, B, C);
+    run();
 
     // Timed run
     double time1 = microtime();
-    mat_vec_mult_triangular(n, A, B, C);
+    run();
     double time2 = microtime();
 
     double elapsed_time_us = time2 - time1;
@@ -94,15 +165,26 @@ int main(int argc, char **argv) {
     // Calculate performance in Gflop/s
     double gflops = 0.0;
     if (elapsed_time_sec > 0.0) {
-        // Total flops for triangular matrix: sum of 2*i for i=1..n => n*(n+1)
-        double total_flops = (double)n * (double)(n + 1);
+        // Total flops for triangular matrix: sum of 2*i for i=1..n => n*(n+1) per vector
+        double total_flops = (double)n * (double)(n + 1) * k;
         gflops = total_flops / (elapsed_time_sec * 1e9);
     }
 
     std::cout << "Execution Time: " << elapsed_time_us << " us" << std::endl;
-    std::cout << "Matrix Size: " << n << "x" << n << ", Schedule: " << schedule_type << std::endl;
+    std::cout << "Matrix Size: " << n << "x" << n << ", Schedule: " << schedule_type;
+    if (chunk >= 0) std::cout << ", Chunk: " << chunk;
+    if (k > 1) std::cout << ", Right-hand sides: " << k;
+    std::cout << std::endl;
+    if (A.mapped()) std::cout << "Matrix storage: file-backed (HW2_MATRIX_DIR)" << std::endl;
     std::cout << "Threads used: " << omp_get_max_threads() << std::endl;
     std::cout << "Performance (Gflop/s): " << gflops << std::endl;
 
+    // Checksums of C for the harness to validate against its NumPy reference:
+    // the plain sum, a position-weighted sum that also catches misplaced rows, and the
+    // smallest entry, which catches a row that was never written.
+    double checksum, weighted, smallest;
+    checksums(n, k, C, checksum, weighted, smallest);
+    std::cout << std::setprecision(17) << "Checksum: " << checksum << " " << weighted << " " << smallest << std::endl;
+
     return 0;
 }
@@ -0,0 +1,122 @@
+"""
+Per-run resource and hardware-counter instrumentation.
+
+run_instrumented() launches a benchmark, reaps it with os.wait4() to collect its
+rusage (CPU time, max RSS, context switches) and, when a usable `perf` is on the
+PATH, wraps it in `perf stat` to read cycles, instructions and cache events.
+Everything degrades gracefully: without perf only the rusage fields are
+recorded, and counters the CPU or kernel does not expose are simply omitted.
+Output can also be consumed line by line as the process writes it (on_line),
+which is how the single-process sweep mode streams its measurements.
+"""
+
+import functools
+import os
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+
+PERF_EVENTS = ["cycles", "instructions", "cache-references", "cache-misses", "LLC-load-misses"]
+
+
+@functools.lru_cache(maxsize=None)
+def perf_available():
+    """True if `perf stat` can count at least cycles for a child process here."""
+    if shutil.which("perf") is None:
+        return False
+    try:
+        proc = subprocess.run(["perf", "stat", "-x,", "-e", "cycles", "--", "true"],
+                              capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return proc.returncode == 0 and "<not supported>" not in proc.stderr
+
+
+def parse_perf_csv(text):
+    """Parses `perf stat -x,` output into {event: count}, skipping uncounted events."""
+    counters = {}
+    for line in text.splitlines():
+        fields = line.split(",")
+        if len(fields) < 3 or line.startswith("#"):
+            continue
+        value, event = fields[0], fields[2]
+        # perf may suffix events with modifiers, e.g. "cycles:u".
+        event = event.split(":")[0]
+        try:
+            counters[event] = float(value)
+        except ValueError:
+            continue  # "<not supported>" / "<not counted>"
+    if counters.get("cycles") and "instructions" in counters:
+        counters["ipc"] = counters["instructions"] / counters["cycles"]
+    if counters.get("cache-references") and "cache-misses" in counters:
+        counters["cache_miss_rate"] = counters["cache-misses"] / counters["cache-references"]
+    return counters
+
+
+def run_instrumented(cmd, env, timeout, use_perf=False, on_line=None):
+    """Runs cmd and returns (exit code or None, combined output, metrics, error).
+
+    metrics always holds wall/user/sys seconds, max RSS and context switches, plus
+    a 'counters' dict when perf was used. error is None on success, otherwise a
+    short reason such as "timeout" or "exit status 1". on_line, if given, is
+    called with each output line as soon as it is read.
+    """
+    perf_file = None
+    if use_perf:
+        fd, perf_file = tempfile.mkstemp(suffix=".perf")
+        os.close(fd)
+        cmd = ["perf", "stat", "-x,", "-e", ",".join(PERF_EVENTS), "-o", perf_file, "--"] + cmd
+    start = time.monotonic()
+    try:
+        # A session of its own, so a timeout can kill perf and the benchmark it wraps together.
+        proc = subprocess.Popen(cmd, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+                                start_new_session=True)
+    except OSError as e:
+        if perf_file: os.remove(perf_file)
+        return None, "", {}, f"could not start: {e}"
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass  # Already exited.
+
+    timer = threading.Timer(timeout, kill)
+    timer.start()
+    try:
+        lines = []
+        for line in proc.stdout:
+            lines.append(line)
+            if on_line: on_line(line)
+        output = "".join(lines)
+        proc.stdout.close()
+        # Reap with wait4 rather than proc.wait() so the child's rusage is returned.
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+    finally:
+        timer.cancel()
+    metrics = {
+        "wall_sec": time.monotonic() - start,
+        "user_sec": usage.ru_utime,
+        "sys_sec": usage.ru_stime,
+        "max_rss_kb": usage.ru_maxrss,
+        "voluntary_ctx_switches": usage.ru_nvcsw,
+        "involuntary_ctx_switches": usage.ru_nivcsw,
+    }
+    if perf_file:
+        try:
+            with open(perf_file, "r") as f:
+                counters = parse_perf_csv(f.read())
+            if counters: metrics["counters"] = counters
+        finally:
+            os.remove(perf_file)
+    if timed_out.is_set():
+        return None, output, metrics, "timeout"
+    if proc.returncode != 0:
+        return proc.returncode, output, metrics, f"exit status {proc.returncode}"
+    return 0, output, metrics, None
@@ -0,0 +1,92 @@
+"""
+Registry of the benchmark kernels.
+
+Everything that differs between kernels -- which binary runs it, whether it takes
+an OpenMP schedule, whether the matrix is dense or lower-triangular and how it is
+stored -- lives here, so benchmark.py, results_store.py and report.py can loop
+over KERNELS instead of naming hw2_a / hw2_b. Adding a kernel means adding an
+entry here and a target to the makefile.
+
+Kernels marked 'batched' take a number of right-hand-side vectors k and multiply
+A by all of them in one pass; flops() and storage_bytes() take that k as rhs.
+
+Result keys follow the original results.json layout: a scheduled kernel's
+weak-scaling, placement and batched results are stored under "<kernel>_guided".
+"""
+
+FLOAT_BYTES = 4
+
+KERNELS = {
+    "hw2_a": {"binary": "hw2-a", "label": "Dense (hw2-a)", "shape": "dense", "storage": "dense", "scheduled": False,
+              "batched": True},
+    "hw2_b": {"binary": "hw2-b", "label": "Triangular (hw2-b)", "shape": "triangular", "storage": "dense", "scheduled": True,
+              "batched": True},
+    "hw2_b_packed": {"binary": "hw2-b-packed", "label": "Packed triangular (hw2-b-packed)",
+                     "shape": "triangular", "storage": "packed", "scheduled": True, "batched": False},
+    "hw2_b_blocked": {"binary": "hw2-b-blocked", "label": "Blocked packed triangular (hw2-b-blocked)",
+                      "shape": "triangular", "storage": "packed", "scheduled": True, "batched": False},
+}
+# Schedule used for scheduled kernels outside the schedule comparison.
+DEFAULT_SCHEDULE = "guided"
+# Marker and line style per kernel, in KERNELS order, for charts with several kernels.
+STYLES = [('o', '-'), ('s', '--'), ('^', '-.'), ('D', ':')]
+
+
+def info(kernel):
+    """Registry entry for kernel; unknown kernels found in old results are treated as triangular."""
+    return KERNELS.get(kernel, {"binary": kernel.replace("_", "-"), "label": kernel, "shape": "triangular",
+                                "storage": "dense", "scheduled": True, "batched": False})
+
+
+def label(kernel):
+    return info(kernel)["label"]
+
+
+def short_label(kernel):
+    """Binary name, plus the schedule for scheduled kernels, e.g. "hw2-b ('guided')"."""
+    name = info(kernel)["binary"]
+    return f"{name} ('{DEFAULT_SCHEDULE}')" if info(kernel)["scheduled"] else name
+
+
+def style(kernel):
+    names = list(KERNELS)
+    return STYLES[names.index(kernel) % len(STYLES)] if kernel in KERNELS else STYLES[0]
+
+
+def result_key(kernel):
+    """Key of a kernel in the weak_scaling and placement sections of results.json."""
+    return f"{kernel}_{DEFAULT_SCHEDULE}" if info(kernel)["scheduled"] else kernel
+
+
+def parse_result_key(key):
+    """Inverse of result_key(): returns (kernel, schedule) with schedule '' for unscheduled kernels."""
+    suffix = f"_{DEFAULT_SCHEDULE}"
+    if key.endswith(suffix):
+        return key[:-len(suffix)], DEFAULT_SCHEDULE
+    return key, ''
+
+
+def ordered(kernel_names):
+    """Sorts kernel names in registry order, unknown kernels last."""
+    names = list(KERNELS)
+    return sorted(kernel_names, key=lambda k: (names.index(k) if k in names else len(names), k))
+
+
+def flops(kernel, n, rhs=1):
+    """Floating-point operations of one call with rhs vectors; works on ints and NumPy arrays."""
+    return rhs * (2 * n * n if info(kernel)["shape"] == "dense" else n * (n + 1))
+
+
+def matrix_elements(kernel, n):
+    """Matrix elements a call actually reads (the non-zeros)."""
+    return n * n if info(kernel)["shape"] == "dense" else n * (n + 1) // 2
+
+
+def matrix_bytes(kernel, n):
+    """Bytes allocated for A: triangular kernels with dense storage keep the zeros."""
+    return FLOAT_BYTES * (n * (n + 1) // 2 if info(kernel)["storage"] == "packed" else n * n)
+
+
+def storage_bytes(kernel, n, rhs=1):
+    """Bytes allocated for A, B and C."""
+    return matrix_bytes(kernel, n) + FLOAT_BYTES * 2 * n * rhs
@@ -0,0 +1,75 @@
+/**
+ * matrix.h
+ *
+ * Storage for the benchmark matrices, indexed with 64-bit offsets.
+ *
+ * By default a Matrix is an ordinary zero-initialized heap array. When the
+ * HW2_MATRIX_DIR environment variable names a directory, it is instead a shared
+ * memory mapping of a temporary file created there. The file is unlinked as soon
+ * as it is mapped, so it disappears when the process exits. The page cache then
+ * backs the matrix, which lets benchmark.py run sizes larger than physical RAM
+ * on nodes with large local disks or memory-backed file systems.
+ */
+
+#pragma once
+
+#include <cerrno>
+#include <cstddef>
+#include <cstdlib>
+#include <cstring>
+#include <iostream>
+#include <string>
+#include <vector>
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <unistd.h>
+
+class Matrix {
+public:
+    explicit Matrix(size_t count) : count_(count) {
+        const char* dir = std::getenv("HW2_MATRIX_DIR");
+        if (dir && *dir) {
+            map_file(dir);
+        } else {
+            heap_.assign(count, 0.0f);
+            data_ = heap_.data();
+        }
+    }
+    ~Matrix() {
+        if (mapped_) munmap(data_, count_ * sizeof(float));
+    }
+    Matrix(const Matrix&) = delete;
+    Matrix& operator=(const Matrix&) = delete;
+
+    float& operator[](size_t i) { return data_[i]; }
+    const float& operator[](size_t i) const { return data_[i]; }
+    bool mapped() const { return mapped_; }
+
+private:
+    // Maps a new, already unlinked file of count_ floats; the file system zero-fills it.
+    void map_file(const std::string& dir) {
+        std::string path = dir + "/hw2-matrix-XXXXXX";
+        std::vector<char> name(path.begin(), path.end());
+        name.push_back('\0');
+        int fd = mkstemp(name.data());
+        if (fd < 0) fail("could not create a matrix file in " + dir);
+        unlink(name.data());
+        size_t bytes = count_ * sizeof(float);
+        if (ftruncate(fd, (off_t)bytes) != 0) fail("could not size the matrix file");
+        void* p = mmap(nullptr, bytes, PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0);
+        close(fd); // The mapping keeps the file alive.
+        if (p == MAP_FAILED) fail("could not map the matrix file");
+        data_ = static_cast<float*>(p);
+        mapped_ = true;
+    }
+
+    static void fail(const std::string& what) {
+        std::cerr << "Error: " << what << ": " << std::strerror(errno) << std::endl;
+        std::exit(1);
+    }
+
+    size_t count_;
+    float* data_ = nullptr;
+    bool mapped_ = false;
+    std::vector<float> heap_;
+};
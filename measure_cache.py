@@ -0,0 +1,137 @@
+"""
+Persistent cache of benchmark measurements.
+
+A measurement is reusable only if everything that can change its outcome is
+unchanged, so entries are keyed on a hash of: the built binary's contents, the
+compile command line, the run arguments (N, schedule), the thread count, the
+OpenMP environment (OMP_PROC_BIND, OMP_PLACES, ...), the host fingerprint and
+the sampling parameters. Editing hw2-b.cpp therefore only changes the hw2-b keys.
+
+Entries are small JSON files under CACHE_DIR. Hits refresh the file's mtime and
+evict() drops the least recently used entries once the cache outgrows max_bytes.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import platform
+
+CACHE_DIR = ".measure_cache"
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+# Environment variables that influence an OpenMP run. OMP_NUM_THREADS is excluded
+# because the thread count is already part of every key.
+ENV_PREFIXES = ("OMP_", "GOMP_", "KMP_")
+
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def host_fingerprint():
+    """Identifies the machine a measurement was taken on."""
+    cpu_model = ""
+    try:
+        with open("/proc/cpuinfo", "r") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    cpu_model = line.split(":", 1)[1].strip()
+                    break
+    except OSError:
+        pass
+    return {
+        "node": platform.node(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "cpu_model": cpu_model or platform.processor(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def host_id():
+    """Short, stable identifier of this machine, for tables keyed by host."""
+    payload = json.dumps(host_fingerprint(), sort_keys=True).encode()
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+def run_environment(env=None):
+    env = os.environ if env is None else env
+    return {k: v for k, v in sorted(env.items()) if k.startswith(ENV_PREFIXES) and k != "OMP_NUM_THREADS"}
+
+
+def make_key(**parts):
+    payload = json.dumps(parts, sort_keys=True, default=str).encode()
+    return hashlib.sha256(payload).hexdigest()
+
+
+class MeasurementCache:
+    """Directory-backed key -> record store with size-bounded LRU eviction."""
+
+    def __init__(self, root=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def _entries(self):
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.endswith(".json"):
+                    yield os.path.join(dirpath, name)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        os.utime(path)  # Mark as recently used for eviction.
+        return entry["record"]
+
+    def put(self, key, record, meta):
+        """Stores a record atomically; meta describes the point for invalidate()."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"meta": meta, "record": record}, f)
+        os.replace(tmp_path, path)
+
+    def invalidate(self, **match):
+        """Removes entries whose meta matches every given field; no fields clears everything."""
+        removed = 0
+        for path in list(self._entries()):
+            if match:
+                try:
+                    with open(path, "r") as f:
+                        meta = json.load(f).get("meta", {})
+                except (OSError, json.JSONDecodeError):
+                    meta = {}
+                if any(str(meta.get(k)) != str(v) for k, v in match.items()):
+                    continue
+            os.remove(path)
+            removed += 1
+        return removed
+
+    def evict(self):
+        """Drops least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for path in self._entries():
+            st = os.stat(path)
+            entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            removed += 1
+        return removed
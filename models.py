@@ -0,0 +1,231 @@
+"""
+Scaling models fitted to Gflop/s-vs-threads curves.
+
+Every model has two parameters, fitted by least squares on the medians:
+
+  amdahl      P(t) = p1 * t / (1 + s * (t - 1))   strong scaling with serial fraction s
+  gustafson   P(t) = p1 * (s + (1 - s) * t)       weak scaling with serial fraction s
+  saturation  P(t) = min(r * t, p_max)            linear until memory bandwidth saturates
+
+Points with a zero median (a failed or degenerate measurement) carry no scaling
+information and are left out of every fit.
+
+fit_curve() fits the models that apply to one curve (Amdahl and saturation for
+strong scaling, Gustafson and saturation for weak scaling) and picks the one
+with the lowest relative RMSE. predict() evaluates a fit at any thread count,
+predict_size() interpolates between the fits of neighbouring matrix sizes, and
+leave_one_out_error() is the out-of-sample error benchmark.py --prune uses to
+decide which grid points a fit already predicts.
+
+    python models.py [--profile P] [--scaling weak] [--predict-n 3000 --predict-threads 64 128]
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+
+import numpy as np
+
+import kernels
+import results_store
+
+STRONG_MODELS = ("amdahl", "saturation")
+WEAK_MODELS = ("gustafson", "saturation")
+# Serial fractions are searched on a grid of this many values in [0, 1], then refined once around the best.
+FRACTION_GRID = 1001
+
+
+# --- Models ---
+
+def _shape(model, t, s):
+    """P(t) / p1 for the serial-fraction models; broadcasts over arrays of t and s."""
+    if model == "amdahl":
+        return t / (1 + s * (t - 1))
+    return s + (1 - s) * t
+
+
+def _fit_fraction(model, t, p):
+    """Least-squares (p1, s) with s in [0, 1]: p1 has a closed form for every s on the grid."""
+    grid, step = np.linspace(0.0, 1.0, FRACTION_GRID), 1.0 / (FRACTION_GRID - 1)
+    for _ in range(2):
+        g = _shape(model, t[None, :], grid[:, None])
+        p1 = (g @ p) / (g * g).sum(axis=1)
+        best = ((p1[:, None] * g - p) ** 2).sum(axis=1).argmin()
+        params = {"p1": float(p1[best]), "s": float(grid[best])}
+        grid = np.clip(np.linspace(grid[best] - step, grid[best] + step, 201), 0.0, 1.0)
+    return params
+
+
+def _fit_saturation(t, p):
+    """Least-squares (r, p_max), trying every split of the sorted points into a rising and a flat part."""
+    order = np.argsort(t)
+    t, p = t[order], p[order]
+    best = None
+    for k in range(len(t) + 1):
+        rising, flat = slice(0, k), slice(k, len(t))
+        if k == 0:
+            p_max = float(p.mean())
+            r = p_max / t[0]
+        else:
+            r = float((p[rising] * t[rising]).sum() / (t[rising] ** 2).sum())
+            p_max = float(p[flat].mean()) if k < len(t) else None
+        params = {"r": r, "p_max": p_max}
+        sse = float(((predict(dict(params, model="saturation"), t) - p) ** 2).sum())
+        if best is None or sse < best[0]:
+            best = (sse, params)
+    params = best[1]
+    params["knee"] = params["p_max"] / params["r"] if params["p_max"] is not None else None
+    return params
+
+
+def _measured(threads, gflops):
+    """(t, p) as float arrays, without the points whose median is not positive."""
+    t, p = np.asarray(threads, dtype=float), np.asarray(gflops, dtype=float)
+    keep = p > 0
+    return t[keep], p[keep]
+
+
+def fit(model, threads, gflops):
+    """Fits one model to a curve; returns its parameters plus 'r2' and 'rmse_rel' on the fitted points."""
+    t, p = _measured(threads, gflops)
+    params = _fit_saturation(t, p) if model == "saturation" else _fit_fraction(model, t, p)
+    result = dict(params, model=model)
+    residuals = predict(result, t) - p
+    total = ((p - p.mean()) ** 2).sum()
+    result["r2"] = float(1 - (residuals ** 2).sum() / total) if total > 0 else 1.0
+    result["rmse_rel"] = float(np.sqrt(np.mean((residuals / p) ** 2)))
+    return result
+
+
+def predict(model_fit, threads):
+    """Gflop/s a fit predicts at a thread count (or array of them)."""
+    t = np.asarray(threads, dtype=float)
+    if model_fit["model"] == "saturation":
+        rising = model_fit["r"] * t
+        return rising if model_fit["p_max"] is None else np.minimum(rising, model_fit["p_max"])
+    return model_fit["p1"] * _shape(model_fit["model"], t, model_fit["s"])
+
+
+def fit_curve(threads, gflops, weak=False):
+    """Fits every applicable model; returns {'best': name, 'fits': {name: fit}}, or None with under two points."""
+    threads, gflops = _measured(threads, gflops)
+    if len(set(threads.tolist())) < 2:
+        return None
+    fits = {model: fit(model, threads, gflops) for model in (WEAK_MODELS if weak else STRONG_MODELS)}
+    return {"best": min(fits, key=lambda m: fits[m]["rmse_rel"]), "fits": fits}
+
+
+def leave_one_out_error(threads, gflops, model):
+    """Largest relative error predicting each point from a fit to the others; inf with under three points."""
+    t, p = _measured(threads, gflops)
+    if len(set(t.tolist())) < 3:
+        return math.inf
+    errors = []
+    for i in range(len(t)):
+        rest = np.arange(len(t)) != i
+        errors.append(abs(float(predict(fit(model, t[rest], p[rest]), t[i])) - p[i]) / p[i])
+    return max(errors)
+
+
+def predict_size(fits_by_size, n, threads):
+    """Predicts Gflop/s at size n from {N: fit_curve() result}; returns (gflops, extrapolated).
+
+    Between measured sizes the best fits of the two neighbours are evaluated at
+    the thread count and interpolated linearly in log N; outside the measured
+    range the nearest size is used as is.
+    """
+    sizes = sorted(fits_by_size)
+    value = lambda size: float(predict(fits_by_size[size]["fits"][fits_by_size[size]["best"]], threads))
+    if n <= sizes[0] or n >= sizes[-1]:
+        nearest = sizes[0] if n <= sizes[0] else sizes[-1]
+        return value(nearest), n != nearest
+    upper = next(size for size in sizes if size >= n)
+    lower = sizes[sizes.index(upper) - 1]
+    if upper == n:
+        return value(n), False
+    w = (math.log(n) - math.log(lower)) / (math.log(upper) - math.log(lower))
+    return (1 - w) * value(lower) + w * value(upper), False
+
+
+def prediction_threads(measured):
+    """Unmeasured powers of two up to twice the largest measured thread count."""
+    top = 2 * max(measured)
+    return [1 << i for i in range(top.bit_length()) if (1 << i) <= top and (1 << i) not in measured]
+
+
+# --- Curves from results ---
+
+def curves(data, profile, scaling="strong"):
+    """Returns {kernel: {N: (threads, gflops)}} of a ResultsTable's headline rows, sorted by threads."""
+    rows = data.headline(scaling, profile)
+    result = {}
+    for kernel in kernels.ordered(set(rows['kernel'].tolist())):
+        for size in sorted(set(rows['N'][rows['kernel'] == kernel].tolist())):
+            sel = rows[(rows['kernel'] == kernel) & (rows['N'] == size)]
+            sel = sel[np.argsort(sel['threads'], kind='stable')]
+            result.setdefault(kernel, {})[size] = (sel['threads'].tolist(), sel['gflops'].tolist())
+    return result
+
+
+def describe_fit(model_fit):
+    """One-line summary of a fit's parameters and quality."""
+    if model_fit["model"] == "saturation":
+        text = f"r={model_fit['r']:.2f} Gflop/s per thread"
+        text += (f", saturating at {model_fit['p_max']:.2f} Gflop/s from {model_fit['knee']:.1f} threads"
+                 if model_fit["p_max"] is not None else ", not saturated")
+    else:
+        text = f"P1={model_fit['p1']:.2f} Gflop/s, serial fraction s={model_fit['s']:.3f}"
+    return f"{model_fit['model']}: {text} (R2 {model_fit['r2']:.3f}, RMSE {100 * model_fit['rmse_rel']:.1f}%)"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fits Amdahl/Gustafson and bandwidth-saturation models to results.json.")
+    parser.add_argument("--results", default="results.json")
+    parser.add_argument("--profile", help="Compiler profile to fit; defaults to the first one in the results.")
+    parser.add_argument("--scaling", choices=["strong", "weak"], default="strong")
+    parser.add_argument("--predict-n", type=int, help="Also predict every kernel at this (base) matrix size.")
+    parser.add_argument("--predict-threads", nargs="+", type=int, default=[],
+                        help="Thread counts to predict; defaults to unmeasured powers of two.")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.results):
+        print(f"Error: {args.results} not found. Run benchmark.py first.")
+        return 1
+    data = results_store.load_results(args.results)
+    profile = args.profile or (data.profiles[0] if data.profiles else None)
+    by_kernel = curves(data, profile, args.scaling) if profile else {}
+    if not by_kernel:
+        print(f"Error: no {args.scaling}-scaling results for profile '{profile}'.")
+        return 1
+    output = {}
+    for kernel, by_size in by_kernel.items():
+        fits = {size: fit_curve(t, p, args.scaling == "weak") for size, (t, p) in by_size.items()}
+        fits = {size: f for size, f in fits.items() if f}
+        if not fits: continue
+        measured = sorted({t for threads, _ in by_size.values() for t in threads})
+        threads = args.predict_threads or prediction_threads(measured)
+        output[kernel] = {"fits": {str(size): f for size, f in fits.items()},
+                          "predictions": {str(size): {str(t): float(predict(f["fits"][f["best"]], t)) for t in threads}
+                                          for size, f in fits.items()}}
+        if args.predict_n:
+            output[kernel]["predictions"][str(args.predict_n)] = {
+                str(t): predict_size(fits, args.predict_n, t)[0] for t in threads}
+    if args.json:
+        print(json.dumps(output, indent=2))
+        return 0
+    print(f"{args.scaling.title()}-scaling fits for profile '{profile}' (best model first):")
+    for kernel, entry in output.items():
+        for size, curve in entry["fits"].items():
+            print(f"  {kernel} N={size}:")
+            for model in sorted(curve["fits"], key=lambda m: m != curve["best"]):
+                print(f"    {describe_fit(curve['fits'][model])}")
+        for size, predicted in entry["predictions"].items():
+            print(f"  {kernel} N={size} predicted: " + ", ".join(f"{t}T {g:.2f}" for t, g in predicted.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
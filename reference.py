@@ -0,0 +1,130 @@
+"""
+NumPy reference kernels for validating the benchmark binaries and for a BLAS baseline.
+
+Every binary fills A[i][j] = 1/(i+j+2) and B[i] = 1/(i+2) and prints three checksums
+of C: its plain sum, a position-weighted sum, sum((i+1) * C[i]) / n, which also
+catches rows written to the wrong place, and its smallest entry. Batched runs
+with k right-hand sides use B[i][r] = 1/(i+r+2) and cover all k columns of C.
+reference_checksums() recomputes them with `A @ B` (dense) or `np.tril(A) @ B` (triangular, whatever the storage)
+in float64, building A one row block at a time so large weak-scaling sizes stay
+within memory.
+
+All terms are positive, so a float32 row sum of n products is within about
+n * eps32 of the exact value; checksum_tolerance() uses that bound. The sums
+alone cannot catch a single missing row at large n: its share of either sum is
+about 1/n, which plain float32 accumulation already approaches by N ~ 16k. Every
+entry of a correct C is positive and the binaries start from a zeroed C, so a
+row that was never written makes the smallest entry 0, a relative error of 1.
+"""
+
+import functools
+import time
+
+import numpy as np
+
+import kernels
+import stats
+
+BLOCK_ROWS = 1024
+# Repetitions of the NumPy baseline per size; the median is reported.
+BASELINE_REPEATS = 7
+
+
+def _init(n, rows, dtype):
+    i = np.arange(rows.start, rows.stop, dtype=dtype)[:, None]
+    j = np.arange(n, dtype=dtype)[None, :]
+    return 1 / (i + j + 2)
+
+
+def _vector(n, dtype, rhs=1):
+    """B as an n x rhs matrix, or a plain vector when rhs is 1."""
+    if rhs == 1:
+        return 1 / (np.arange(n, dtype=dtype) + 2)
+    return 1 / (np.arange(n, dtype=dtype)[:, None] + np.arange(rhs, dtype=dtype)[None, :] + 2)
+
+
+def reference_checksums(kernel, n, rhs=1):
+    """Returns (sum, weighted sum, smallest entry) of C for a kernels.KERNELS entry at size n with rhs vectors."""
+    return _checksums(kernels.info(kernel)["shape"], n, rhs)
+
+
+# Keyed by matrix shape, so the triangular kernels share one reference; an entry is three floats.
+@functools.lru_cache(maxsize=None)
+def _checksums(shape, n, rhs):
+    triangular = shape == "triangular"
+    B = _vector(n, np.float64, rhs)
+    C = np.empty((n, rhs)) if rhs > 1 else np.empty(n)
+    for start in range(0, n, BLOCK_ROWS):
+        rows = range(start, min(start + BLOCK_ROWS, n))
+        A = _init(n, rows, np.float64)
+        if triangular:
+            A = np.tril(A, k=start)  # Row start+r keeps columns 0..start+r.
+        C[start:rows.stop] = A @ B
+    weights = np.arange(1, n + 1).reshape((n,) + (1,) * (C.ndim - 1))
+    return float(C.sum()), float((weights * C).sum() / n), float(C.min())
+
+
+def checksum_tolerance(n):
+    """Largest relative checksum error a correct float32 kernel can produce at size n."""
+    return (n + 4) * float(np.finfo(np.float32).eps)
+
+
+def parse_checksums(output):
+    """Returns the (sum, weighted, smallest) checksums printed by hw2-a/hw2-b, or None."""
+    for line in output.splitlines():
+        if line.startswith("Checksum"):
+            try:
+                return tuple(float(x) for x in line.split(":", 1)[1].split())
+            except ValueError:
+                return None
+    return None
+
+
+def validate(kernel, n, output, rhs=1):
+    """Checks a run's printed checksums; returns (relative error, error message or None)."""
+    measured = parse_checksums(output)
+    if not measured:
+        return None, "no 'Checksum' line in output"
+    return check(kernel, n, measured, rhs)
+
+
+def check(kernel, n, measured, rhs=1):
+    """Compares (sum, weighted, smallest) checksums with the reference; returns (relative error, error or None)."""
+    expected = reference_checksums(kernel, n, rhs)
+    if len(measured) != len(expected):
+        return None, f"expected {len(expected)} checksums, got {len(measured)}"
+    rel_error = max(abs(m - e) / abs(e) for m, e in zip(measured, expected))
+    if not rel_error <= checksum_tolerance(n):  # Also rejects NaN.
+        return rel_error, f"checksum mismatch (relative error {rel_error:.2e} > {checksum_tolerance(n):.2e})"
+    return rel_error, None
+
+
+def baseline_bytes(n):
+    """Peak memory of numpy_baseline() at size n: A plus the temporaries of one row block."""
+    return np.dtype(np.float32).itemsize * n * (n + 4 * min(BLOCK_ROWS, n))
+
+
+def numpy_baseline(shape, n, repeats=BASELINE_REPEATS):
+    """Times the library version of a matrix shape and returns its stats.summarize() record.
+
+    'dense' is a float32 `A @ B`; 'triangular' is `np.tril(A) @ B`, i.e. a full BLAS
+    gemv on the zero-padded matrix, credited with the triangular kernels' n(n+1) flops.
+    Uses whatever threads the BLAS library is configured for. A is filled one row
+    block at a time, so the peak footprint is baseline_bytes(n).
+    """
+    A = np.empty((n, n), dtype=np.float32)
+    for start in range(0, n, BLOCK_ROWS):
+        rows = range(start, min(start + BLOCK_ROWS, n))
+        block = _init(n, rows, np.float32)
+        A[start:rows.stop] = np.tril(block, k=start) if shape == 'triangular' else block
+    B = _vector(n, np.float32)
+    flops = 2.0 * n * n if shape == 'dense' else float(n) * (n + 1)
+    A @ B  # Warm-up, like the binaries.
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        A @ B
+        elapsed = time.perf_counter() - start
+        if elapsed > 0:
+            samples.append(flops / elapsed / 1e9)
+    return stats.summarize(samples)
@@ -1,21 +1,41 @@
+import argparse
 import json
 import os
-import matplotlib.pyplot as plt
-from fpdf import FPDF
-from collections import defaultdict
-import math
-import traceback
+import sys
+import numpy as np
+import results_store
+import analysis
+import charts
+import history
+import kernels
+import models
+import roofline
+import topology
 
 # --- Configuration ---
 RESULTS_FILE = "results.json"
 PDF_FILE = "hw2.pdf"
 LOG_FILE = "ai-usage.txt"
-CHART_STRONG_SCALING = "strong_scaling.png"
-CHART_WEAK_SCALING = "weak_scaling.png"
-CHART_SCHEDULING = "scheduling_performance.png"
-
-def generate_report(data):
-    """Generates the full PDF report from the structured benchmark data."""
+# Unmeasured points listed by name in the report before the list is cut short.
+MAX_LISTED_POINTS = 8
+
+def generate_report(data, history_db=history.HISTORY_DB):
+    """Generates the full PDF report from a results_store.ResultsTable."""
+    from fpdf import FPDF  # Deferred so the summary mode never pays for it.
+    results = analysis.analyze(data)
+    best_profile_for_scheduling_analysis = analysis.best_profile(results, "guided")
+    best_profile_key = analysis.best_profile(results, results['best_schedule'])
+    trend, comparison = load_history(history_db, best_profile_key)
+    chart_files = charts.render_charts({
+        'scheduling': charts.schedule_chart_spec(data, best_profile_for_scheduling_analysis),
+        'strong': charts.scaling_chart_spec(data, best_profile_key, "Strong Scaling Comparison"),
+        'weak': charts.scaling_chart_spec(data, best_profile_key, "Weak Scaling Comparison", is_weak=True),
+        'roofline': roofline.roofline_chart_spec(data, best_profile_key),
+        'counters': charts.counters_chart_spec(data, best_profile_key),
+        'placement': charts.placement_chart_spec(data, best_profile_key),
+        'batched': charts.batched_chart_spec(data, best_profile_key),
+        'history': history.trend_chart_spec(trend, best_profile_key) if trend else None,
+    })
     pdf = FPDF()
     pdf.add_page()
     pdf.set_font("Helvetica", size=12)
@@ -32,6 +52,7 @@ def generate_report(data):
     pdf.multi_cell(0, 5, 
         "This report analyzes the performance of two parallel matrix-vector multiplication algorithms implemented using OpenMP: "
         "a standard dense matrix multiplication (hw2-a) and a specialized version for lower-triangular matrices (hw2-b). "
+        "Two further variants of hw2-b store only the lower triangle (hw2-b-packed) and additionally process rows in register blocks (hw2-b-blocked). "
         "The analysis focuses on comparing different compiler optimization strategies, evaluating OpenMP scheduling policies, and analyzing the scaling characteristics of the parallel implementations.")
     pdf.ln(5)
     
@@ -39,18 +60,16 @@ def generate_report(data):
     pdf.set_font("Helvetica", "B", 14)
     pdf.cell(0, 10, "2. Analysis of OpenMP Scheduling Strategies for hw2-b", ln=True)
     
-    best_profile_for_scheduling_analysis = find_best_profile_by_wins(data, create_optimization_table(None, data, "guided"))
-    generate_schedule_performance_chart(data.get(best_profile_for_scheduling_analysis, {}))
-    if os.path.exists(CHART_SCHEDULING):
-        pdf.image(CHART_SCHEDULING, x=10, y=None, w=180)
+    if chart_files['scheduling']:
+        pdf.image(chart_files['scheduling'], x=10, y=None, w=180)
     else:
         pdf.set_font("Helvetica", "I", 10)
         pdf.cell(0, 10, "[Scheduling performance chart could not be generated. Check console for errors.]", ln=True, align="C")
 
 
     pdf.set_font("Helvetica", size=10)
-    analysis_text, best_schedule = analyze_schedules(data)
-    pdf.multi_cell(0, 5, analysis_text)
+    best_schedule = results['best_schedule']
+    pdf.multi_cell(0, 5, describe_schedules(results))
     pdf.ln(5)
 
     # --- Compiler Optimization Strategies ---
@@ -83,37 +102,50 @@ def generate_report(data):
     pdf.multi_cell(0, 5,
         f"The following table compares the performance of the triangular matrix-vector multiplication (hw2-b) "
         f"across the different compiler profiles. For each data point, the results from the best-performing schedule ('{best_schedule}') were used. "
-        "The table shows the peak performance in Gflop/s and, in parentheses, the optimal thread count. "
-        "The best compiler optimization for each matrix size is highlighted.")
+        "The table shows the peak median performance in Gflop/s and, in parentheses, the optimal thread count. "
+        "The best compiler optimization for each matrix size is highlighted; when several profiles are highlighted in a row, "
+        "their 95% confidence intervals overlap and the difference between them is not statistically significant.")
     pdf.ln(5)
-    table_data = create_optimization_table(pdf, data, best_schedule)
+    render_optimization_table(pdf, results, best_schedule)
     pdf.ln(5)
 
     # --- Scaling Analysis ---
-    best_profile_key = find_best_profile_by_wins(data, table_data)
     pdf.set_font("Helvetica", "B", 14)
     pdf.cell(0, 10, f"5. Scaling Analysis (using '{best_profile_key}' profile)", ln=True)
     pdf.set_font("Helvetica", size=10)
     pdf.multi_cell(0, 5, f"The following graphs illustrate strong and weak scaling performance. These results were generated using the '{best_profile_key}' compilation profile. Both charts show side-by-side comparisons for all tested matrix size configurations.")
     pdf.ln(5)
 
-    if best_profile_key and best_profile_key in data:
-        profile_data = data[best_profile_key]
-        generate_scaling_chart(profile_data, "Strong Scaling Comparison", CHART_STRONG_SCALING)
-        generate_scaling_chart(profile_data, "Weak Scaling Comparison", CHART_WEAK_SCALING, is_weak=True)
-        if os.path.exists(CHART_STRONG_SCALING): 
-            pdf.image(CHART_STRONG_SCALING, x=10, y=None, w=180)
+    if best_profile_key and best_profile_key in data.profiles:
+        if chart_files['strong']: 
+            pdf.image(chart_files['strong'], x=10, y=None, w=180)
         else:
             pdf.set_font("Helvetica", "I", 10)
             pdf.cell(0, 10, "[Strong scaling chart could not be generated. Check console for errors.]", ln=True, align="C")
         pdf.ln(5)
-        if os.path.exists(CHART_WEAK_SCALING): 
-            pdf.image(CHART_WEAK_SCALING, x=10, y=None, w=180)
+        if chart_files['weak']: 
+            pdf.image(chart_files['weak'], x=10, y=None, w=180)
         else:
             pdf.set_font("Helvetica", "I", 10)
             pdf.cell(0, 10, "[Weak scaling chart could not be generated. Check console for errors.]", ln=True, align="C")
+        pdf.ln(5)
+        pdf.set_font("Helvetica", size=10)
+        pdf.multi_cell(0, 5, describe_numpy_baseline(data, best_profile_key))
     else:
         pdf.cell(0, 10, "Could not generate scaling charts: Best profile data not found.", ln=True)
+    pdf.ln(4)
+    pdf.set_font("Helvetica", "B", 10)
+    pdf.cell(0, 8, "Kernel Variants and Storage Layout", ln=True)
+    pdf.set_font("Helvetica", size=10)
+    pdf.multi_cell(0, 5, describe_kernels(results, data, best_profile_key))
+    pdf.ln(4)
+    pdf.set_font("Helvetica", "B", 10)
+    pdf.cell(0, 8, "Batched Right-Hand Sides", ln=True)
+    pdf.set_font("Helvetica", size=10)
+    pdf.multi_cell(0, 5, describe_batched(results, data, best_profile_key))
+    if chart_files['batched']:
+        pdf.ln(2)
+        pdf.image(chart_files['batched'], x=10, y=None, w=180)
 
     pdf.add_page() 
     
@@ -126,7 +158,8 @@ def generate_report(data):
     pdf.multi_cell(0, 5, 
         "Strong scaling measures how the execution time varies for a fixed total problem size as the number of threads increases. "
         "Ideally, performance (Gflop/s) should increase linearly with the number of threads (the 'ideal speedup' line). The charts show this ideal case as a dashed line. The observed results typically show a curve that achieves good speedup initially but then flattens out at higher thread counts. "
-        "This is explained by Amdahl's Law, where speedup is limited by sequential code portions and parallel overhead. This effect is more pronounced at smaller matrix sizes, where the amount of parallel work is not large enough to overcome the overhead of managing many threads.")
+        "This is explained by Amdahl's Law, where speedup is limited by sequential code portions and parallel overhead. This effect is more pronounced at smaller matrix sizes, where the amount of parallel work is not large enough to overcome the overhead of managing many threads. "
+        "The fitted models below quantify the flattening for each curve.")
     pdf.ln(4)
     pdf.set_font("Helvetica", "B", 10)
     pdf.cell(0, 8, "Weak Scaling Insights", ln=True)
@@ -137,6 +170,11 @@ def generate_report(data):
         "In practice, performance often falls short of this ideal. This is typically due to system-level bottlenecks that become more pronounced as the total problem size grows, such as increased contention for shared memory bandwidth or limitations in cache capacity. "
         "By comparing the plots, we can see that experiments starting with a larger base N tend to achieve higher absolute Gflop/s, likely due to a better computation-to-communication ratio.")
     pdf.ln(4)
+    pdf.set_font("Helvetica", "B", 10)
+    pdf.cell(0, 8, "Fitted Scaling Models", ln=True)
+    pdf.set_font("Helvetica", size=10)
+    pdf.multi_cell(0, 5, describe_scaling_models(results, data, best_profile_key))
+    pdf.ln(4)
 
     # ADDED: New section explaining memory bandwidth saturation.
     pdf.set_font("Helvetica", "B", 10)
@@ -147,6 +185,39 @@ def generate_report(data):
         "The primary bottleneck is not the CPU's computational power, but the speed at which it can fetch data from main memory (RAM). This is known as the memory bandwidth limit. When an excessive number of threads are launched simultaneously, they all contend for access to this limited memory bandwidth. This creates a \"traffic jam\" on the memory bus, causing most threads to spend their time waiting for data rather than performing calculations.\n\n"
         "The benchmark script carefully tests a range of thread counts (1 to 32) to find the optimal point where the system's memory bandwidth can effectively service the active cores. This 'sweet spot' delivers the peak performance seen in the graphs. Launching threads beyond this point leads to diminishing returns and eventually a sharp drop in performance due to memory contention and parallel overhead, demonstrating a critical concept in high-performance computing: scaling is limited by the most constrained resource, which in this case is memory bandwidth."
     )
+    pdf.ln(4)
+
+    pdf.set_font("Helvetica", "B", 10)
+    pdf.cell(0, 8, "Measured Memory Bandwidth (Roofline)", ln=True)
+    pdf.set_font("Helvetica", size=10)
+    pdf.multi_cell(0, 5, describe_bandwidth(data, best_profile_key))
+    if chart_files['roofline']:
+        pdf.ln(2)
+        pdf.image(chart_files['roofline'], x=10, y=None, w=180)
+    pdf.ln(5)
+    pdf.set_font("Helvetica", "B", 12)
+    pdf.cell(0, 8, "Resource Usage and Hardware Counters", ln=True)
+    pdf.set_font("Helvetica", size=10)
+    pdf.multi_cell(0, 5, describe_counters(data, best_profile_key))
+    if chart_files['counters']:
+        pdf.ln(2)
+        pdf.image(chart_files['counters'], x=10, y=None, w=180)
+    pdf.ln(5)
+    pdf.set_font("Helvetica", "B", 12)
+    pdf.cell(0, 8, "Thread Placement and Topology", ln=True)
+    pdf.set_font("Helvetica", size=10)
+    pdf.multi_cell(0, 5, describe_placements(results, data, best_profile_key))
+    if chart_files['placement']:
+        pdf.ln(2)
+        pdf.image(chart_files['placement'], x=10, y=None, w=180)
+    pdf.ln(5)
+    pdf.set_font("Helvetica", "B", 12)
+    pdf.cell(0, 8, "Performance History", ln=True)
+    pdf.set_font("Helvetica", size=10)
+    pdf.multi_cell(0, 5, describe_history(trend, comparison))
+    if chart_files['history']:
+        pdf.ln(2)
+        pdf.image(chart_files['history'], x=10, y=None, w=180)
     pdf.ln(10)
 
     # --- Reflection on AI Tool Usage ---
@@ -167,37 +238,22 @@ def generate_report(data):
 
     pdf.output(PDF_FILE)
     print(f"Report successfully generated: {PDF_FILE}")
-    # Clean up the generated chart images after they have been embedded in the PDF
-    for chart_file in [CHART_STRONG_SCALING, CHART_WEAK_SCALING, CHART_SCHEDULING]:
-        if os.path.exists(chart_file):
-            os.remove(chart_file)
 
     create_submission_archive()
 
-def analyze_schedules(data):
-    """Analyzes schedule performance and generates a specific explanation based on the winner."""
-    schedule_scores = defaultdict(float)
-    if not data: return "Could not determine the best schedule due to missing data.", "guided"
+def describe_schedules(results):
+    """Explains the schedule ranking from a precomputed analysis."""
+    if not results['schedules']: return "No valid performance data found for any schedule."
+    schedules, best_schedule = results['schedules'], results['best_schedule']
+    significant_wins = results['schedule_wins']
     
-    for profile_data in data.values():
-        try:
-            for size_data in profile_data['general_perf']['hw2_b'].values():
-                for schedule_key, thread_data in size_data.items():
-                    schedule_name = schedule_key.replace("schedule_", "")
-                    for gflops_str in thread_data.values():
-                        try:
-                            schedule_scores[schedule_name] += float(gflops_str)
-                        except (ValueError, TypeError):
-                            continue
-        except KeyError:
-            continue
-            
-    if not schedule_scores: return "No valid performance data found for any schedule.", "guided"
-    
-    best_schedule = max(schedule_scores, key=schedule_scores.get)
-    
-    intro = ("The chart above visually compares the performance of the three main OpenMP scheduling strategies for the triangular matrix multiplication (hw2-b), which has an imbalanced workload. The workload is heaviest for the last rows of the matrix and lightest for the first rows.\n\n"
-             f"Based on the cumulative performance across all tests, the '{best_schedule}' scheduling strategy was determined to be the most effective. ")
+    intro = ("The chart above visually compares the performance of the three main OpenMP scheduling strategies for the triangular matrix multiplication (hw2-b), which has an imbalanced workload. The workload is heaviest for the last rows of the matrix and lightest for the first rows.\n\n")
+    if not significant_wins:
+        intro += (f"No schedule was statistically significantly faster than the others at any tested point (the 95% confidence intervals of the medians overlap everywhere), so the choice of '{best_schedule}' below, based on cumulative median performance, should be read as a tie rather than a clear win. ")
+    else:
+        win_summary = ", ".join(f"'{s}' {significant_wins.get(s, 0)}" for s in sorted(schedules, key=lambda s: -significant_wins.get(s, 0)))
+        intro += (f"A schedule is credited with a win at a given profile, size and thread count only when its median is significantly higher than every other schedule's (non-overlapping 95% confidence intervals). Significant wins: {win_summary}. "
+                  f"On that basis, the '{best_schedule}' scheduling strategy was determined to be the most effective. ")
 
     # REVISED: Provide a specific explanation for why the winning schedule performed best.
     explanations = {
@@ -217,218 +273,41 @@ def analyze_schedules(data):
     
     conclusion = explanations.get(best_schedule, "The reason for this schedule's superior performance is likely its specific approach to balancing workload distribution against scheduling overhead.")
     
-    return intro + conclusion, best_schedule
+    return intro + conclusion
 
 
-def get_peak_performance_for_size(profile_data, size, best_schedule):
-    best_gflops, best_threads = 0.0, 0
-    try:
-        schedule_key = f"schedule_{best_schedule}"
-        thread_data = profile_data['general_perf']['hw2_b'][size][schedule_key]
-        for thread, gflops in thread_data.items():
-            try: gflops_val = float(gflops)
-            except (ValueError, TypeError): gflops_val = 0.0
-            if gflops_val > best_gflops:
-                best_gflops, best_threads = gflops_val, int(thread[1:])
-    except (KeyError, TypeError): pass
-    return {'gflops': best_gflops, 'threads': best_threads}
-
-def create_optimization_table(pdf, data, best_schedule):
-    if not data:
-        if pdf: pdf.cell(0, 10, "No data available to generate table.", ln=True)
-        return {}
-    profile_keys = list(data.keys())
-    table_data = defaultdict(dict)
-    if pdf:
-        pdf.set_font("Helvetica", "B", 10)
-        col_width = 180 / (len(profile_keys) + 1)
-        header = ["Matrix Size"] + [k.replace("_", " ").title() for k in profile_keys]
-        for item in header: pdf.cell(col_width, 10, item, border=1, align="C")
-        pdf.ln()
-        pdf.set_font("Helvetica", size=9)
-    try:
-        matrix_sizes = sorted(data[profile_keys[0]]['general_perf']['hw2_b'].keys(), key=lambda x: int(x[1:]))
-    except (KeyError, IndexError, TypeError):
-        if pdf: pdf.cell(0, 10, "No valid hw2-b performance data found to build table.", ln=True)
-        return {}
-    for size in matrix_sizes:
-        row_data = [get_peak_performance_for_size(data.get(p, {}), size, best_schedule) for p in profile_keys]
-        for i, p in enumerate(profile_keys):
-            table_data[size][p] = row_data[i]
-        if pdf:
-            max_gflops_in_row = max(d['gflops'] for d in row_data) if row_data else 0.0
-            pdf.cell(col_width, 10, f"{size[1:]}x{size[1:]}", border=1, align="C")
-            for cell_data in row_data:
-                is_best = cell_data['gflops'] == max_gflops_in_row and max_gflops_in_row > 0.0
-                if is_best: pdf.set_fill_color(200, 220, 255)
-                cell_text = f"{cell_data['gflops']:.2f} ({cell_data['threads']}T)" if cell_data['gflops'] > 0 else "N/A"
-                pdf.cell(col_width, 10, cell_text, border=1, align="C", fill=is_best)
-            pdf.ln()
-    return table_data
-
-def find_best_profile_by_wins(data, table_data):
+def render_optimization_table(pdf, results, best_schedule):
+    profile_keys = results['profiles']
+    table_data = results['peaks'].get(best_schedule)
+    if not profile_keys:
+        pdf.cell(0, 10, "No data available to generate table.", ln=True)
+        return
     if not table_data:
-        _, best_schedule_temp = analyze_schedules(data)
-        table_data = create_optimization_table(None, data, best_schedule_temp)
-    if not table_data: return list(data.keys())[0] if data else "O3_default"
-    win_counts, peak_gflops = defaultdict(int), defaultdict(float)
-    for size, profiles in table_data.items():
-        max_gflops_in_row = max(p['gflops'] for p in profiles.values()) if profiles else 0.0
-        if max_gflops_in_row > 0:
-            for profile, perf in profiles.items():
-                if perf['gflops'] == max_gflops_in_row: win_counts[profile] += 1
-                if perf['gflops'] > peak_gflops[profile]: peak_gflops[profile] = perf['gflops']
-    if not win_counts: return list(data.keys())[0] if data else "O3_default"
-    return sorted(win_counts.keys(), key=lambda p: (win_counts[p], peak_gflops[p]), reverse=True)[0]
-
-def generate_schedule_performance_chart(profile_data):
-    try:
-        if not profile_data: return
-        hw2b_data = profile_data.get('general_perf', {}).get('hw2_b', {})
-        if not hw2b_data: return
-        matrix_sizes = sorted(hw2b_data.keys(), key=lambda x: int(x[1:]))
-        if not matrix_sizes: return
-
-        ncols = 2
-        nrows = math.ceil(len(matrix_sizes) / ncols)
-        fig, axes = plt.subplots(nrows, ncols, figsize=(12, nrows * 4.5), squeeze=False)
-        axes = axes.flatten()
-        
-        for i, size in enumerate(matrix_sizes):
-            ax = axes[i]
-            size_data = hw2b_data[size]
-            for schedule_key, thread_data in sorted(size_data.items()):
-                schedule_name = schedule_key.replace("schedule_", "").title()
-                valid_threads = {int(t[1:]):float(g) for t, g in thread_data.items() if g and g.replace('.', '', 1).isdigit()}
-                if valid_threads:
-                    sorted_threads = sorted(valid_threads.keys())
-                    gflops = [valid_threads[t] for t in sorted_threads]
-                    ax.plot(sorted_threads, gflops, marker='o', linestyle='-', label=f'{schedule_name}')
-            
-            ax.set_title(f'N = {size[1:]}')
-            ax.set_xlabel('Threads')
-            ax.set_ylabel('Gflop/s')
-            ax.grid(True, which="both", ls="--")
-        
-        for j in range(len(matrix_sizes), len(axes)): axes[j].set_visible(False)
-        fig.suptitle('Scheduling Strategy Performance for hw2-b', fontsize=16)
-        handles, labels = axes[0].get_legend_handles_labels()
-        fig.legend(handles, labels, loc='upper right')
-        plt.tight_layout(rect=[0, 0, 1, 0.96])
-        plt.savefig(CHART_SCHEDULING)
-    except Exception as e:
-        print(f"\n--- !!! ERROR: Could not generate schedule performance chart. Plot will be missing. !!! ---")
-        print(f"--- Error Type: {type(e).__name__}, Details: {e}")
-        print(f"--- This often happens if 'results.json' has missing data or an unexpected format.")
-        traceback.print_exc()
-    finally:
-        plt.close()
-
-def generate_scaling_chart(profile_data, title, filename, is_weak=False):
-    try:
-        if not profile_data: return
-        
-        if is_weak:
-            weak_data = profile_data.get('weak_scaling', {})
-            if not weak_data: return
-            base_sizes = sorted(weak_data.keys(), key=lambda x: int(x[1:]))
-            if not base_sizes: return
-            
-            ncols = 2
-            nrows = math.ceil(len(base_sizes) / ncols)
-            fig, axes = plt.subplots(nrows, ncols, figsize=(12, nrows * 4.5), squeeze=False)
-            axes = axes.flatten()
-
-            for i, base_size_key in enumerate(base_sizes):
-                ax = axes[i]
-                experiment_data = weak_data[base_size_key]
-                plot_keys = {'hw2_a': 'Dense (hw2-a)', 'hw2_b_guided': 'Triangular (hw2-b)'}
-                
-                try: # Ideal weak scaling line
-                    t1_gflops = float(experiment_data['hw2_b_guided']['T1']['gflops'])
-                    threads_list = sorted([int(t[1:]) for t in experiment_data['hw2_b_guided'].keys()])
-                    ideal_gflops = [t1_gflops * t for t in threads_list]
-                    ax.plot(threads_list, ideal_gflops, 'k--', label='Ideal Scaling')
-                except (KeyError, ValueError, TypeError): pass
-
-                for key, label in plot_keys.items():
-                    if key in experiment_data:
-                        results = experiment_data[key]
-                        valid_points = {int(t[1:]):float(p['gflops']) for t,p in results.items() if p.get('gflops') and p['gflops'].replace('.','',1).isdigit()}
-                        if valid_points:
-                            sorted_threads = sorted(valid_points.keys())
-                            gflops = [valid_points[t] for t in sorted_threads]
-                            ax.plot(sorted_threads, gflops, marker='o', linestyle='-', label=label)
-                
-                ax.set_title(f'Base N = {base_size_key[1:]}')
-                ax.set_xlabel('Threads')
-                ax.set_ylabel('Gflop/s')
-                ax.grid(True, which="both", ls="--")
-
-            for j in range(len(base_sizes), len(axes)): axes[j].set_visible(False)
-            fig.suptitle(title, fontsize=16)
-            handles, labels = axes[0].get_legend_handles_labels()
-            fig.legend(handles, labels, loc='upper right')
-        else: # Strong scaling
-            strong_data = profile_data.get('general_perf', {})
-            hw2a_data = strong_data.get('hw2_a', {})
-            hw2b_data = strong_data.get('hw2_b', {})
-            if not hw2a_data: return
-            
-            matrix_sizes = sorted(hw2a_data.keys(), key=lambda x: int(x[1:]))
-            if not matrix_sizes: return
-
-            ncols = 2
-            nrows = math.ceil(len(matrix_sizes) / ncols)
-            fig, axes = plt.subplots(nrows, ncols, figsize=(12, nrows * 4.5), squeeze=False)
-            axes = axes.flatten()
-
-            for i, size in enumerate(matrix_sizes):
-                ax = axes[i]
-                try: # Ideal strong scaling line
-                    t1_gflops = float(hw2a_data[size]['T1'])
-                    threads_list = sorted([int(t[1:]) for t in hw2a_data[size].keys() if hw2a_data[size].get(t)])
-                    ideal_gflops = [t1_gflops * t for t in threads_list]
-                    ax.plot(threads_list, ideal_gflops, 'k--', label='Ideal Speedup')
-                except(KeyError, ValueError, TypeError): pass
-
-                if size in hw2a_data:
-                    valid_threads = {int(t[1:]):float(g) for t,g in hw2a_data[size].items() if g and g.replace('.','',1).isdigit()}
-                    if valid_threads: 
-                        sorted_threads = sorted(valid_threads.keys())
-                        gflops = [valid_threads[t] for t in sorted_threads]
-                        ax.plot(sorted_threads, gflops, marker='o', linestyle='-', label='Dense (hw2-a)')
-                
-                if size in hw2b_data and 'schedule_guided' in hw2b_data[size]:
-                    valid_threads = {int(t[1:]):float(g) for t,g in hw2b_data[size]['schedule_guided'].items() if g and g.replace('.','',1).isdigit()}
-                    if valid_threads: 
-                        sorted_threads = sorted(valid_threads.keys())
-                        gflops = [valid_threads[t] for t in sorted_threads]
-                        ax.plot(sorted_threads, gflops, marker='s', linestyle='--', label='Triangular (hw2-b)')
-
-                ax.set_title(f'N = {size[1:]}')
-                ax.set_xlabel('Threads')
-                ax.set_ylabel('Gflop/s')
-                ax.grid(True, which="both", ls="--")
-
-            for j in range(len(matrix_sizes), len(axes)): axes[j].set_visible(False)
-            fig.suptitle(title, fontsize=16)
-            handles, labels = axes[0].get_legend_handles_labels()
-            fig.legend(handles, labels, loc='upper right')
-    
-        plt.tight_layout(rect=[0, 0, 1, 0.96])
-        plt.savefig(filename)
-    except Exception as e:
-        print(f"\n--- !!! ERROR: Could not generate scaling chart '{filename}'. Plot will be missing. !!! ---")
-        print(f"--- Error Type: {type(e).__name__}, Details: {e}")
-        print(f"--- This often happens if 'results.json' has missing data or an unexpected format.")
-        traceback.print_exc()
-    finally:
-        plt.close()
+        pdf.cell(0, 10, "No valid hw2-b performance data found to build table.", ln=True)
+        return
+    pdf.set_font("Helvetica", "B", 10)
+    col_width = 180 / (len(profile_keys) + 1)
+    header = ["Matrix Size"] + [k.replace("_", " ").title() for k in profile_keys]
+    for item in header: pdf.cell(col_width, 10, item, border=1, align="C")
+    pdf.ln()
+    pdf.set_font("Helvetica", size=9)
+    for size, by_profile in table_data.items():
+        row_data = [by_profile[p] for p in profile_keys]
+        best = max(d['gflops'] for d in row_data)
+        best_ci_low = max(d['ci_low'] for d in row_data if d['gflops'] == best)
+        pdf.cell(col_width, 10, f"{size}x{size}", border=1, align="C")
+        for cell_data in row_data:
+            # Highlight every profile statistically tied with the row's best.
+            is_best = cell_data['gflops'] > 0 and not best_ci_low > cell_data['ci_high']
+            if is_best: pdf.set_fill_color(200, 220, 255)
+            cell_text = f"{cell_data['gflops']:.2f} ({cell_data['threads']}T)" if cell_data['gflops'] > 0 else "N/A"
+            pdf.cell(col_width, 10, cell_text, border=1, align="C", fill=is_best)
+        pdf.ln()
 
 def create_submission_archive():
     archive_name = "hw2.tar"
-    files_to_archive = ["hw2-a.cpp", "hw2-b.cpp", "hw2.pdf", "LOG.txt", "makefile"]
+    sources = [f"{kernels.KERNELS[k]['binary']}.cpp" for k in kernels.KERNELS]
+    files_to_archive = sources + ["sweep.h", "matrix.h", "stream.cpp", "hw2.pdf", "LOG.txt", "makefile"]
     existing_files = [f for f in files_to_archive if os.path.exists(f)]
     if not existing_files:
         print("Warning: No files found to archive.")
@@ -443,14 +322,334 @@ def create_submission_archive():
     except Exception as e:
         print(f"Error: Could not create tar archive. {e}")
 
-if __name__ == "__main__":
-    if not os.path.exists(RESULTS_FILE):
-        print(f"Error: {RESULTS_FILE} not found. Please run './run_benchmarks.sh' first.")
+def format_bytes(nbytes):
+    return f"{nbytes / 2 ** 30:.2f} GiB" if nbytes >= 2 ** 30 else f"{nbytes / 2 ** 20:.1f} MiB"
+
+def describe_kernels(results, data, profile):
+    """Compares every kernel's peak Gflop/s and matrix footprint per size."""
+    by_kernel = results['kernel_peaks'].get(profile, {})
+    if not by_kernel:
+        return "No kernel results were found for this profile."
+    present = kernels.ordered(by_kernel)
+    text = ("hw2-b stores the triangular matrix in a full n x n array, so half of its memory holds zeros and each short early row still occupies its own stretch of cache lines. "
+            "hw2-b-packed stores row i contiguously at offset i(i+1)/2, halving the footprint; hw2-b-blocked uses the same layout and computes four rows per pass, "
+            "so every element of B it loads is used four times and the inner loop vectorizes. Peak Gflop/s per size (best thread count) and the memory allocated for A, B and C:")
+    for size in sorted({n for by_size in by_kernel.values() for n in by_size}):
+        cells = []
+        for kernel in present:
+            peak = by_kernel[kernel].get(size)
+            if peak:
+                cells.append(f"{kernels.info(kernel)['binary']} {peak['gflops']:.2f} ({peak['threads']}T, "
+                             f"{format_bytes(kernels.storage_bytes(kernel, size))})")
+        text += f"\n  - N={size}: " + "; ".join(cells) + "."
+    weak = data.rows[data.rows['scaling'] == 'weak']
+    if len(weak):
+        n_max = int(weak['n_actual'].max())
+        text += (f"\nAt the largest weak-scaling size, N={n_max}, the dense-storage triangular matrix needs "
+                 f"{format_bytes(kernels.storage_bytes('hw2_b', n_max))} against {format_bytes(kernels.storage_bytes('hw2_b_packed', n_max))} packed.")
+    return text + describe_memory_plan(data)
+
+def describe_memory_plan(data):
+    """Lists the points the memory planner moved to a file-backed matrix or could not run."""
+    text = ""
+    if data.file_backed:
+        text += (f"\n{len(data.file_backed)} point(s) did not fit the memory budget with the matrix in RAM and were measured with A mapped "
+                 "from a file (HW2_MATRIX_DIR), so their results include page-cache and disk effects.")
+    for status, paths in sorted(data.unmeasured.items()):
+        if status == 'predicted': continue  # Covered with the scaling models.
+        shown = ", ".join(paths[:MAX_LISTED_POINTS]) + (", ..." if len(paths) > MAX_LISTED_POINTS else "")
+        text += f"\n{len(paths)} point(s) have no measurement ({status}): {shown}."
+    return text
+
+def describe_batched(results, data, profile):
+    """Explains how Gflop/s and effective bandwidth change with the number of right-hand sides k."""
+    by_kernel = results['batched'].get(profile, {})
+    if not by_kernel:
+        return ("No batched sweep was found in the results. Rerun benchmark.py with --rhs to multiply the matrix "
+                "by several vectors per pass.")
+    text = ("A single matrix-vector product reads every matrix element once and uses it for one multiply-add, so it performs about 0.5 flop per byte. "
+            "hw2-a and hw2-b also accept a number k of right-hand-side vectors and multiply A by all of them in one pass, "
+            "which raises the intensity to roughly 0.5k flop per byte while the matrix traffic stays the same. "
+            "Gflop/s grows with k as long as the kernel is bandwidth-bound; once the effective bandwidth (bytes the kernel must move per second) "
+            "drops well below what the memory system sustains, arithmetic rather than memory traffic is the limit. "
+            "Peak per case, each k at its best thread count:")
+    for kernel in kernels.ordered(by_kernel):
+        label = kernels.short_label(kernel)
+        for size, cell in by_kernel[kernel].items():
+            best = cell['rhs'][cell['best_rhs']]
+            text += (f"\n  - {label}, N={size}: peak {best['gflops']:.2f} Gflop/s at k={cell['best_rhs']} "
+                     f"({best['threads']}T, {best['gbps']:.1f} GB/s)")
+            if cell['gain']:
+                text += f", {cell['gain']:.2f}x the single-vector rate"
+            if cell['compute_bound_rhs']:
+                text += f"; below {100 * analysis.COMPUTE_BOUND_FRACTION:.0f}% of triad bandwidth from k={cell['compute_bound_rhs']}"
+            text += "."
+    if not data.bandwidth:
+        text += "\nNo bandwidth measurement was recorded, so the point where the kernels stop being bandwidth-bound is not marked."
+    return text
+
+def describe_scaling_models(results, data, profile):
+    """Reports the fitted Amdahl/Gustafson and bandwidth-saturation models with their predictions."""
+    by_scaling = results['scaling_models'].get(profile, {})
+    if not by_scaling:
+        return "No curve had enough thread counts to fit a scaling model."
+    text = ("Every curve was fitted by least squares with two-parameter models: Amdahl's law, P(t) = P1 t / (1 + s(t - 1)), for strong scaling; "
+            "Gustafson's law, P(t) = P1 (s + (1 - s) t), for weak scaling; and for both a bandwidth-saturation model, P(t) = min(r t, Pmax), "
+            "in which every thread adds r Gflop/s until the kernel reaches the Gflop/s the memory system can feed. "
+            "s is the serial fraction and the knee is the thread count at which Pmax is reached. "
+            "The model with the lower relative RMSE is listed for each curve, with its prediction at the next unmeasured thread count; "
+            "beyond the measured range a prediction assumes the fitted trend continues, so an unsaturated fit is an upper bound:")
+    for scaling in ('strong', 'weak'):
+        for kernel in kernels.ordered(by_scaling.get(scaling, {})):
+            label = kernels.short_label(kernel)
+            for size, curve in by_scaling[scaling][kernel].items():
+                text += f"\n  - {scaling}, {label}, {'base ' if scaling == 'weak' else ''}N={size}: {models.describe_fit(curve['fits'][curve['best']])}"
+                if curve['predicted']:
+                    t = min(curve['predicted'])
+                    text += f"; predicts {curve['predicted'][t]:.2f} Gflop/s at {t}T"
+                text += "."
+    predicted = data.unmeasured.get('predicted', [])
+    if predicted:
+        text += (f"\n{len(predicted)} grid point(s) were not run because the fit of their curve already predicted them "
+                 "within the pruning tolerance (benchmark.py --prune); results.json records the predicted Gflop/s instead.")
+    return text
+
+def describe_bandwidth(data, profile):
+    """Compares achieved kernel bandwidth against the STREAM triad measurement."""
+    if not data.bandwidth:
+        return ("No memory bandwidth measurement was found in the results, so the kernels cannot be placed against the hardware limit. "
+                "Rerun benchmark.py without --no-bandwidth to include the STREAM measurement.")
+    peak_threads = max(data.bandwidth, key=lambda t: data.bandwidth[t]['triad'])
+    peak_bw = data.bandwidth[peak_threads]['triad']
+    text = (f"To check the claim above, a STREAM-style benchmark measured the host's sustainable memory bandwidth at each thread count. "
+            f"The triad kernel peaked at {peak_bw:.1f} GB/s with {peak_threads} threads. "
+            "Each result was converted to achieved GB/s from the bytes the kernel actually moves (the n^2 matrix elements for the dense case, "
+            "about n^2/2 for the triangular cases, plus the input and output vectors). All kernels perform roughly 0.5 flop per byte, "
+            "so their attainable performance is bounded by about half the measured bandwidth in Gflop/s.")
+    rows = data.headline('strong', profile)
+    for kernel in data.kernels():
+        sel = rows[rows['kernel'] == kernel]
+        if not len(sel): continue
+        label = kernels.short_label(kernel)
+        best = sel[sel['gbps'].argmax()]
+        threads = int(best['threads'])
+        at_t = data.bandwidth.get(threads, {}).get('triad')
+        text += (f" The {label} kernel reached at most {best['gbps']:.1f} GB/s (N={best['N']}, {threads} threads), "
+                 f"{100 * best['gbps'] / peak_bw:.0f}% of peak triad bandwidth")
+        text += f" and {100 * best['gbps'] / at_t:.0f}% of the triad bandwidth measured at the same thread count." if at_t else "."
+    return text
+
+def describe_numpy_baseline(data, profile):
+    """Compares each kernel's peak strong-scaling result with the NumPy/BLAS reference."""
+    text = ("Every run's output vector was validated against a NumPy reference (A @ B for the dense kernel, np.tril(A) @ B for the triangular ones) "
+            "through two checksums; runs outside the float32 rounding bound were rejected and are not plotted. ")
+    if not data.numpy_baseline:
+        return text + "No NumPy/BLAS timings were recorded, so the charts have no library baseline."
+    text += "The dotted lines in the strong scaling chart show the Gflop/s of the same operation in NumPy/BLAS on this host."
+    rows = data.headline('strong', profile)
+    for kernel in data.kernels():
+        label = kernels.short_label(kernel)
+        for size, baseline in sorted(data.numpy_baseline.get(kernels.info(kernel)['shape'], {}).items()):
+            sel = rows[(rows['kernel'] == kernel) & (rows['N'] == size)]
+            if not len(sel) or baseline <= 0: continue
+            best = sel[sel['gflops'].argmax()]
+            verdict = "beats" if best['ci_low'] > baseline else "trails" if best['ci_high'] < baseline else "matches"
+            text += (f"\n  - {label}, N={size}: peak {best['gflops']:.2f} Gflop/s ({best['threads']}T) {verdict} "
+                     f"NumPy at {baseline:.2f} Gflop/s ({best['gflops'] / baseline:.2f}x).")
+    return text
+
+def describe_counters(data, profile):
+    """Summarizes the per-run rusage and perf counters recorded by benchmark.py."""
+    rows = data.rows[(data.rows['scaling'] == 'strong') & (data.rows['profile'] == profile)]
+    rss = rows['max_rss_kb'][~np.isnan(rows['max_rss_kb'])] if len(rows) else rows['max_rss_kb']
+    if not len(rss):
+        return "These results predate per-run instrumentation, so no resource usage or hardware counters are available."
+    text = f"Every run was reaped with wait4() to record its resource usage; peak resident memory ranged from {rss.min() / 1024:.1f} to {rss.max() / 1024:.1f} MiB. "
+    counted = rows[~np.isnan(rows['ipc'])]
+    if not len(counted):
+        return text + ("No hardware counters were recorded because 'perf stat' was not usable on the benchmark host "
+                       "(missing, or blocked by kernel.perf_event_paranoid), so IPC and cache-miss rates are not shown.")
+    low_ipc = counted[counted['ipc'].argmin()]
+    text += (f"Hardware counters were read with 'perf stat'. IPC ranged from {counted['ipc'].min():.2f} to {counted['ipc'].max():.2f}, "
+             f"lowest for {low_ipc['kernel'].replace('_', '-')} at N={low_ipc['N']} with {low_ipc['threads']} threads. "
+             "A falling IPC as threads are added, together with a rising cache-miss rate, shows cores stalling on memory rather than computing, "
+             "which is the expected signature of a bandwidth-bound kernel.")
+    return text
+
+def describe_placements(results, data, profile):
+    """Recommends an OMP_PROC_BIND/OMP_PLACES binding per kernel and matrix size."""
+    text = f"The benchmark host has {topology.describe(data.topology)} " if data.topology else ""
+    by_kernel = results['placements'].get(profile, {})
+    if not by_kernel:
+        return text + ("No thread placement sweep was found in the results. Rerun benchmark.py with --placements "
+                       "to compare OMP_PROC_BIND/OMP_PLACES combinations.")
+    swept = sorted({p for by_size in by_kernel.values() for cell in by_size.values() for p in cell['peaks']})
+    text += (f"Every kernel was rerun under {len(swept)} OMP_PROC_BIND/OMP_PLACES combinations ({', '.join(swept)}), "
+             "one pinned run at a time. 'close' packs threads onto neighbouring places and shares caches, "
+             "'spread' distributes them across the machine to reach more memory controllers, and 'master' keeps them on the initial thread's place. "
+             "For a memory-bound kernel, 'spread' should win on multi-socket nodes; on a single socket the policies mostly differ in SMT sharing. "
+             "Recommended binding for each case (best thread count in parentheses):")
+    for kernel in kernels.ordered(by_kernel):
+        label = kernels.short_label(kernel)
+        for size, cell in by_kernel[kernel].items():
+            bind, places = cell['best'].split('_', 1)
+            worst = min(cell['peaks'].values(), key=lambda p: p['gflops'])
+            text += (f"\n  - {label}, N={size}: OMP_PROC_BIND={bind} OMP_PLACES={places} ({cell['threads']}T) at "
+                     f"{cell['gflops']:.2f} Gflop/s, {cell['gflops'] / worst['gflops']:.2f}x the worst placement")
+            text += "." if cell['significant'] else " (within noise of another placement)."
+    return text
+
+def load_history(path, profile):
+    """Returns (trend, latest-vs-previous comparison) from the history database, or (None, None).
+
+    Like the trend, the comparison stays on one host: the latest run is compared
+    with the previous run recorded on the same machine.
+    """
+    if not os.path.exists(path):
+        return None, None
+    conn = history.connect(path)
+    try:
+        trend = history.trend(conn, profile)
+        latest = history.resolve_run(conn, "latest")
+        previous = history.previous_on_host(conn, latest) if latest else None
+        comparison = history.compare(conn, previous, latest) if previous else None
+        return trend, comparison
+    finally:
+        conn.close()
+
+def describe_history(trend, comparison):
+    """Summarizes the peak-performance trend and the latest run's regressions."""
+    runs = {run[0] for by_size in (trend or {}).values() for series in by_size.values() for run in series}
+    if len(runs) < 2:
+        return ("Fewer than two sweeps of this profile have been recorded in the history database on this host, so there is no trend yet. "
+                "Every benchmark.py run is recorded automatically; 'python history.py compare' checks a run against a baseline.")
+    text = (f"{len(runs)} sweeps of this profile are recorded on this host. The chart tracks the peak Gflop/s (best thread count) of each kernel "
+            "and matrix size from the oldest to the newest sweep, so a drop after a compiler upgrade or code change stands out. ")
+    if comparison:
+        text += (f"Compared with the previous sweep on this host, the latest one has {len(comparison['regressions'])} statistically significant regressions "
+                 f"and {len(comparison['improvements'])} improvements across {comparison['compared']} points (95% CIs not overlapping and a median change of at least "
+                 f"{100 * history.REGRESSION_THRESHOLD:.0f}%).")
+        for entry in comparison['regressions'][:5]:
+            text += f"\n  - {history.describe_point(entry)}: {entry['baseline']:.2f} -> {entry['candidate']:.2f} Gflop/s ({100 * entry['change']:+.1f}%)"
+    return text
+
+def build_summary(data):
+    """Collects the report's key numbers into a JSON-serializable dict."""
+    results = analysis.analyze(data)
+    best_schedule = results['best_schedule']
+    best = analysis.best_profile(results, best_schedule)
+    table = results['peaks'].get(best_schedule, {})
+    peaks = {}
+    for size, by_profile in table.items():
+        profile, peak = max(by_profile.items(), key=lambda item: item[1]['gflops'])
+        peaks[str(size)] = dict(peak, profile=profile)
+    return {
+        'best_schedule': best_schedule,
+        'best_profile': best,
+        'schedule_scores': results['schedule_scores'],
+        'schedule_wins': results['schedule_wins'],
+        'profile_wins': results['profile_wins'].get(best_schedule, {}),
+        'optimization_table': {str(size): {p: by_profile[p] for p in results['profiles']} for size, by_profile in table.items()},
+        'peaks': peaks,
+        'placements': {kernel: {str(size): {k: cell[k] for k in ('best', 'threads', 'gflops', 'significant')}
+                                for size, cell in by_size.items()}
+                       for kernel, by_size in results['placements'].get(best, {}).items()},
+        'kernel_peaks': {kernel: {str(size): peak for size, peak in by_size.items()}
+                         for kernel, by_size in results['kernel_peaks'].get(best, {}).items()},
+        'batched': {kernel: {str(size): dict(cell['rhs'][cell['best_rhs']], best_rhs=cell['best_rhs'], gain=cell['gain'],
+                                             compute_bound_rhs=cell['compute_bound_rhs'])
+                             for size, cell in by_size.items()}
+                    for kernel, by_size in results['batched'].get(best, {}).items()},
+        'tuned': {str(row['N']): {'gflops': float(row['gflops']), 'threads': int(row['threads']), 'schedule': str(row['schedule'])}
+                  for row in data.select(scaling='tuned', profile=best)},
+        'unmeasured': data.unmeasured,
+        'file_backed': len(data.file_backed),
+        'scaling_models': {kernel: {str(size): {'best': curve['best'], 'fit': curve['fits'][curve['best']],
+                                                'predicted': {str(t): g for t, g in curve['predicted'].items()}}
+                                    for size, curve in by_size.items()}
+                           for kernel, by_size in results['scaling_models'].get(best, {}).get('strong', {}).items()},
+    }
+
+def format_summary(summary):
+    """Renders build_summary() output as a plain-text report for terminals."""
+    lines = [f"Best schedule (hw2-b): {summary['best_schedule']}",
+             f"Best profile:          {summary['best_profile']}", ""]
+    profiles = list(next(iter(summary['optimization_table'].values()), {}))
+    if profiles:
+        lines.append(f"Peak hw2-b Gflop/s with '{summary['best_schedule']}' schedule (threads):")
+        lines.append("  " + f"{'N':>8}" + "".join(f"{p:>18}" for p in profiles))
+        for size, by_profile in summary['optimization_table'].items():
+            cells = [f"{c['gflops']:.2f} ({c['threads']}T)" if c['gflops'] > 0 else "N/A" for c in by_profile.values()]
+            lines.append("  " + f"{size:>8}" + "".join(f"{c:>18}" for c in cells))
+        lines.append("")
+        lines.append("Per-size peak:")
+        for size, peak in summary['peaks'].items():
+            lines.append(f"  N={size}: {peak['gflops']:.2f} Gflop/s [{peak['ci_low']:.2f}, {peak['ci_high']:.2f}] "
+                         f"with {peak['profile']} at {peak['threads']} threads")
     else:
-        with open(RESULTS_FILE, "r") as f:
-            try:
-                benchmark_results = json.load(f)
-                generate_report(benchmark_results)
-            except json.JSONDecodeError:
-                print(f"Error: Could not decode JSON from {RESULTS_FILE}. It may be corrupted.")
+        lines.append("No valid hw2-b performance data found.")
+    if summary.get('kernel_peaks'):
+        lines.append("")
+        lines.append(f"Peak Gflop/s per kernel with {summary['best_profile']} (threads):")
+        for kernel in kernels.ordered(summary['kernel_peaks']):
+            cells = ", ".join(f"N={size}: {peak['gflops']:.2f} ({peak['threads']}T)" for size, peak in summary['kernel_peaks'][kernel].items())
+            lines.append(f"  {kernel:<14} {cells}")
+    if summary.get('batched'):
+        lines.append("")
+        lines.append("Batched right-hand sides (best k):")
+        for kernel in kernels.ordered(summary['batched']):
+            for size, cell in summary['batched'][kernel].items():
+                gain = f", {cell['gain']:.2f}x k=1" if cell['gain'] else ""
+                lines.append(f"  {kernel} N={size}: k={cell['best_rhs']} at {cell['threads']} threads, "
+                             f"{cell['gflops']:.2f} Gflop/s, {cell['gbps']:.1f} GB/s{gain}")
+    if summary.get('placements'):
+        lines.append("")
+        lines.append("Recommended thread placement (OMP_PROC_BIND_OMP_PLACES):")
+        for kernel in kernels.ordered(summary['placements']):
+            for size, cell in summary['placements'][kernel].items():
+                note = "" if cell['significant'] else "  (not significant)"
+                lines.append(f"  {kernel} N={size}: {cell['best']} at {cell['threads']} threads, {cell['gflops']:.2f} Gflop/s{note}")
+    if summary.get('tuned'):
+        lines.append("")
+        lines.append("hw2-b at its tuned configuration (tuner.py):")
+        for size, cell in summary['tuned'].items():
+            lines.append(f"  N={size}: {cell['gflops']:.2f} Gflop/s with '{cell['schedule']}' at {cell['threads']} threads")
+    if summary.get('scaling_models'):
+        lines.append("")
+        lines.append("Strong-scaling model fits (best model):")
+        for kernel in kernels.ordered(summary['scaling_models']):
+            for size, cell in summary['scaling_models'][kernel].items():
+                predicted = ", ".join(f"{t}T {g:.2f}" for t, g in cell['predicted'].items())
+                lines.append(f"  {kernel} N={size}: {models.describe_fit(cell['fit'])}" + (f"; predicted {predicted}" if predicted else ""))
+    if summary.get('unmeasured') or summary.get('file_backed'):
+        lines.append("")
+        lines.append(f"Memory plan: {summary.get('file_backed', 0)} file-backed points; unmeasured "
+                     + (", ".join(f"{len(paths)} {status}" for status, paths in sorted(summary.get('unmeasured', {}).items())) or "none"))
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Builds the HW2 report from results.json.")
+    parser.add_argument("mode", nargs="?", choices=["pdf", "summary"], default="pdf",
+                        help="'pdf' renders charts and hw2.pdf; 'summary' prints the key numbers only.")
+    parser.add_argument("--json", action="store_true", help="In summary mode, print JSON instead of text.")
+    parser.add_argument("--results", default=RESULTS_FILE)
+    parser.add_argument("--history", default=history.HISTORY_DB, help="History database for the trend section.")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.results):
+        print(f"Error: {args.results} not found. Please run './run_benchmarks.sh' first.")
+        return 1
+    try:
+        benchmark_results = results_store.load_results(args.results)
+    except json.JSONDecodeError:
+        print(f"Error: Could not decode JSON from {args.results}. It may be corrupted.")
+        return 1
+    if args.mode == "summary":
+        summary = build_summary(benchmark_results)
+        print(json.dumps(summary, indent=2) if args.json else format_summary(summary))
+    else:
+        generate_report(benchmark_results, args.history)
+    return 0
 
+if __name__ == "__main__":
+    sys.exit(main())
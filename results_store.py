@@ -0,0 +1,276 @@
+"""
+Typed, indexed in-memory view of results.json.
+
+The nested results.json layout is convenient to write but awkward to query: every
+consumer had to walk the dicts and re-parse "N1024" / "T16" keys and Gflop/s
+strings. load_results() flattens it once into a NumPy structured array with one
+row per successful benchmark point, and ResultsTable keeps precomputed group
+indexes for the groupings report.py asks for. Points without a measurement
+(infeasible, failed or not run) are listed separately in ResultsTable.unmeasured.
+"""
+
+import hashlib
+import json
+
+import numpy as np
+
+import kernels
+import roofline
+
+RESULT_DTYPE = np.dtype([
+    ('profile', 'U32'),
+    ('kernel', 'U16'),      # kernels.KERNELS name, e.g. 'hw2_a' or 'hw2_b_packed'
+    ('scaling', 'U9'),      # 'strong' (general_perf), 'weak' (weak_scaling), 'placement', 'batched' or 'tuned'
+    ('schedule', 'U8'),     # OpenMP schedule of scheduled kernels, '' for hw2-a
+    ('placement', 'U16'),   # '<OMP_PROC_BIND>_<OMP_PLACES>' for placement rows, '' otherwise
+    ('N', 'i8'),            # matrix size for strong scaling, base size for weak scaling
+    ('threads', 'i4'),
+    ('rhs', 'i4'),          # right-hand-side vectors per call, 1 outside the batched sweep
+    ('gflops', 'f8'),       # median Gflop/s
+    ('ci_low', 'f8'),
+    ('ci_high', 'f8'),
+    ('samples', 'i4'),
+    ('n_actual', 'i8'),     # size actually run (differs from N for weak scaling)
+    ('ipc', 'f8'),          # median instructions per cycle, NaN without perf counters
+    ('cache_miss_rate', 'f8'),  # cache-misses / cache-references, NaN without perf counters
+    ('max_rss_kb', 'f8'),   # median peak resident set size, NaN for older results
+    ('gbps', 'f8'),         # achieved memory bandwidth implied by gflops
+    ('intensity', 'f8'),    # arithmetic intensity, flops per byte moved
+])
+
+# Top-level results.json keys that hold host data rather than a compiler profile.
+HOST_KEY = 'host'
+
+# Groupings the report queries repeatedly; built once when the table is loaded.
+COMMON_GROUPINGS = [
+    ('scaling', 'kernel', 'profile', 'N', 'schedule'),
+    ('scaling', 'kernel', 'profile', 'N'),
+    ('scaling', 'kernel', 'schedule'),
+    ('scaling', 'kernel', 'profile', 'N', 'placement'),
+    ('scaling', 'kernel', 'profile', 'N', 'rhs'),
+]
+
+
+def _parse_leaf(value):
+    """Returns (gflops, ci_low, ci_high, samples, n, metrics) for one leaf, or None if the run failed.
+
+    Accepts the single-sample Gflop/s strings written by older sweeps as well as the
+    sampled records written by benchmark.py.
+    """
+    record = value if isinstance(value, dict) else {'gflops': value}
+    try:
+        gflops = float(record.get('median', record.get('gflops')))
+    except (ValueError, TypeError):
+        return None
+    if gflops <= 0:
+        return None  # The one place zero medians are dropped; history and the report rely on it.
+    ci_low = float(record.get('ci_low', gflops))
+    ci_high = float(record.get('ci_high', gflops))
+    n = int(record['n']) if record.get('n') else 0
+    counters = record.get('counters', {})
+    metrics = (float(counters.get('ipc', np.nan)), float(counters.get('cache_miss_rate', np.nan)),
+               float(record.get('resources', {}).get('max_rss_kb', np.nan)))
+    return gflops, ci_low, ci_high, int(record.get('samples', 1)), n, metrics
+
+
+def _flatten(data):
+    rows = []
+    for profile, profile_data in data.items():
+        if profile == HOST_KEY: continue
+        general = profile_data.get('general_perf', {})
+        for kernel, size_map in general.items():
+            for size_key, size_data in size_map.items():
+                n = int(size_key[1:])
+                # Scheduled kernels nest one level deeper: N -> schedule_<s> -> T.
+                if any(key.startswith('schedule_') for key in size_data):
+                    by_schedule = {key.replace('schedule_', ''): thread_data for key, thread_data in size_data.items()}
+                else:
+                    by_schedule = {'': size_data}
+                for schedule, thread_data in by_schedule.items():
+                    for thread_key, value in thread_data.items():
+                        parsed = _parse_leaf(value)
+                        if parsed:
+                            gflops, lo, hi, samples, _, metrics = parsed
+                            rows.append((profile, kernel, 'strong', schedule, '', n, int(thread_key[1:]), 1, gflops, lo, hi, samples, n) + metrics)
+        for base_key, experiment_data in profile_data.get('weak_scaling', {}).items():
+            base_n = int(base_key[1:])
+            for kernel_key, thread_data in experiment_data.items():
+                kernel, schedule = kernels.parse_result_key(kernel_key)
+                for thread_key, value in thread_data.items():
+                    parsed = _parse_leaf(value)
+                    if parsed:
+                        gflops, lo, hi, samples, n, metrics = parsed
+                        rows.append((profile, kernel, 'weak', schedule, '', base_n, int(thread_key[1:]), 1, gflops, lo, hi, samples, n or base_n) + metrics)
+        for kernel_key, size_data in profile_data.get('placement', {}).items():
+            kernel, schedule = kernels.parse_result_key(kernel_key)
+            for size_key, placement_data in size_data.items():
+                n = int(size_key[1:])
+                for placement, thread_data in placement_data.items():
+                    for thread_key, value in thread_data.items():
+                        parsed = _parse_leaf(value)
+                        if parsed:
+                            gflops, lo, hi, samples, _, metrics = parsed
+                            rows.append((profile, kernel, 'placement', schedule, placement, n, int(thread_key[1:]), 1,
+                                         gflops, lo, hi, samples, n) + metrics)
+        for kernel_key, size_data in profile_data.get('batched', {}).items():
+            kernel, schedule = kernels.parse_result_key(kernel_key)
+            for size_key, rhs_data in size_data.items():
+                n = int(size_key[1:])
+                for rhs_key, thread_data in rhs_data.items():
+                    for thread_key, value in thread_data.items():
+                        parsed = _parse_leaf(value)
+                        if parsed:
+                            gflops, lo, hi, samples, _, metrics = parsed
+                            rows.append((profile, kernel, 'batched', schedule, '', n, int(thread_key[1:]), int(rhs_key[1:]),
+                                         gflops, lo, hi, samples, n) + metrics)
+        for kernel, size_data in profile_data.get('tuned', {}).items():
+            for size_key, thread_data in size_data.items():
+                n = int(size_key[1:])
+                for thread_key, value in thread_data.items():
+                    parsed = _parse_leaf(value)
+                    if parsed:
+                        gflops, lo, hi, samples, _, metrics = parsed
+                        rows.append((profile, kernel, 'tuned', value.get('schedule', ''), '', n, int(thread_key[1:]), 1,
+                                     gflops, lo, hi, samples, n) + metrics)
+    table = np.array([row + (0.0, 0.0) for row in rows], dtype=RESULT_DTYPE)
+    for kernel in set(table['kernel'].tolist()):
+        sel = table['kernel'] == kernel
+        n, rhs = table['n_actual'][sel], table['rhs'][sel]
+        table['gbps'][sel] = roofline.achieved_bandwidth(kernel, n, table['gflops'][sel], rhs)
+        table['intensity'][sel] = roofline.arithmetic_intensity(kernel, n, rhs)
+    return table
+
+
+def _bandwidth(data):
+    """Returns {threads: {'copy': GB/s, 'triad': GB/s}} from the host section, if measured."""
+    measured = data.get(HOST_KEY, {}).get('bandwidth', {})
+    return {int(t[1:]): v for t, v in measured.items() if v}
+
+
+def _numpy_baseline(data):
+    """Returns {shape: {N: median Gflop/s}} of the NumPy/BLAS reference kernels, if timed."""
+    measured = data.get(HOST_KEY, {}).get('numpy_baseline', {})
+    return {shape: {int(size[1:]): record['median'] for size, record in by_size.items() if record.get('samples')}
+            for shape, by_size in measured.items()}
+
+
+def _topology(data):
+    return data.get(HOST_KEY, {}).get('topology', {})
+
+
+def _leaves(node, path=()):
+    """Yields (path, record) for every sampled-record leaf below a results.json node."""
+    for key, value in node.items():
+        if isinstance(value, dict) and 'samples' in value:
+            yield path + (key,), value
+        elif isinstance(value, dict):
+            yield from _leaves(value, path + (key,))
+
+
+def _point_status(data):
+    """Returns ({status: [path, ...]} of leaves marked unmeasured, [path, ...] of file-backed runs)."""
+    unmeasured, file_backed = {}, []
+    for profile, profile_data in data.items():
+        if profile == HOST_KEY: continue
+        for path, record in _leaves(profile_data, (profile,)):
+            if record.get('status'):
+                unmeasured.setdefault(record['status'], []).append('/'.join(path))
+            elif record.get('matrix') == 'file':
+                file_backed.append('/'.join(path))
+    return unmeasured, file_backed
+
+
+def group_ids(rows, columns):
+    """Returns (keys, inverse): the distinct key tuples and each row's position in keys."""
+    if len(rows) == 0:
+        return [], np.zeros(0, dtype=np.intp)
+    uniq, inverse = np.unique(rows[list(columns)], return_inverse=True)
+    return [tuple(u.item()) for u in uniq], inverse.ravel()
+
+
+def best_per_group(rows, inverse, n_groups):
+    """Finds each group's highest-median row and whether that lead is significant.
+
+    Returns (best, significant): best[g] is the row index with the highest median
+    in group g, and significant[g] is True when that row's CI lies strictly above
+    the CI of every other row in the group (a clear, non-tied winner).
+    """
+    order = np.lexsort((-rows['gflops'], inverse))
+    starts = np.searchsorted(inverse[order], np.arange(n_groups))
+    best = order[starts]
+    # A row is tied with its group's best unless the best's CI is strictly above it.
+    tied = ~(rows['ci_low'][best][inverse] > rows['ci_high'])
+    significant = np.bincount(inverse, weights=tied, minlength=n_groups) == 1
+    return best, significant
+
+
+class ResultsTable:
+    """A structured array of benchmark rows plus cached group indexes."""
+
+    def __init__(self, rows, profiles, bandwidth=None, topology=None, numpy_baseline=None, unmeasured=None, file_backed=None):
+        self.rows = rows
+        self.profiles = profiles  # Preserves the results.json ordering for tables and headers.
+        self.bandwidth = bandwidth or {}
+        self.topology = topology or {}
+        self.numpy_baseline = numpy_baseline or {}
+        self.unmeasured = unmeasured or {}  # {'infeasible' | 'failed' | 'not run': [results.json paths]}
+        self.file_backed = file_backed or []  # Paths of points measured with a file-backed matrix.
+        self._indexes = {}
+        for columns in COMMON_GROUPINGS:
+            self.index(*columns)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def digest(self):
+        """Content hash of the table, used to memoize analyses of identical data."""
+        h = hashlib.sha256(self.rows.tobytes())
+        h.update("\0".join(self.profiles).encode())
+        h.update(json.dumps(self.bandwidth, sort_keys=True).encode())
+        return h.hexdigest()
+
+    def index(self, *columns):
+        """Returns {key tuple: row indexes} for a grouping, building it on first use."""
+        if columns not in self._indexes:
+            keys, inverse = group_ids(self.rows, columns)
+            order = np.argsort(inverse, kind='stable')
+            bounds = np.cumsum(np.bincount(inverse, minlength=len(keys)))[:-1]
+            self._indexes[columns] = dict(zip(keys, np.split(order, bounds))) if keys else {}
+        return self._indexes[columns]
+
+    def select(self, **filters):
+        """Rows matching every column=value filter, using a precomputed index when one fits."""
+        for columns in COMMON_GROUPINGS:
+            if set(columns) == set(filters):
+                idx = self.index(*columns).get(tuple(filters[c] for c in columns))
+                return self.rows[idx] if idx is not None else self.rows[:0]
+        mask = np.ones(len(self.rows), dtype=bool)
+        for column, value in filters.items():
+            mask &= self.rows[column] == value
+        return self.rows[mask]
+
+    def headline(self, scaling, profile):
+        """Rows of every kernel at its headline configuration: unscheduled kernels, and
+        scheduled kernels with the default schedule. This is what cross-kernel charts compare."""
+        rows = self.rows
+        return rows[(rows['scaling'] == scaling) & (rows['profile'] == profile)
+                    & np.isin(rows['schedule'], ['', kernels.DEFAULT_SCHEDULE])]
+
+    def kernels(self):
+        """Kernel names present in the table, in registry order."""
+        return kernels.ordered(set(self.rows['kernel'].tolist()))
+
+    def series(self, **filters):
+        """Matching rows sorted by thread count, ready for plotting."""
+        rows = self.select(**filters)
+        return rows[np.argsort(rows['threads'], kind='stable')]
+
+
+def from_dict(data):
+    return ResultsTable(_flatten(data), [k for k in data if k != HOST_KEY], _bandwidth(data), _topology(data),
+                        _numpy_baseline(data), *_point_status(data))
+
+
+def load_results(path):
+    with open(path, 'r') as f:
+        return from_dict(json.load(f))
@@ -0,0 +1,86 @@
+"""
+Memory-traffic model and roofline helpers.
+
+All kernels stream their matrix from memory once per call, so their speed is
+bounded by memory bandwidth rather than arithmetic. kernel_traffic() gives the
+flops and bytes each kernel moves for a size n, which turns a Gflop/s result
+into achieved GB/s and an arithmetic intensity (flops per byte) that can be
+placed on a roofline against the bandwidth the stream binary measured. With rhs
+right-hand sides the matrix is still streamed once, so the intensity grows with rhs.
+"""
+
+import kernels
+
+FLOAT_BYTES = kernels.FLOAT_BYTES
+
+
+def kernel_traffic(kernel, n, rhs=1):
+    """Returns (flops, bytes) for one call of kernel at size n with rhs vectors.
+
+    Works on Python ints and NumPy arrays alike. Bytes count the matrix elements
+    actually read (only the n(n+1)/2 non-zeros for triangular kernels, whatever
+    their storage) plus reading B and writing C once.
+    """
+    return kernels.flops(kernel, n, rhs), FLOAT_BYTES * (kernels.matrix_elements(kernel, n) + 2 * n * rhs)
+
+
+def achieved_bandwidth(kernel, n, gflops, rhs=1):
+    """Converts a Gflop/s result to the GB/s of memory traffic it implies."""
+    flops, nbytes = kernel_traffic(kernel, n, rhs)
+    return gflops * nbytes / flops
+
+
+def arithmetic_intensity(kernel, n, rhs=1):
+    flops, nbytes = kernel_traffic(kernel, n, rhs)
+    return flops / nbytes
+
+
+def parse_stream(output):
+    """Parses the stream binary's output into {'copy': GB/s, 'triad': GB/s}."""
+    result = {}
+    for line in output.splitlines():
+        for name in ('Copy', 'Triad'):
+            if line.startswith(f"{name} (GB/s)"):
+                try:
+                    result[name.lower()] = float(line.split()[-1])
+                except ValueError:
+                    pass
+    return result if len(result) == 2 else None
+
+
+def roofline_chart_spec(data, profile):
+    """Spec for the roofline and bandwidth-efficiency panels of one profile.
+
+    Returns None when no bandwidth measurement is available.
+    """
+    if not data.bandwidth: return None
+    bw_threads = sorted(data.bandwidth)
+    peak_bw = max(data.bandwidth[t]['triad'] for t in bw_threads)
+
+    rows = data.headline('strong', profile)
+    if not len(rows): return None
+    ai_min, ai_max = float(rows['intensity'].min()) / 4, float(rows['intensity'].max()) * 4
+
+    roofline_series = [{'label': f'Peak triad bandwidth ({peak_bw:.1f} GB/s)', 'x': [ai_min, ai_max],
+                        'y': [ai_min * peak_bw, ai_max * peak_bw], 'marker': '', 'linestyle': '-', 'color': 'k'}]
+    efficiency_series = [{'label': 'Measured triad bandwidth', 'x': bw_threads,
+                          'y': [data.bandwidth[t]['triad'] for t in bw_threads], 'marker': 'x', 'linestyle': '--', 'color': 'k'}]
+    for kernel in kernels.ordered(set(rows['kernel'].tolist())):
+        label = kernels.label(kernel)
+        for size in sorted(set(rows['N'][rows['kernel'] == kernel].tolist())):
+            sel = rows[(rows['kernel'] == kernel) & (rows['N'] == size)]
+            sel = sel[sel['threads'].argsort()]
+            roofline_series.append({'label': f'{label} N={size}', 'x': sel['intensity'].tolist(),
+                                    'y': sel['gflops'].tolist(), 'marker': 'o', 'linestyle': 'none'})
+            efficiency_series.append({'label': f'{label} N={size}', 'x': sel['threads'].tolist(),
+                                      'y': sel['gbps'].tolist(), 'marker': 'o', 'linestyle': '-'})
+    return {
+        'title': f"Memory Bandwidth Roofline ('{profile}' profile)",
+        'legend_per_panel': True,
+        'panels': [
+            {'title': 'Roofline (all thread counts)', 'ideal': None, 'series': roofline_series,
+             'xlabel': 'Arithmetic intensity (flop/byte)', 'ylabel': 'Gflop/s', 'xscale': 'log', 'yscale': 'log'},
+            {'title': 'Achieved vs measured bandwidth', 'ideal': None, 'series': efficiency_series,
+             'xlabel': 'Threads', 'ylabel': 'GB/s'},
+        ],
+    }
@@ -0,0 +1,91 @@
+"""
+Small, dependency-free statistics helpers shared by benchmark.py and report.py.
+
+Benchmark timings are skewed (a run can only be slowed down by noise, never sped
+up), so points are summarized by their median and a distribution-free confidence
+interval built from order statistics rather than a mean and standard deviation.
+"""
+
+from math import comb
+
+CONFIDENCE = 0.95
+
+
+def median(samples):
+    xs = sorted(samples)
+    n = len(xs)
+    if n == 0:
+        return 0.0
+    mid = n // 2
+    return xs[mid] if n % 2 else (xs[mid - 1] + xs[mid]) / 2.0
+
+
+def median_ci(samples, confidence=CONFIDENCE):
+    """Returns (low, high) bounding the median with at least the given confidence.
+
+    The bounds are the k-th smallest and k-th largest samples, with k chosen from
+    the Binomial(n, 1/2) distribution. With too few samples to reach the requested
+    confidence the full (min, max) range is returned.
+    """
+    xs = sorted(samples)
+    n = len(xs)
+    if n == 0:
+        return 0.0, 0.0
+    tail = (1.0 - confidence) / 2.0
+    k, cdf = 0, 0.0
+    for j in range(n):
+        cdf += comb(n, j) / 2.0 ** n
+        if cdf > tail:
+            break
+        k = j + 1
+    if k == 0:
+        return xs[0], xs[-1]
+    return xs[k - 1], xs[n - k]
+
+
+def relative_ci_width(samples, confidence=CONFIDENCE):
+    low, high = median_ci(samples, confidence)
+    mid = median(samples)
+    return (high - low) / mid if mid > 0 else float("inf")
+
+
+def summarize(samples, confidence=CONFIDENCE):
+    """Collapses repeated Gflop/s samples into the per-point record stored in results.json."""
+    if not samples:
+        return {"gflops": None, "samples": 0}
+    low, high = median_ci(samples, confidence)
+    mid = median(samples)
+    return {
+        "gflops": f"{mid:g}",
+        "samples": len(samples),
+        "median": mid,
+        "min": min(samples),
+        "max": max(samples),
+        "ci_low": low,
+        "ci_high": high,
+    }
+
+
+def median_metrics(runs):
+    """Per-key median of a list of flat or one-level nested metric dicts.
+
+    Keys missing from some runs (e.g. a counter perf could not read) are summarized
+    over the runs that have them.
+    """
+    values = {}
+    for run in runs:
+        for key, value in run.items():
+            values.setdefault(key, []).append(value)
+    result = {}
+    for key, vals in values.items():
+        result[key] = median_metrics(vals) if isinstance(vals[0], dict) else median(vals)
+    return result
+
+
+def significantly_greater(a, b):
+    """True when point a beats point b with non-overlapping confidence intervals.
+
+    Points are dicts with 'gflops', 'ci_low' and 'ci_high'. Single-sample points
+    have a zero-width interval, so they compare exactly as before.
+    """
+    return a["ci_low"] > b["ci_high"]
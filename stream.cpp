@@ -0,0 +1,82 @@
+/**
+ * stream.cpp
+ *
+ * A small STREAM-style memory bandwidth benchmark (copy and triad) using OpenMP.
+ *
+ * The harness runs it at each thread count to measure how much memory bandwidth
+ * the host can actually deliver, which is the roof that the memory-bound
+ * matrix-vector kernels in hw2-a and hw2-b are compared against in the report.
+ */
+
+#include <iostream>
+#include <vector>
+#include <chrono>
+#include <cstdlib>
+#include <algorithm>
+#include <omp.h>
+
+// Helper function to get current time in microseconds
+double microtime() {
+    auto now = std::chrono::high_resolution_clock::now();
+    auto duration = now.time_since_epoch();
+    return std::chrono::duration_cast<std::chrono::microseconds>(duration).count();
+}
+
+int main(int argc, char **argv) {
+    if (argc < 2 || argc > 3) {
+        std::cerr << "Usage: " << argv[0] << " <array_elements> [repetitions]" << std::endl;
+        return 1;
+    }
+
+    long long n = std::atoll(argv[1]);
+    int reps = (argc == 3) ? std::atoi(argv[2]) : 10;
+    if (n <= 0 || reps <= 0) {
+        std::cerr << "Error: Array size and repetitions must be positive integers." << std::endl;
+        return 1;
+    }
+
+    std::vector<double> a(n), b(n), c(n);
+    const double scalar = 3.0;
+
+    // First touch in parallel so pages are placed near the threads that use them.
+    #pragma omp parallel for schedule(static)
+    for (long long i = 0; i < n; ++i) {
+        a[i] = 1.0;
+        b[i] = 2.0;
+        c[i] = 0.0;
+    }
+
+    double best_copy = 1e30, best_triad = 1e30;
+    for (int r = 0; r < reps; ++r) {
+        double t0 = microtime();
+        #pragma omp parallel for schedule(static)
+        for (long long i = 0; i < n; ++i) {
+            c[i] = a[i];
+        }
+        double t1 = microtime();
+        #pragma omp parallel for schedule(static)
+        for (long long i = 0; i < n; ++i) {
+            a[i] = b[i] + scalar * c[i];
+        }
+        double t2 = microtime();
+        // The first repetition only warms up caches, TLBs and the thread pool.
+        if (r > 0) {
+            best_copy = std::min(best_copy, t1 - t0);
+            best_triad = std::min(best_triad, t2 - t1);
+        }
+    }
+
+    // Copy moves 2 arrays (read a, write c); triad moves 3 (read b and c, write a).
+    double bytes = (double)n * sizeof(double);
+    double copy_gbs = (reps > 1 && best_copy > 0) ? 2.0 * bytes / (best_copy * 1e3) : 0.0;
+    double triad_gbs = (reps > 1 && best_triad > 0) ? 3.0 * bytes / (best_triad * 1e3) : 0.0;
+
+    std::cout << "Array Size: " << n << " doubles" << std::endl;
+    std::cout << "Threads used: " << omp_get_max_threads() << std::endl;
+    std::cout << "Copy (GB/s): " << copy_gbs << std::endl;
+    std::cout << "Triad (GB/s): " << triad_gbs << std::endl;
+    // Keep the compiler from eliding the loops.
+    std::cout << "Checksum: " << a[n / 2] + c[n / 2] << std::endl;
+
+    return 0;
+}
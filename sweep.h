@@ -0,0 +1,196 @@
+/**
+ * sweep.h
+ *
+ * Single-process sweep mode shared by the benchmark binaries.
+ *
+ *   <binary> <matrix_size_n> --sweep threads=1,2,4 [schedules=static,guided:16] [repeats=10] [budget=30]
+ *                                   [min=6] [ci=0.05] [k=1]
+ *
+ * The binary allocates and initializes its matrix once, then for every schedule
+ * and thread count (set with omp_set_schedule() / omp_set_num_threads()) makes
+ * one warm-up call and times up to `repeats` calls. Like benchmark.py's per-process
+ * sampling, it moves on once at least `min` calls were timed and the 95% confidence
+ * interval of their median Gflop/s is at most `ci` times the median wide (ci=0, the
+ * default, disables this), or once `budget` seconds have been spent on that
+ * configuration. Every timed call is printed as one JSON object per line, e.g.
+ *
+ *   {"threads": 2, "schedule": "guided", "chunk": 16, "rep": 0, "time_us": 812, "gflops": 4.13, "checksum": [18.5, 4.8, 0.00012]}
+ *
+ * so benchmark.py can stream the measurements without paying process startup and
+ * the O(n^2) initialization for each one. Each schedule may carry a chunk size
+ * as `name:chunk`, with the same meaning as hw2-b's chunk argument (0 selects the
+ * OpenMP default); without one, the schedule gets hw2-b's historical default and
+ * the line reports chunk -1. `schedules` only applies to binaries that take a
+ * schedule, and `k` only to binaries with a batched mode.
+ */
+
+#pragma once
+
+#include <algorithm>
+#include <chrono>
+#include <cmath>
+#include <cstdio>
+#include <cstdlib>
+#include <iostream>
+#include <sstream>
+#include <string>
+#include <vector>
+#include <omp.h>
+
+struct SweepOptions {
+    std::vector<int> threads;
+    std::vector<std::string> schedules;
+    int repeats = 10;
+    double budget_sec = 30.0;
+    int min_samples = 1;
+    double ci_width = 0.0;
+    int rhs = 1;
+};
+
+// Confidence of the median interval used to stop sampling; matches stats.CONFIDENCE.
+constexpr double SWEEP_CONFIDENCE = 0.95;
+
+// True if argv selects sweep mode: <binary> <n> --sweep ...
+inline bool is_sweep(int argc, char **argv) {
+    return argc >= 3 && std::string(argv[2]) == "--sweep";
+}
+
+// Parses the key=value arguments that follow --sweep; prints the problem and returns false on a bad one.
+inline bool parse_sweep_options(int argc, char **argv, SweepOptions& opts) {
+    for (int i = 3; i < argc; ++i) {
+        std::string arg = argv[i];
+        size_t eq = arg.find('=');
+        if (eq == std::string::npos) {
+            std::cerr << "Error: Sweep arguments are key=value pairs, got '" << arg << "'." << std::endl;
+            return false;
+        }
+        std::string key = arg.substr(0, eq), value = arg.substr(eq + 1);
+        std::stringstream fields(value);
+        std::string field;
+        if (key == "threads") {
+            while (std::getline(fields, field, ',')) opts.threads.push_back(std::atoi(field.c_str()));
+        } else if (key == "schedules") {
+            while (std::getline(fields, field, ',')) opts.schedules.push_back(field);
+        } else if (key == "repeats") {
+            opts.repeats = std::atoi(value.c_str());
+        } else if (key == "budget") {
+            opts.budget_sec = std::atof(value.c_str());
+        } else if (key == "min") {
+            opts.min_samples = std::atoi(value.c_str());
+        } else if (key == "ci") {
+            opts.ci_width = std::atof(value.c_str());
+        } else if (key == "k") {
+            opts.rhs = std::atoi(value.c_str());
+        } else {
+            std::cerr << "Error: Unknown sweep argument '" << key << "'." << std::endl;
+            return false;
+        }
+    }
+    if (opts.threads.empty()) opts.threads.push_back(omp_get_max_threads());
+    for (int t : opts.threads) {
+        if (t <= 0) {
+            std::cerr << "Error: Thread counts must be positive integers." << std::endl;
+            return false;
+        }
+    }
+    if (opts.repeats <= 0 || opts.rhs <= 0 || opts.min_samples <= 0) {
+        std::cerr << "Error: repeats, min and k must be positive integers." << std::endl;
+        return false;
+    }
+    if (opts.ci_width < 0.0) {
+        std::cerr << "Error: ci must not be negative." << std::endl;
+        return false;
+    }
+    return true;
+}
+
+// Sets the runtime schedule by name and chunk size; a negative chunk selects the same
+// defaults as hw2-b without a chunk argument. False if the name is unknown.
+inline bool set_schedule(const std::string& name, int chunk = -1) {
+    if (name == "static") omp_set_schedule(omp_sched_static, chunk < 0 ? 0 : chunk);
+    else if (name == "dynamic") omp_set_schedule(omp_sched_dynamic, chunk < 0 ? 1 : chunk);
+    else if (name == "guided") omp_set_schedule(omp_sched_guided, chunk < 0 ? 0 : chunk);
+    else return false;
+    return true;
+}
+
+// Checksums of an n x k row-major C: the plain sum, the position-weighted sum / n and the
+// smallest entry. Every entry of a correct C is positive, so a row the kernel never wrote
+// (C starts zeroed) shows up in the smallest entry even when the sums barely move.
+inline void checksums(int n, int k, const std::vector<float>& C, double& sum, double& weighted, double& smallest) {
+    sum = 0.0;
+    weighted = 0.0;
+    smallest = INFINITY;
+    for (int i = 0; i < n; ++i) {
+        for (int r = 0; r < k; ++r) {
+            sum += C[(size_t)i * k + r];
+            weighted += (i + 1.0) * C[(size_t)i * k + r];
+            smallest = std::min(smallest, (double)C[(size_t)i * k + r]);
+        }
+    }
+    weighted /= n;
+}
+
+// Width of the order-statistic confidence interval of the median, relative to the median.
+// Same bounds as stats.median_ci(): the k-th smallest and largest samples, k from Binomial(n, 1/2).
+inline double relative_ci_width(std::vector<double> xs) {
+    std::sort(xs.begin(), xs.end());
+    const int n = (int)xs.size();
+    const double tail = (1.0 - SWEEP_CONFIDENCE) / 2.0;
+    int k = 0;
+    double cdf = 0.0;
+    for (int j = 0; j < n; ++j) {
+        cdf += std::exp(std::lgamma(n + 1.0) - std::lgamma(j + 1.0) - std::lgamma(n - j + 1.0) - n * std::log(2.0));
+        if (cdf > tail) break;
+        k = j + 1;
+    }
+    double low = k == 0 ? xs.front() : xs[k - 1], high = k == 0 ? xs.back() : xs[n - k];
+    double mid = n % 2 ? xs[n / 2] : (xs[n / 2 - 1] + xs[n / 2]) / 2.0;
+    return mid > 0.0 ? (high - low) / mid : INFINITY;
+}
+
+// Runs every schedule x thread-count configuration and prints one JSON line per timed call.
+// run() makes one kernel call; summarize(sum, weighted, smallest) returns the checksums of its output.
+template <class Run, class Summarize>
+int run_sweep(const SweepOptions& opts, double flops, Run run, Summarize summarize) {
+    using clock = std::chrono::high_resolution_clock;
+    std::vector<std::string> schedules = opts.schedules.empty() ? std::vector<std::string>{""} : opts.schedules;
+    for (const std::string& entry : schedules) {
+        // "name" or "name:chunk".
+        size_t colon = entry.find(':');
+        std::string schedule = entry.substr(0, colon);
+        int chunk = colon == std::string::npos ? -1 : std::atoi(entry.c_str() + colon + 1);
+        if (colon != std::string::npos && chunk < 0) {
+            std::cerr << "Error: Chunk size must be a non-negative integer." << std::endl;
+            return 1;
+        }
+        if (!schedule.empty() && !set_schedule(schedule, chunk)) {
+            std::cerr << "Error: Invalid schedule type '" << schedule << "'." << std::endl;
+            return 1;
+        }
+        for (int threads : opts.threads) {
+            omp_set_num_threads(threads);
+            run(); // Warm-up: also starts the thread team at its new size.
+            auto start = clock::now();
+            std::vector<double> samples;
+            for (int rep = 0; rep < opts.repeats; ++rep) {
+                if (rep > 0 && std::chrono::duration<double>(clock::now() - start).count() >= opts.budget_sec) break;
+                auto time1 = clock::now();
+                run();
+                auto time2 = clock::now();
+                double elapsed_us = std::chrono::duration_cast<std::chrono::microseconds>(time2 - time1).count();
+                double gflops = elapsed_us > 0.0 ? flops / (elapsed_us * 1e3) : 0.0;
+                double sum, weighted, smallest;
+                summarize(sum, weighted, smallest);
+                std::printf("{\"threads\": %d, \"schedule\": \"%s\", \"chunk\": %d, \"rep\": %d, \"time_us\": %.0f, "
+                            "\"gflops\": %.6g, \"checksum\": [%.17g, %.17g, %.17g]}\n",
+                            threads, schedule.c_str(), chunk, rep, elapsed_us, gflops, sum, weighted, smallest);
+                std::fflush(stdout);
+                samples.push_back(gflops);
+                if (opts.ci_width > 0.0 && (int)samples.size() >= opts.min_samples
+                        && relative_ci_width(samples) <= opts.ci_width) break;
+            }
+        }
+    }
+    return 0;
+}
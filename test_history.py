@@ -0,0 +1,44 @@
+import history
+
+
+def make_db(tmp_path, *runs, hosts=None):
+    """Runs 1, 2, ... with one strong-scaling hw2_b point per thread count: {threads: (median, ci_low, ci_high)}."""
+    conn = history.connect(str(tmp_path / "history.sqlite"))
+    for run_id, points in enumerate(runs, 1):
+        host = hosts[run_id - 1] if hosts else "host"
+        conn.execute("INSERT INTO runs (id, timestamp, host_id) VALUES (?, '2026-01-01T00:00:00+00:00', ?)", (run_id, host))
+        conn.executemany(
+            "INSERT INTO points (run_id, scaling, kernel, profile, N, schedule, placement, rhs, threads, "
+            "gflops, ci_low, ci_high, samples) VALUES (?, 'strong', 'hw2_b', 'O3', 1024, 'guided', '', 1, ?, ?, ?, ?, 5)",
+            [(run_id, threads) + point for threads, point in points.items()])
+    return conn
+
+
+def test_compare_reports_significant_changes(tmp_path):
+    conn = make_db(tmp_path,
+                   {1: (10.0, 9.9, 10.1), 2: (20.0, 19.8, 20.2), 4: (30.0, 29.0, 31.0)},
+                   {1: (8.0, 7.9, 8.1), 2: (24.0, 23.8, 24.2), 4: (29.0, 28.0, 30.0)})
+    result = history.compare(conn, 1, 2)
+    assert result["compared"] == 3
+    assert [e["threads"] for e in result["regressions"]] == [1]
+    assert result["regressions"][0]["change"] == -0.2
+    assert [e["threads"] for e in result["improvements"]] == [2]
+
+
+def test_compare_applies_threshold(tmp_path):
+    # A 1% drop with disjoint CIs is significant but below the default 2% threshold.
+    conn = make_db(tmp_path, {1: (10.0, 9.99, 10.01)}, {1: (9.9, 9.89, 9.91)})
+    assert history.compare(conn, 1, 2)["regressions"] == []
+    assert len(history.compare(conn, 1, 2, threshold=0.005)["regressions"]) == 1
+
+
+def test_compare_skips_unmatched_points(tmp_path):
+    conn = make_db(tmp_path, {2: (5.0, 4.9, 5.1)}, {4: (9.0, 8.9, 9.1)})
+    assert history.compare(conn, 1, 2) == {"compared": 0, "regressions": [], "improvements": []}
+
+
+def test_previous_on_host_skips_other_machines(tmp_path):
+    conn = make_db(tmp_path, {}, {}, {}, {}, hosts=["a", "b", "a", "b"])
+    assert history.previous_on_host(conn, 4) == 2
+    assert history.previous_on_host(conn, 3) == 1
+    assert history.previous_on_host(conn, 2) is None
@@ -0,0 +1,65 @@
+import math
+
+import numpy as np
+import pytest
+
+import models
+
+THREADS = [1, 2, 4, 8, 16, 32]
+
+
+def amdahl(p1, s):
+    return [p1 * t / (1 + s * (t - 1)) for t in THREADS]
+
+
+def saturation(r, p_max):
+    return [min(r * t, p_max) for t in THREADS]
+
+
+def test_fit_curve_recovers_amdahl_parameters():
+    curve = models.fit_curve(THREADS, amdahl(2.0, 0.05))
+    assert curve["best"] == "amdahl"
+    fit = curve["fits"]["amdahl"]
+    assert fit["p1"] == pytest.approx(2.0, rel=1e-3)
+    assert fit["s"] == pytest.approx(0.05, abs=1e-4)
+    assert fit["r2"] == pytest.approx(1.0)
+
+
+def test_fit_curve_recovers_saturation_parameters():
+    curve = models.fit_curve(THREADS, saturation(1.5, 9.0))
+    assert curve["best"] == "saturation"
+    fit = curve["fits"]["saturation"]
+    assert fit["r"] == pytest.approx(1.5)
+    assert fit["p_max"] == pytest.approx(9.0)
+    assert fit["knee"] == pytest.approx(6.0)
+
+
+def test_fit_curve_weak_scaling_uses_gustafson():
+    gflops = [2.0 * (0.1 + 0.9 * t) for t in THREADS]
+    curve = models.fit_curve(THREADS, gflops, weak=True)
+    assert set(curve["fits"]) == set(models.WEAK_MODELS)
+    assert curve["best"] == "gustafson"
+    assert curve["fits"]["gustafson"]["s"] == pytest.approx(0.1, abs=1e-4)
+
+
+def test_fit_curve_needs_two_thread_counts():
+    assert models.fit_curve([4], [3.0]) is None
+    assert models.fit_curve([4, 4], [3.0, 3.1]) is None
+
+
+def test_zero_medians_are_left_out():
+    gflops = amdahl(2.0, 0.05)
+    gflops[2] = 0.0
+    fit = models.fit_curve(THREADS, gflops)["fits"]["amdahl"]
+    assert np.isfinite(fit["rmse_rel"])
+    assert fit["s"] == pytest.approx(0.05, abs=1e-4)
+    assert models.fit_curve([1, 2, 4], [0.0, 0.0, 3.0]) is None
+
+
+def test_leave_one_out_error():
+    assert models.leave_one_out_error(THREADS, amdahl(2.0, 0.05), "amdahl") < 1e-3
+    noisy = amdahl(2.0, 0.05)
+    noisy[-1] *= 1.5
+    assert models.leave_one_out_error(THREADS, noisy, "amdahl") > 0.3
+    assert models.leave_one_out_error([1, 2], [1.0, 2.0], "amdahl") == math.inf
+    assert models.leave_one_out_error([1, 2, 4], [1.0, 0.0, 3.0], "amdahl") == math.inf
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+import reference
+
+
+def float32_result(kernel, n):
+    """C as a float32 kernel computes it, one row block at a time."""
+    triangular = kernel != "hw2_a"
+    B = reference._vector(n, np.float32)
+    C = np.empty(n, dtype=np.float32)
+    for start in range(0, n, reference.BLOCK_ROWS):
+        rows = range(start, min(start + reference.BLOCK_ROWS, n))
+        A = reference._init(n, rows, np.float32)
+        if triangular:
+            A = np.tril(A, k=start)
+        C[start:rows.stop] = A @ B
+    return C
+
+
+def checksums(C):
+    """The three checksums the binaries print (sweep.h checksums())."""
+    C = C.astype(np.float64)
+    n = len(C)
+    return float(C.sum()), float((np.arange(1, n + 1) * C).sum() / n), float(C.min())
+
+
+@pytest.mark.parametrize("kernel", ["hw2_a", "hw2_b", "hw2_b_packed"])
+def test_correct_result_passes(kernel):
+    rel_error, error = reference.check(kernel, 4096, checksums(float32_result(kernel, 4096)))
+    assert error is None
+    assert rel_error < 1e-5
+
+
+@pytest.mark.parametrize("kernel", ["hw2_a", "hw2_b"])
+def test_dropped_last_row_is_rejected(kernel):
+    C = float32_result(kernel, 4096)
+    C[-1] = 0.0  # The kernel never wrote its last row; C starts zeroed.
+    rel_error, error = reference.check(kernel, 4096, checksums(C))
+    assert error and error.startswith("checksum mismatch")
+    assert rel_error == pytest.approx(1.0)
+
+
+def test_misplaced_row_is_rejected():
+    C = float32_result("hw2_b", 4096)
+    C[11], C[10] = C[10], 0.0  # Row 10 written one row down.
+    assert reference.check("hw2_b", 4096, checksums(C))[1]
+
+
+def test_missing_checksum_is_rejected():
+    assert reference.validate("hw2_a", 64, "Performance (Gflop/s): 1.0\n")[1]
+    assert reference.validate("hw2_a", 64, "Checksum: 1.0 2.0\n")[1].startswith("expected 3 checksums")
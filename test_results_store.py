@@ -0,0 +1,67 @@
+import numpy as np
+
+import results_store
+
+
+def record(median, samples=3, **extra):
+    return dict(extra, gflops=f"{median:g}", samples=samples, median=median, ci_low=median * 0.9, ci_high=median * 1.1)
+
+
+def rows_where(table, **filters):
+    mask = np.ones(len(table), dtype=bool)
+    for column, value in filters.items():
+        mask &= table[column] == value
+    return table[mask]
+
+
+def test_flatten_strong_scaling():
+    data = {"O3": {"general_perf": {
+        "hw2_a": {"N256": {"T1": record(1.0), "T2": record(1.8)}},
+        "hw2_b": {"N256": {"schedule_guided": {"T1": record(2.0)}, "schedule_static": {"T1": record(1.5)}}},
+    }}}
+    table = results_store._flatten(data)
+    assert len(table) == 4
+    a = rows_where(table, kernel="hw2_a", threads=2)[0]
+    assert (a["scaling"], a["schedule"], a["N"], a["rhs"], a["gflops"]) == ("strong", "", 256, 1, 1.8)
+    assert a["ci_low"] == 1.8 * 0.9 and a["samples"] == 3
+    assert sorted(rows_where(table, kernel="hw2_b")["schedule"].tolist()) == ["guided", "static"]
+
+
+def test_flatten_accepts_legacy_strings_and_skips_failures():
+    data = {"O3": {"general_perf": {"hw2_a": {"N256": {"T1": "1.25", "T2": "N/A", "T4": record(0.0),
+                                                       "T8": {"samples": 0, "status": "failed"}}}}}}
+    table = results_store._flatten(data)
+    assert table["threads"].tolist() == [1]
+    assert table["gflops"][0] == 1.25 and table["samples"][0] == 1
+
+
+def test_flatten_weak_scaling_uses_actual_size():
+    data = {"O3": {"weak_scaling": {"N256": {"hw2_b_guided": {"T1": record(2.0, n=256), "T4": record(7.0, n=406)}}}}}
+    table = results_store._flatten(data)
+    assert set(table["scaling"].tolist()) == {"weak"}
+    row = rows_where(table, threads=4)[0]
+    assert (row["kernel"], row["schedule"], row["N"], row["n_actual"]) == ("hw2_b", "guided", 256, 406)
+
+
+def test_flatten_placement_and_batched():
+    data = {"O3": {
+        "placement": {"hw2_a": {"N512": {"close_cores": {"T2": record(3.0)}, "spread_sockets": {"T2": record(2.5)}}}},
+        "batched": {"hw2_b_guided": {"N512": {"K1": {"T2": record(3.0)}, "K8": {"T2": record(9.0)}}}},
+    }}
+    table = results_store._flatten(data)
+    placement = rows_where(table, scaling="placement")
+    assert sorted(placement["placement"].tolist()) == ["close_cores", "spread_sockets"]
+    assert set(placement["rhs"].tolist()) == {1}
+    batched = rows_where(table, scaling="batched")
+    assert sorted(batched["rhs"].tolist()) == [1, 8]
+    assert set(batched["schedule"].tolist()) == {"guided"} and set(batched["placement"].tolist()) == {""}
+    # More right-hand sides reuse the matrix, so the arithmetic intensity rises with k.
+    k1, k8 = rows_where(batched, rhs=1)[0], rows_where(batched, rhs=8)[0]
+    assert k8["intensity"] > k1["intensity"]
+
+
+def test_flatten_ignores_host_section():
+    data = {"host": {"bandwidth": {"T1": {"copy": 10.0, "triad": 11.0}}},
+            "O3": {"general_perf": {"hw2_a": {"N256": {"T1": record(1.0)}}}}}
+    table = results_store._flatten(data)
+    assert table["profile"].tolist() == ["O3"]
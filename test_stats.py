@@ -0,0 +1,35 @@
+import pytest
+
+import stats
+
+
+def test_median_odd_and_even():
+    assert stats.median([3.0, 1.0, 2.0]) == 2.0
+    assert stats.median([4.0, 1.0, 3.0, 2.0]) == 2.5
+    assert stats.median([]) == 0.0
+
+
+def test_median_ci_uses_order_statistics():
+    # Binomial(10, 1/2): P(X <= 1) ~ 1.1% <= 2.5% < P(X <= 2), so k = 2.
+    samples = [float(x) for x in range(10, 0, -1)]
+    assert stats.median_ci(samples) == (2.0, 9.0)
+
+
+def test_median_ci_widens_with_confidence():
+    samples = [float(x) for x in range(1, 21)]
+    low95, high95 = stats.median_ci(samples, 0.95)
+    low50, high50 = stats.median_ci(samples, 0.50)
+    assert low95 < low50 <= stats.median(samples) <= high50 < high95
+
+
+def test_median_ci_small_n_falls_back_to_range():
+    # With five samples P(X = 0) = 1/32 already exceeds 2.5%, so no order statistic qualifies.
+    assert stats.median_ci([5.0, 1.0, 3.0, 2.0, 4.0]) == (1.0, 5.0)
+    assert stats.median_ci([7.0]) == (7.0, 7.0)
+    assert stats.median_ci([]) == (0.0, 0.0)
+
+
+def test_relative_ci_width():
+    assert stats.relative_ci_width([2.0, 2.0, 2.0]) == 0.0
+    assert stats.relative_ci_width([1.0, 2.0, 3.0]) == pytest.approx(1.0)
+    assert stats.relative_ci_width([0.0, 0.0]) == float("inf")
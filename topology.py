@@ -0,0 +1,123 @@
+"""
+CPU, NUMA and cache topology of the benchmark host, read from /sys.
+
+OpenMP thread placement (OMP_PROC_BIND / OMP_PLACES) only matters relative to
+the machine's layout: how many sockets and NUMA nodes there are, whether cores
+run several hardware threads, and which CPUs share each cache level. detect()
+records that layout so results.json says where a placement sweep was run, and
+describe() turns it into one line of text for the report. memory() reads the
+installed and currently available RAM that benchmark.py plans concurrent runs against.
+"""
+
+import functools
+import glob
+import os
+
+SYS_CPU = "/sys/devices/system/cpu"
+SYS_NODE = "/sys/devices/system/node"
+PROC_MEMINFO = "/proc/meminfo"
+
+
+def parse_cpulist(text):
+    """Expands a kernel cpulist such as "0-3,8,10-11" into a sorted list of ints."""
+    cpus = set()
+    for part in text.strip().split(","):
+        if not part:
+            continue
+        if "-" in part:
+            low, high = part.split("-")
+            cpus.update(range(int(low), int(high) + 1))
+        else:
+            cpus.add(int(part))
+    return sorted(cpus)
+
+
+def _read(path, default=None):
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return default
+
+
+def _size_kb(text):
+    """Converts a cache size such as "32K" or "8M" to KiB."""
+    if not text:
+        return 0
+    scale = {"K": 1, "M": 1024, "G": 1024 * 1024}.get(text[-1].upper())
+    return int(text[:-1]) * scale if scale else int(text) // 1024
+
+
+def memory(meminfo=PROC_MEMINFO):
+    """Returns {'total_kb', 'available_kb'} of RAM.
+
+    Falls back to sysconf (where available counts only free pages) when
+    /proc/meminfo cannot be read, and to zeros when neither works.
+    """
+    fields = {}
+    for line in (_read(meminfo, "") or "").splitlines():
+        key, _, value = line.partition(":")
+        if value.strip().endswith("kB"):
+            fields[key] = int(value.split()[0])
+    if "MemTotal" in fields:
+        return {"total_kb": fields["MemTotal"], "available_kb": fields.get("MemAvailable", fields.get("MemFree", 0))}
+    try:
+        page_kb = os.sysconf("SC_PAGE_SIZE") // 1024
+        return {"total_kb": os.sysconf("SC_PHYS_PAGES") * page_kb, "available_kb": os.sysconf("SC_AVPHYS_PAGES") * page_kb}
+    except (ValueError, OSError, AttributeError):
+        return {"total_kb": 0, "available_kb": 0}
+
+
+@functools.lru_cache(maxsize=None)
+def detect(cpu_root=SYS_CPU, node_root=SYS_NODE):
+    """Returns the host topology as a JSON-serializable dict.
+
+    Falls back to a single socket, single NUMA node layout with os.cpu_count()
+    CPUs when /sys is not available (e.g. on macOS or in a restricted container).
+    """
+    online = _read(os.path.join(cpu_root, "online"))
+    cpus = parse_cpulist(online) if online else list(range(os.cpu_count() or 1))
+    packages, cores = set(), set()
+    for cpu in cpus:
+        base = os.path.join(cpu_root, f"cpu{cpu}", "topology")
+        package = _read(os.path.join(base, "physical_package_id"), "0")
+        packages.add(package)
+        cores.add((package, _read(os.path.join(base, "core_id"), str(cpu))))
+
+    nodes = {}
+    for path in sorted(glob.glob(os.path.join(node_root, "node[0-9]*"))):
+        node_cpus = parse_cpulist(_read(os.path.join(path, "cpulist"), ""))
+        if node_cpus:
+            nodes[os.path.basename(path)] = node_cpus
+
+    caches = []
+    for path in sorted(glob.glob(os.path.join(cpu_root, f"cpu{cpus[0]}", "cache", "index[0-9]*"))):
+        shared = _read(os.path.join(path, "shared_cpu_list"), "")
+        caches.append({"level": int(_read(os.path.join(path, "level"), "0")),
+                       "type": _read(os.path.join(path, "type"), "Unified"),
+                       "size_kb": _size_kb(_read(os.path.join(path, "size"), "")),
+                       "shared_by": len(parse_cpulist(shared)) if shared else 1})
+
+    return {
+        "logical_cpus": len(cpus),
+        "cores": len(cores),
+        "sockets": len(packages),
+        "threads_per_core": max(1, len(cpus) // max(1, len(cores))),
+        "numa_nodes": len(nodes) or 1,
+        "numa_cpus": nodes,
+        "caches": caches,
+        "memory_kb": memory()["total_kb"],
+    }
+
+
+def describe(topo):
+    """One-sentence summary of a detect() dict, e.g. for the report."""
+    if not topo:
+        return "The host topology was not recorded."
+    caches = ", ".join(f"L{c['level']}{'d' if c['type'] == 'Data' else 'i' if c['type'] == 'Instruction' else ''} "
+                       f"{c['size_kb']} KiB (shared by {c['shared_by']} CPUs)" for c in topo.get("caches", []))
+    text = (f"{topo['sockets']} socket(s), {topo['numa_nodes']} NUMA node(s), {topo['cores']} physical cores and "
+            f"{topo['logical_cpus']} logical CPUs ({topo['threads_per_core']} hardware thread(s) per core)")
+    if topo.get("memory_kb"):
+        text += f", {topo['memory_kb'] / 2 ** 20:.1f} GiB of RAM"
+    return text + (f"; caches seen from CPU 0: {caches}." if caches else ".")
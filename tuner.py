@@ -0,0 +1,193 @@
+"""
+Autotuner for hw2-b's OpenMP schedule, chunk size and thread count.
+
+`python tuner.py tune` searches every (schedule, chunk, threads) candidate per
+matrix size with successive halving: all survivors are measured with the same
+number of samples, the best 1/ETA are kept and their samples multiplied by ETA,
+within a run budget per size. The winners are stored in tuning.json per host,
+compiler profile and size:
+
+    {host_id: {profile: {"N<n>": {"schedule", "chunk", "threads", "gflops", ...}}}}
+
+lookup() returns the tuned configuration for a profile and size, falling back
+to the nearest tuned size within a factor of MAX_FALLBACK_RATIO, and
+tuned_points() turns the table into the points benchmark.py --tuned runs.
+
+    python tuner.py tune --profile O3_default --sizes 1024 2048
+    python tuner.py lookup 2048 --profile O3_default
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+
+import benchmark
+import measure_cache
+
+# --- Configuration ---
+TUNING_FILE = "tuning.json"
+CHUNK_SIZES = [0, 1, 4, 16, 64, 256]  # 0 selects the OpenMP default for the schedule.
+ETA = 3                 # Keep the best 1/ETA of the candidates after every round.
+INITIAL_SAMPLES = 1     # Samples per candidate in the first round; multiplied by ETA each round.
+RUN_BUDGET = 400        # Maximum benchmark runs spent tuning one matrix size.
+# lookup() only falls back to a tuned size within this factor of the requested one.
+MAX_FALLBACK_RATIO = 2.0
+
+
+def candidate_point(profile, n, schedule, chunk, threads):
+    return {"path": [profile, "tuning", f"N{n}", schedule, f"C{chunk}", f"T{threads}"],
+            "profile": profile, "kernel": "hw2_b", "binary": "hw2-b", "args": [str(n), schedule, str(chunk)],
+            "n": n, "threads": threads, "weak": False,
+            "config": {"schedule": schedule, "chunk": chunk, "threads": threads}}
+
+
+def successive_halving(candidates, build_dirs, max_cores, budget):
+    """Returns (best candidate, its record, runs used) for one matrix size.
+
+    Every round measures all surviving candidates with the same number of samples,
+    keeps the best 1/ETA by median Gflop/s and multiplies the per-candidate samples
+    by ETA. The search stops once one candidate is left or the next round would
+    exceed the run budget.
+    """
+    survivors, samples, used = list(candidates), INITIAL_SAMPLES, 0
+    benchmark.prepare_references(survivors)
+    best = None
+    while survivors:
+        cost = len(survivors) * samples
+        if best is not None and used + cost > budget:
+            print(f"  Budget reached with {len(survivors)} candidates left; keeping the current leader.")
+            break
+        sampling = {"min_samples": samples, "max_samples": samples, "ci_width": 0.0, "budget": math.inf}
+        records = {}
+
+        def on_result(point, record):
+            records[id(point)] = record
+
+        benchmark.run_queue(survivors, build_dirs, max_cores, on_result, sampling)
+        used += cost
+        ranked = sorted((p for p in survivors if records[id(p)]["samples"]),
+                        key=lambda p: records[id(p)]["median"], reverse=True)
+        if not ranked:
+            break
+        best = (ranked[0], records[id(ranked[0])])
+        print(f"  Round with {samples} sample(s): {len(survivors)} candidates, leader "
+              f"{ranked[0]['config']} at {best[1]['gflops']} Gflop/s")
+        survivors = ranked[:max(1, len(ranked) // ETA)]
+        if len(survivors) == 1:
+            break
+        samples *= ETA
+    return (best[0], best[1], used) if best else (None, None, used)
+
+
+def load_table(path=TUNING_FILE):
+    """Reads tuning.json; tables written before entries were keyed by profile are regrouped."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        table = json.load(f)
+    for host, entries in table.items():
+        if any(key.startswith("N") for key in entries):
+            by_profile = {}
+            for key, entry in entries.items():
+                by_profile.setdefault(entry.get("profile", "O3_default"), {})[key] = entry
+            table[host] = by_profile
+    return table
+
+
+def lookup(n, profile, path=TUNING_FILE, host=None, max_ratio=MAX_FALLBACK_RATIO):
+    """Best known (schedule, chunk, threads) entry for size n with a compiler profile on this host, or None.
+
+    When n itself was not tuned, falls back with a warning to the closest tuned size
+    (by ratio) if it is within a factor of max_ratio of n; the entry's 'n' says which
+    size it was tuned at.
+    """
+    entries = load_table(path).get(host or measure_cache.host_id(), {}).get(profile, {})
+    if not entries:
+        return None
+    nearest = min(entries, key=lambda key: abs(math.log(int(key[1:]) / n)))
+    tuned_n = int(nearest[1:])
+    if tuned_n != n:
+        if max(tuned_n / n, n / tuned_n) > max_ratio:
+            return None
+        print(f"Warning: no tuning for {profile} N={n}; using the configuration tuned at N={tuned_n}.")
+    return entries[nearest]
+
+
+def tuned_points(profiles, sizes, path=TUNING_FILE):
+    """One hw2-b point per (profile, size) at its tuned schedule, chunk and threads, for benchmark.py --tuned.
+
+    Results live under <profile>/tuned/hw2_b/N<n>/T<threads>; sizes without usable
+    tuning data are skipped with a warning.
+    """
+    points = []
+    for profile in profiles:
+        for n in sizes:
+            config = lookup(n, profile, path)
+            if config is None:
+                print(f"Warning: no tuning data for {profile} N={n} in {path}; skipping its tuned point.")
+                continue
+            point = benchmark.make_point([profile, "tuned", "hw2_b", f"N{n}", f"T{config['threads']}"],
+                                         profile, "hw2_b", n, config["threads"], config["schedule"])
+            point["args"].append(str(config["chunk"]))
+            point["tuned"] = {"schedule": config["schedule"], "chunk": config["chunk"], "tuned_n": config["n"]}
+            points.append(point)
+    return points
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tunes hw2-b's schedule, chunk size and thread count per matrix size.")
+    subparsers = parser.add_subparsers(dest="command")
+    tune = subparsers.add_parser("tune", help="Search configurations and update the tuning table.")
+    tune.add_argument("--profile", default="O3_default", choices=list(benchmark.COMPILER_PROFILES))
+    tune.add_argument("--sizes", nargs="+", type=int, default=benchmark.MATRIX_SIZES)
+    tune.add_argument("--threads", nargs="+", type=int, default=benchmark.THREAD_COUNTS)
+    tune.add_argument("--schedules", nargs="+", default=benchmark.SCHEDULES, choices=benchmark.SCHEDULES)
+    tune.add_argument("--chunks", nargs="+", type=int, default=CHUNK_SIZES)
+    tune.add_argument("--budget", type=int, default=RUN_BUDGET, help="Maximum benchmark runs per matrix size.")
+    tune.add_argument("--max-cores", type=int, default=benchmark.available_cores())
+    tune.add_argument("--output", default=TUNING_FILE)
+    show = subparsers.add_parser("lookup", help="Print the tuned configuration for a matrix size.")
+    show.add_argument("n", type=int)
+    show.add_argument("--profile", default="O3_default", choices=list(benchmark.COMPILER_PROFILES))
+    show.add_argument("--table", default=TUNING_FILE)
+    args = parser.parse_args(argv)
+
+    if args.command == "lookup":
+        config = lookup(args.n, args.profile, args.table)
+        if config is None:
+            print(f"No tuning data for {args.profile} near N={args.n} on this host in {args.table}. "
+                  f"Run 'python tuner.py tune --profile {args.profile}' first.")
+            return 1
+        print(f"OMP_NUM_THREADS={config['threads']} ./hw2-b {args.n} {config['schedule']} {config['chunk']}"
+              f"  # tuned at N={config['n']}: {config['gflops']} Gflop/s")
+        return 0
+    if args.command != "tune":
+        parser.print_help()
+        return 1
+
+    build_dirs = benchmark.build_all([args.profile])
+    if not build_dirs:
+        print("Error: the profile could not be built.")
+        return 1
+    table = load_table(args.output)
+    host_entries = table.setdefault(measure_cache.host_id(), {}).setdefault(args.profile, {})
+    for n in args.sizes:
+        candidates = [candidate_point(args.profile, n, s, c, t)
+                      for s in args.schedules for c in args.chunks for t in args.threads]
+        print(f"--- Tuning hw2-b N={n}: {len(candidates)} candidates, budget {args.budget} runs ---")
+        best, record, used = successive_halving(candidates, build_dirs, args.max_cores, args.budget)
+        if best is None:
+            print(f"  No successful runs for N={n}.")
+            continue
+        host_entries[f"N{n}"] = dict(best["config"], n=n, profile=args.profile, gflops=record["median"],
+                                     ci_low=record["ci_low"], ci_high=record["ci_high"], runs=used)
+        print(f"  Best for N={n}: {best['config']} at {record['gflops']} Gflop/s ({used} runs)")
+        # Persist after every size so an interrupted tuning session keeps what it found.
+        benchmark.write_json_atomic(args.output, table)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())